@@ -0,0 +1,43 @@
+"""hot path indexes
+
+Revision ID: b7e4c91d2f05
+Revises: 1343f74a172d
+Create Date: 2026-10-18 10:12:41.305117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4c91d2f05'
+down_revision: Union[str, None] = '1343f74a172d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (Index, Tabelle, Spalten) – Tabellen entstehen per create_all, daher nur anlegen, wo es sie gibt.
+# conversation_events(user_id, id) braucht keinen eigenen Index: ix_conversation_events_user_id endet implizit auf der rowid (= id).
+INDEXES = [
+    ("ix_followup_done_due_at", "followup", ["done", "due_at"]),
+    ("ix_lead_company_contact_email", "lead", ["company", "contact_email"]),
+    ("ix_suggestion_consumed_score", "suggestion", ["consumed", "score"]),
+    ("ix_action_queue_user_status_created", "action_queue", ["user_id", "status", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in INDEXES:
+        if table in tables and name not in {ix["name"] for ix in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, _ in reversed(INDEXES):
+        if table in tables:
+            op.drop_index(name, table_name=table, if_exists=True)
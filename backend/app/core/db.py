@@ -1,28 +1,88 @@
+import os
+import sys
+import threading
+from typing import Dict, List
+
 from sqlalchemy import create_engine, event
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
 
 from .settings import settings
 
 DB_URL = "sqlite:///./data/app.db"
 
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+# Das Paket ist als app.core.db und als backend.app.core.db importierbar; beide teilen sich eine Registry
+_twin = sys.modules.get("backend.app.core.db" if __name__ == "app.core.db" else "app.core.db")
+_engines: Dict[str, Engine] = getattr(_twin, "_engines", {})
+_engines_lock: threading.Lock = getattr(_twin, "_engines_lock", None) or threading.Lock()
+
+
+def sqlite_pragmas() -> List[str]:
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size}",
+        f"PRAGMA temp_store={settings.sqlite_temp_store}",
+    ]
+    if settings.sqlite_wal:
+        pragmas.insert(0, "PRAGMA journal_mode=WAL")
+    return pragmas
 
 
-@event.listens_for(Engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
+def apply_pragmas(dbapi_connection, connection_record=None) -> None:
+    """Setzt die abgestimmten SQLite-Pragmas auf einer frischen Verbindung"""
+    cur = dbapi_connection.cursor()
     try:
-        cur = dbapi_connection.cursor()
-        cur.execute("PRAGMA journal_mode=WAL;")
-        cur.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms};")
+        for pragma in sqlite_pragmas():
+            try:
+                cur.execute(pragma)
+            except Exception:
+                pass
+    finally:
         cur.close()
-    except Exception:
-        pass
 
 
-def get_engine():
+def _registry_key(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database and parsed.database != ":memory:":
+        return f"sqlite:///{os.path.abspath(parsed.database)}"
+    return url
+
+
+def engine_for(url: str) -> Engine:
+    """Liefert das eine Engine pro Datenbankdatei (gleiche Datei über verschiedene Pfade = gleiches Engine)"""
+    key = _registry_key(url)
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = _create(key)
     return engine
 
 
+def _create(url: str) -> Engine:
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return create_engine(url, pool_pre_ping=True)
+    if not parsed.database or parsed.database == ":memory:":
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+    else:
+        # Sync-Endpunkte laufen im Threadpool (40 Threads); mit WAL lesen die parallel, statt auf den Pool zu warten
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000},
+            pool_size=settings.sqlite_pool_size,
+            max_overflow=settings.sqlite_max_overflow,
+            pool_timeout=settings.sqlite_pool_timeout_s,
+        )
+    event.listen(engine, "connect", apply_pragmas)
+    return engine
+
 
+engine = engine_for(DB_URL)
 
 
+def get_engine():
+    return engine
@@ -11,6 +11,13 @@ class AppSettings(BaseModel):
     api_key: Optional[str] = os.getenv("API_KEY")
     sqlite_wal: bool = True
     sqlite_busy_timeout_ms: int = 4000
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_cache_size_kb: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "32768"))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    sqlite_temp_store: str = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+    sqlite_pool_size: int = int(os.getenv("SQLITE_POOL_SIZE", "10"))
+    sqlite_max_overflow: int = int(os.getenv("SQLITE_MAX_OVERFLOW", "30"))
+    sqlite_pool_timeout_s: float = float(os.getenv("SQLITE_POOL_TIMEOUT_S", "30"))
 
 
 settings = AppSettings()
@@ -26,9 +26,12 @@ settings = get_settings()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     scheduler = start_scheduler()
+    # mit lifespan ruft Starlette die Startup-Hooks der eingebundenen Router nicht selbst auf
+    await app.router.startup()
     try:
         yield
     finally:
+        await app.router.shutdown()
         shutdown_scheduler()
 
 
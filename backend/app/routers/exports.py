@@ -3,12 +3,16 @@ from __future__ import annotations
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse, JSONResponse
+import gzip
 import json
 
+from app.services import columnar_export, export_catalog
+from app.services.lazy_export import render
+
 router = APIRouter(prefix="/api/exports", tags=["exports"])
 
 
@@ -22,32 +26,72 @@ def _resolve_export_dir() -> Path:
 
 
 @router.get("/list")
-def list_exports():
+def list_exports(
+    limit: int = Query(10, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor der vorherigen Seite"),
+    kind: Optional[str] = Query(None, description="csv | xlsx | json | md | parquet | arrow | pdf"),
+    category: Optional[str] = Query(None),
+    city: Optional[str] = Query(None),
+):
+    """Neueste Exporte aus dem Katalog (Index statt Verzeichnis-Scan), seitenweise per Cursor."""
     directory = _resolve_export_dir()
-    if not directory.exists():
-        return {"ok": True, "files": []}
+    export_catalog.ensure_synced(directory)
+    try:
+        entries, next_cursor = export_catalog.list_page(limit, cursor, kind, category, city)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    files: List[Path] = [
-        entry
-        for entry in directory.iterdir()
-        if entry.is_file() and entry.suffix.lower() in {".csv", ".xlsx", ".json", ".md"}
+    payload = [
+        {
+            "name": entry["name"],
+            "path": entry["path"],
+            "size": entry["size"],
+            "modified": datetime.fromtimestamp(entry["created_at"]).isoformat(),
+            "kind": entry["kind"],
+            "source": entry["source"],
+            "category": entry["category"],
+            "city": entry["city"],
+            "rows": entry["rows"],
+            "compressed": bool(entry["compressed"]),
+        }
+        for entry in entries
     ]
-    files.sort(key=lambda item: item.stat().st_mtime, reverse=True)
-    files = files[:10]
 
-    payload = []
-    for entry in files:
-        stats = entry.stat()
-        payload.append(
-            {
-                "name": entry.name,
-                "path": str(entry),
-                "size": stats.st_size,
-                "modified": datetime.fromtimestamp(stats.st_mtime).isoformat(),
-            }
-        )
+    return {"ok": True, "count": len(payload), "files": payload, "next_cursor": next_cursor}
+
+
+@router.post("/retention")
+def run_retention(
+    gzip_after_days: Optional[float] = Query(None),
+    max_age_days: Optional[float] = Query(None),
+    max_bytes: Optional[int] = Query(None),
+):
+    """Gzippt/löscht alte Exporte nach den Retention-Regeln (Standard aus EXPORT_* Settings)."""
+    stats = export_catalog.apply_retention(
+        _resolve_export_dir(),
+        export_catalog.EXPORT_GZIP_AFTER_DAYS if gzip_after_days is None else gzip_after_days,
+        export_catalog.EXPORT_MAX_AGE_DAYS if max_age_days is None else max_age_days,
+        export_catalog.EXPORT_MAX_BYTES if max_bytes is None else max_bytes,
+    )
+    return {"ok": True, **stats}
+
 
-    return {"ok": True, "count": len(payload), "files": payload}
+@router.post("/columnar")
+def export_columnar(
+    tables: Optional[str] = Query(None, description="Kommagetrennt: lead,interaction,offer,offer_item,audit"),
+    format: str = Query("parquet", description="parquet | arrow"),
+):
+    """Schreibt typisierte Spalten-Exporte (Parquet/Arrow IPC) der gewünschten Tabellen."""
+    if not columnar_export.available():
+        raise HTTPException(status_code=501, detail="pyarrow not installed")
+    if format not in columnar_export.FORMATS:
+        raise HTTPException(status_code=400, detail="format must be parquet|arrow")
+    selected = [t.strip() for t in tables.split(",") if t.strip()] if tables else None
+    try:
+        files = columnar_export.export_all(str(_resolve_export_dir()), selected, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"ok": True, "format": format, "files": files}
 
 
 @router.get("/{fname}")
@@ -65,13 +109,24 @@ def get_export(fname: str):
     except ValueError:
         raise HTTPException(status_code=403, detail="Invalid file path")
     
-    if not file_path.exists() or not file_path.is_file():
-        raise HTTPException(status_code=404, detail="File not found")
+    compressed = False
+    if not file_path.is_file():
+        # Abgeleitete Formate (CSV/XLSX/MD) entstehen erst beim ersten Abruf aus dem kanonischen JSON
+        try:
+            rendered = render(str(file_path))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error rendering file: {str(e)}")
+        if rendered is None:
+            # Von der Retention gegzippt: komprimiert ausliefern
+            gz_path = file_path.with_name(file_path.name + ".gz")
+            if not gz_path.is_file():
+                raise HTTPException(status_code=404, detail="File not found")
+            file_path, compressed = gz_path, True
     
     # Für JSON-Dateien: Direkt als JSON zurückgeben
-    if file_path.suffix.lower() == ".json":
+    if fname.lower().endswith(".json"):
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
+            with (gzip.open if compressed else open)(file_path, "rt", encoding="utf-8") as f:
                 data = json.load(f)
             return JSONResponse(content=data)
         except json.JSONDecodeError:
@@ -84,13 +139,17 @@ def get_export(fname: str):
         ".csv": "text/csv",
         ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         ".md": "text/markdown",
+        ".parquet": "application/vnd.apache.parquet",
+        ".arrow": "application/vnd.apache.arrow.file",
+        ".pdf": "application/pdf",
     }
-    media_type = media_type_map.get(file_path.suffix.lower(), "application/octet-stream")
+    media_type = media_type_map.get(Path(fname).suffix.lower(), "application/octet-stream")
     
     return FileResponse(
         path=str(file_path),
         media_type=media_type,
         filename=fname,
+        headers={"Content-Encoding": "gzip"} if compressed else None,
     )
 
 
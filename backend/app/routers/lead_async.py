@@ -1,7 +1,7 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
-import json, time, uuid, os, sys
+import json, os, sys
 
 # Import lead_tasks and lead_providers from backend root
 # Adjust path: from backend/app/routers/lead_async.py to backend/lead_tasks.py
@@ -9,15 +9,17 @@ _backend_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')
 if _backend_root not in sys.path:
     sys.path.insert(0, _backend_root)
 try:
-    from lead_tasks import SessionLocal, LeadTask, save_task, update_task, get_task
-    from lead_providers import search_with_fallbacks, fetch_leads
+    from lead_tasks import get_task, get_engine
+    from lead_providers import search_with_fallbacks, fetch_contact, dedupe
 except ImportError:
     # Fallback: try importing from backend module
     sys.path.insert(0, os.path.abspath(os.path.join(_backend_root, '..')))
-    from backend.lead_tasks import SessionLocal, LeadTask, save_task, update_task, get_task
-    from backend.lead_providers import search_with_fallbacks, fetch_leads
+    from backend.lead_tasks import get_task, get_engine
+    from backend.lead_providers import search_with_fallbacks, fetch_contact, dedupe
 
 from app.services.lead_pipeline import run_real
+from app.services.fetch_pool import DomainLimiter, FETCH_MAX_WORKERS
+from app.services.stage_pipeline import Pipeline, Stage, stage_workers
 
 
 
@@ -39,89 +41,114 @@ class HuntParams(BaseModel):
 
     outreach: bool = False
 
+    priority: int = 5
 
 
-def _do_hunt(task_id: str, p: HuntParams):
 
-    sess = SessionLocal()
+def _do_hunt(task_id: str, params: dict, token, progress) -> dict:
 
-    try:
+    p = HuntParams(**params)
 
-        t = sess.get(LeadTask, task_id)
+    query = f'{p.category} {p.location} kontakt email telefon'
 
-        if not t: return
+    limiter = DomainLimiter()
 
-        t.status = "running"; t.progress = 5.0; save_task(sess,t)
+    pipeline = Pipeline("web_hunt", [
 
-        query = f'{p.category} {p.location} kontakt email telefon'
+        Stage("search", lambda q: search_with_fallbacks(q, limit=max(p.count*3, 30), per_provider=20, timeout=20, should_stop=token)[:max(p.count*2,50)], expand=True),
 
-        links = search_with_fallbacks(query, limit=max(p.count*3, 30), per_provider=20, timeout=20)
+        Stage("fetch", lambda u: fetch_contact(u, timeout=15, limiter=limiter, stop=token.event), workers=stage_workers("fetch", FETCH_MAX_WORKERS)),
 
-        update_task(task_id, progress=25.0)
+    ], should_stop=token)
 
-        leads = fetch_leads(links, timeout=15, limit=max(p.count*2,50))
+    has_contact = lambda l: bool(l.get("email") or l.get("phone"))
 
-        # cut to requested count
+    leads = []
 
-        leads = leads[:p.count]
+    hits = 0
 
-        update_task(task_id, progress=70.0)
+    # Fortschritt 0..70 % nach gefundenen Kontakten, gebündelt geschrieben
 
-        # optional: save to DB (reuse existing leads flow if present)
+    for lead in pipeline.iter([query]):
 
-        result = {"found": len(leads), "leads": leads}
+        leads.append(lead)
 
-        # optional Excel export
+        hits += has_contact(lead)
 
-        if p.export_excel:
+        progress.update(progress=70.0 * min(hits, p.count) / max(p.count, 1))
 
-            from openpyxl import Workbook
+        if hits >= p.count: break
 
-            from datetime import datetime
+    token.raise_if_cancelled()
 
-            data_dir = os.environ.get("FREIRAUM_DATA_DIR") or "data"
+    # cut to requested count
 
-            exp_dir = os.path.join(data_dir, "exports"); os.makedirs(exp_dir, exist_ok=True)
+    leads = dedupe(leads)[:p.count]
 
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    progress.update(progress=70.0)
 
-            path = os.path.join(exp_dir, f"leads_async_{ts}.xlsx")
+    # optional: save to DB (reuse existing leads flow if present)
 
-            wb = Workbook(); ws = wb.active; ws.title="leads"
+    result = {"found": len(leads), "leads": leads}
 
-            ws.append(["name","domain","email","phone","source"])
+    # optional Excel export
 
-            for l in leads: ws.append([l.get("name"),l.get("domain"),l.get("email"),l.get("phone"),l.get("source")])
+    if p.export_excel:
 
-            wb.save(path)
+        from openpyxl import Workbook
 
-            result["excel"] = path
+        from datetime import datetime
 
-        update_task(task_id, progress=95.0, result=json.dumps(result), status="done")
+        data_dir = os.environ.get("FREIRAUM_DATA_DIR") or "data"
 
-    except Exception as e:
+        exp_dir = os.path.join(data_dir, "exports"); os.makedirs(exp_dir, exist_ok=True)
 
-        update_task(task_id, status="error", error=str(e))
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    finally:
+        path = os.path.join(exp_dir, f"leads_async_{ts}.xlsx")
 
-        sess.close()
+        wb = Workbook(); ws = wb.active; ws.title="leads"
 
+        ws.append(["name","domain","email","phone","source"])
 
+        for l in leads: ws.append([l.get("name"),l.get("domain"),l.get("email"),l.get("phone"),l.get("source")])
+
+        wb.save(path)
+
+        result["excel"] = path
+
+    progress.update(progress=95.0)
+
+    return result
+
+
+
+_engine = get_engine()
+
+_engine.register("web_hunt", _do_hunt)
 
-@router.post("/lead_hunter/hunt_async")
 
-def hunt_async(p: HuntParams, bg: BackgroundTasks):
 
-    sess = SessionLocal()
+def _start_engine():
+
+    # Worker-Pool erst beim App-Start (nicht beim Import); reiht verwaiste offene Tasks wieder ein
+
+    _engine.start()
+
+
+
+router.add_event_handler("startup", _start_engine)
+
+
+
+@router.post("/lead_hunter/hunt_async")
 
-    t = LeadTask(id=str(uuid.uuid4()), status="queued", progress=0.0, params=p.json())
+def hunt_async(p: HuntParams):
 
-    save_task(sess, t); sess.close()
+    task_id = _engine.submit("web_hunt", p.dict(), priority=p.priority)
 
-    bg.add_task(_do_hunt, t.id, p)
+    return {"ok": True, "task_id": task_id}
 
-    return {"ok": True, "task_id": t.id}
 
 
 class RunRealIn(BaseModel):
@@ -183,9 +210,9 @@ def hunt_status(task_id: str):
 
 def hunt_cancel(task_id: str):
 
-    # cooperative cancel (marks as canceled; worker checks not implemented here)
+    # cooperative cancel: queued Tasks werden sofort verworfen, laufende Fetch-Schleifen prüfen das Token
 
-    update_task(task_id, status="canceled")
+    if not _engine.cancel(task_id): return {"ok": False, "status": "not_found"}
 
     return {"ok": True}
 
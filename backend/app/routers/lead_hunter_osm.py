@@ -1,9 +1,14 @@
+import json
 from fastapi import APIRouter
-from typing import Dict, Any
-from app.services.osm_overpass import fetch_pois
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Any, Optional
+from app.services.osm_overpass import fetch_pois, fetch_pois_multi, resolve_point
+from app.services.spatial_index import get_index
 from app.services.lead_radar import score_list
-from app.services.enrichment import enrich_leads
-from app.services.export_osm_excel import export_osm_excel
+from app.services.enrichment import enrich_staged, iter_enriched
+from app.services.export_osm_excel import workbook_filename
+from app.services import render_farm
 
 router = APIRouter(tags=["lead_hunter_osm"])
 
@@ -18,13 +23,13 @@ def hunt_osm(payload: Dict[str, Any]):
     try:
         rows = fetch_pois(category, location)
         scored = score_list(rows)
-        
-        # Enrichment optional
+
+        # Enrichment als eigene Pipeline-Stufe: Batches über einen gemeinsamen Client, globale und Host-Limits
         if enable_enrichment:
             try:
-                scored = enrich_leads(scored)
-            except Exception as enrich_error:
-                # Log enrichment error but continue with unscored leads
+                scored = enrich_staged(scored)
+            except Exception:
+                # Enrichment-Fehler: Leads ungeändert zurückgeben
                 pass
         
     except Exception as e:
@@ -49,39 +54,153 @@ def hunt_osm(payload: Dict[str, Any]):
     }
 
 
+def _encode_event(event: Dict[str, Any], fmt: str) -> str:
+    data = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+    if fmt == "sse":
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+@router.post("/lead_hunter/osm/hunt_stream")
+async def hunt_osm_stream(payload: Dict[str, Any]):
+    """OSM Lead Hunt als Stream (NDJSON oder SSE): erst gescorte Leads, dann Enrichment-Patches pro Lead"""
+    category = (payload.get("category") or "shk").lower()
+    location = payload.get("location") or "Arnsberg"
+    enable_enrichment = payload.get("enrich", True)
+    fmt = "sse" if (payload.get("format") or "ndjson").lower() == "sse" else "ndjson"
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            rows = await run_in_threadpool(fetch_pois, category, location)
+        except Exception as e:
+            yield _encode_event({"type": "error", "error": str(e)}, fmt)
+            yield _encode_event({"type": "done", "found": 0}, fmt)
+            return
+
+        scored = score_list(rows)
+        yield _encode_event({"type": "start", "found": len(scored), "category": category, "location": location}, fmt)
+        for index, lead in enumerate(scored):
+            yield _encode_event({"type": "lead", "index": index, "lead": lead}, fmt)
+
+        if enable_enrichment:
+            try:
+                async for index, enriched in iter_enriched(scored):
+                    # Nur geänderte/neue Felder übertragen
+                    original = scored[index]
+                    patch = {k: v for k, v in enriched.items() if original.get(k) != v or k not in original}
+                    yield _encode_event({"type": "patch", "index": index, "patch": patch}, fmt)
+            except Exception as e:
+                yield _encode_event({"type": "error", "error": str(e)}, fmt)
+
+        yield _encode_event({"type": "done", "found": len(scored)}, fmt)
+
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/lead_hunter/osm/hunt_multi")
+def hunt_osm_multi(payload: Dict[str, Any]):
+    """OSM Lead Hunt für mehrere Kategorien in einem Ort - eine Overpass-Abfrage für alle Kategorien"""
+    categories = [c.lower() for c in (payload.get("categories") or ["shk"]) if c]
+    location = payload.get("location") or "Arnsberg"
+    enable_enrichment = payload.get("enrich", True)
+
+    try:
+        by_category = fetch_pois_multi(categories, location)
+        by_category = {category: score_list(rows) for category, rows in by_category.items()}
+
+        if enable_enrichment:
+            try:
+                # Ein Enrichment-Lauf über alle Kategorien, danach wieder aufteilen
+                flat = [(category, lead) for category, rows in by_category.items() for lead in rows]
+                enriched = enrich_staged([lead for _, lead in flat])
+                by_category = {category: [] for category in by_category}
+                for (category, _), lead in zip(flat, enriched):
+                    by_category[category].append(lead)
+            except Exception:
+                pass
+    except Exception as e:
+        return {
+            "ok": True,
+            "status": "done",
+            "result": {
+                "found": 0,
+                "categories": {},
+                "error": str(e)
+            }
+        }
+
+    return {
+        "ok": True,
+        "status": "done",
+        "result": {
+            "found": sum(len(rows) for rows in by_category.values()),
+            "categories": {
+                category: {"found": len(rows), "leads": rows}
+                for category, rows in by_category.items()
+            }
+        }
+    }
+
+
+def _center(lat: Optional[float], lon: Optional[float], location: Optional[str]):
+    if lat is not None and lon is not None:
+        return lat, lon
+    if location:
+        return resolve_point(location)
+    return None
+
+
+@router.get("/lead_hunter/osm/nearby")
+def nearby_leads(lat: Optional[float] = None, lon: Optional[float] = None, location: Optional[str] = None,
+                 radius_km: float = 15.0, category: Optional[str] = None, limit: int = 200):
+    """Gespeicherte OSM-Leads im Umkreis um Koordinaten oder einen Ort (ohne neue Overpass-Abfrage)"""
+    center = _center(lat, lon, location)
+    if not center:
+        return {"ok": False, "error": "lat/lon oder location erforderlich"}
+    leads = get_index().radius(center[0], center[1], radius_km, category=category, limit=limit)
+    return {"ok": True, "center": {"lat": center[0], "lon": center[1]}, "found": len(leads), "leads": leads}
+
+
+@router.get("/lead_hunter/osm/nearest")
+def nearest_leads(lat: Optional[float] = None, lon: Optional[float] = None, location: Optional[str] = None,
+                  k: int = 10, category: Optional[str] = None):
+    """Die k nächstgelegenen gespeicherten OSM-Leads"""
+    center = _center(lat, lon, location)
+    if not center:
+        return {"ok": False, "error": "lat/lon oder location erforderlich"}
+    leads = get_index().nearest(center[0], center[1], k=k, category=category)
+    return {"ok": True, "center": {"lat": center[0], "lon": center[1]}, "found": len(leads), "leads": leads}
+
+
+@router.get("/lead_hunter/osm/bbox")
+def bbox_leads(min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+               category: Optional[str] = None, limit: int = 1000):
+    """Gespeicherte OSM-Leads innerhalb einer Box (z.B. Kartenausschnitt)"""
+    leads = get_index().bbox(min_lat, min_lon, max_lat, max_lon, category=category, limit=limit)
+    return {"ok": True, "found": len(leads), "leads": leads}
+
+
 @router.post("/lead_hunter/osm/export")
-def export_osm_leads(payload: Dict[str, Any]):
+async def export_osm_leads(payload: Dict[str, Any]):
     """Exportiert OSM-Leads als Excel"""
     from fastapi.responses import FileResponse
-    import os
-    from pathlib import Path
     
     leads = payload.get("leads", [])
     category = payload.get("category", "")
     city = payload.get("city", "")
     
     try:
-        filename = export_osm_excel(leads, category, city)
-        
-        # Resolve file path
-        export_dir = Path(os.getenv("EXPORT_DIR", "backend/data/exports"))
-        if not export_dir.is_absolute():
-            backend_root = Path(__file__).resolve().parents[2]
-            export_dir = (backend_root / export_dir).resolve()
-        
-        filepath = export_dir / filename
-        
-        if filepath.exists():
-            return FileResponse(
-                path=str(filepath),
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                filename=filename,
-            )
-        else:
-            return {
-                "ok": False,
-                "error": "File not found after export"
-            }
+        # Rendering im Prozess-Pool nach EXPORT_DIR; identische Lead-Listen liefern die vorhandene Datei
+        filepath = await render_farm.render_export(
+            "osm_excel", {"leads": leads}, ("osm_leads", category, city),
+            source="osm_leads", category=category, city=city, rows=len(leads),
+        )
+        return FileResponse(
+            path=filepath,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            filename=workbook_filename(category, city),
+        )
     except Exception as e:
         return {
             "ok": False,
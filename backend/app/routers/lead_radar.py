@@ -1,14 +1,20 @@
 from fastapi import APIRouter
-from typing import List, Dict
-from app.services.lead_radar import score_list
+from typing import List, Dict, Optional
+from app.services.lead_radar import score_list, PROFILES
 
 router = APIRouter(prefix="/api/lead_radar", tags=["lead_radar"])
 
 
 @router.post("/score")
-def lead_radar_score(items: List[Dict]):
-    """Berechnet Lead-Radar-Scores für eine Liste von Leads."""
-    scored = score_list(items or [])
+def lead_radar_score(items: List[Dict], profile: Optional[str] = None):
+    """Berechnet Lead-Radar-Scores für eine Liste von Leads (optional mit Gewichtsprofil)."""
+    scored = score_list(items or [], profile=profile, inplace=True)
     return {"ok": True, "items": scored}
 
 
+@router.get("/profiles")
+def lead_radar_profiles():
+    """Verfügbare Gewichtsprofile."""
+    return {"ok": True, "profiles": PROFILES}
+
+
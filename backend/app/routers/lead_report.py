@@ -1,46 +1,37 @@
+from datetime import datetime
 from fastapi import APIRouter
 from fastapi.responses import FileResponse
 from typing import Dict, Any
-import os
-from pathlib import Path
-from app.services.pdf_report import build_pdf
+from app.services import render_farm
+from app.services.pdf_report import report_filename
 
 router = APIRouter(tags=["lead_report"])
 
 
 @router.post("/lead_hunter/osm/export_pdf")
-def export_pdf(payload: Dict[str, Any]):
+async def export_pdf(payload: Dict[str, Any]):
     """Exportiert OSM-Leads als PDF-Report"""
     leads = payload.get("leads", [])
     category = payload.get("category", "")
     city = payload.get("city", "")
     
     try:
-        filename = build_pdf(leads, category, city)
-        
-        # Resolve file path
-        export_dir = Path(os.getenv("EXPORT_DIR", "backend/data/exports"))
-        if not export_dir.is_absolute():
-            backend_root = Path(__file__).resolve().parents[2]
-            export_dir = (backend_root / export_dir).resolve()
-        
-        filepath = export_dir / filename
-        
-        if filepath.exists():
-            return FileResponse(
-                path=str(filepath),
-                media_type="application/pdf",
-                filename=filename,
-            )
-        else:
-            return {
-                "ok": False,
-                "error": "PDF file not found after generation"
-            }
+        # Rendering im Prozess-Pool nach EXPORT_DIR; identische Lead-Listen liefern den vorhandenen Report
+        # ("Erstellt:" ist der Zeitpunkt des Renderns und zählt nicht zum Eingabe-Hash)
+        filepath = await render_farm.render_export(
+            "osm_report",
+            {"leads": leads, "category": category, "city": city},
+            ("osm_report", category, city),
+            stamp={"created": datetime.now().strftime("%d.%m.%Y %H:%M")},
+            source="osm_report", category=category, city=city, rows=len(leads),
+        )
+        return FileResponse(
+            path=filepath,
+            media_type="application/pdf",
+            filename=report_filename(category, city),
+        )
     except Exception as e:
         return {
             "ok": False,
             "error": str(e)
         }
-
-
@@ -12,6 +12,15 @@ def ping():
     return {"ok": True, "ts": time.time(), "env": settings.env}
 
 
+@router.get("/cache")
+def cache_stats():
+    from ..services.tiered_cache import get_cache
 
+    return {"ok": True, "cache": get_cache().stats()}
 
 
+@router.get("/pipelines")
+def pipeline_stats():
+    from ..services.stage_pipeline import recent_metrics
+
+    return {"ok": True, "pipelines": recent_metrics()}
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Dict
+
+from fastapi import APIRouter, Body, HTTPException
+from fastapi.responses import FileResponse
+
+from app.services.render_farm import RENDERERS, get_farm
+
+router = APIRouter(prefix="/api/render", tags=["render"])
+
+MEDIA_TYPES = {
+    ".pdf": "application/pdf",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+@router.get("/kinds")
+def kinds():
+    return {"ok": True, "kinds": sorted(RENDERERS)}
+
+
+@router.get("/jobs")
+def list_jobs():
+    return {"ok": True, "jobs": get_farm().jobs()}
+
+
+@router.post("/{kind}")
+async def submit(kind: str, payload: Dict[str, Any] = Body(default={}), wait: float = 0.0):
+    """Startet einen Render-Job; bei gleichen Eingaben kommt sofort das vorhandene Ergebnis"""
+    try:
+        job = get_farm().submit(kind, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if wait > 0 and job.future is not None:
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout=wait)
+        except Exception:
+            pass  # Status steht im Job; Fehler/Timeout sind hier kein Request-Fehler
+    return {"ok": True, "job": job.as_dict()}
+
+
+@router.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = get_farm().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"ok": True, "job": job.as_dict()}
+
+
+@router.get("/jobs/{job_id}/file")
+def job_file(job_id: str):
+    job = get_farm().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job {job.status}")
+    suffix = RENDERERS[job.kind][0]
+    return FileResponse(path=job.path, media_type=MEDIA_TYPES.get(suffix, "application/octet-stream"),
+                        filename=f"{job.kind}_{job.key[:12]}{suffix}")
@@ -1,13 +1,14 @@
 import os
-import json
 import hashlib
-from pathlib import Path
 from typing import List, Dict, Optional
-from datetime import datetime, timedelta
 
-CACHE_DIR = Path(os.getenv("CACHE_DIR", "backend/data/cache/osm"))
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
+from .tiered_cache import get_cache
+from .lead_dedupe import dedupe_leads, normalize_company
+
+CACHE_NAMESPACE = "osm"
 CACHE_TTL_SECONDS = int(os.getenv("OSM_CACHE_TTL_SECONDS", "86400"))
+# Abrufstand für inkrementelle Overpass-Aktualisierungen (rohe Zeilen je OSM-Element + Zeitstempel)
+STATE_NAMESPACE = "osm_state"
 
 
 def make_key(category: str, city: str) -> str:
@@ -16,84 +17,43 @@ def make_key(category: str, city: str) -> str:
     return hashlib.sha1(key_str.encode()).hexdigest()
 
 
-def load_cache(key: str) -> Optional[Dict]:
-    """Lädt Cache-Daten für einen Key"""
-    cache_file = CACHE_DIR / f"{key}.json"
-    if not cache_file.exists():
-        return None
-    
+def load_cache(key: str) -> Optional[List[Dict]]:
+    """Lädt Cache-Daten für einen Key (None bei Miss oder abgelaufener TTL)"""
     try:
-        with open(cache_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        # Prüfe TTL
-        cached_at = datetime.fromisoformat(data.get("cached_at", ""))
-        age = (datetime.now() - cached_at).total_seconds()
-        
-        if age > CACHE_TTL_SECONDS:
-            # Cache abgelaufen
-            cache_file.unlink()
-            return None
-        
-        return data.get("leads", [])
+        return get_cache().get(CACHE_NAMESPACE, key)
     except Exception:
         return None
 
 
 def save_cache(key: str, leads: List[Dict]) -> None:
     """Speichert Leads im Cache"""
-    cache_file = CACHE_DIR / f"{key}.json"
     try:
-        data = {
-            "cached_at": datetime.now().isoformat(),
-            "leads": leads
-        }
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        get_cache().set(CACHE_NAMESPACE, key, leads, ttl=CACHE_TTL_SECONDS)
+    except Exception:
+        pass
+
+
+def load_state(key: str) -> Optional[Dict]:
+    """Lädt den letzten Abrufstand für einen Key"""
+    try:
+        return get_cache().get(STATE_NAMESPACE, key)
+    except Exception:
+        return None
+
+
+def save_state(key: str, state: Dict) -> None:
+    """Speichert den Abrufstand (lange TTL, siehe tiered_cache.NAMESPACE_TTLS)"""
+    try:
+        get_cache().set(STATE_NAMESPACE, key, state)
     except Exception:
         pass
 
 
 def normalize_name(name: str) -> str:
     """Normalisiert einen Firmennamen für Deduplizierung"""
-    if not name:
-        return ""
-    return name.strip().casefold()
+    return normalize_company(name)
 
 
 def dedupe(leads: List[Dict]) -> List[Dict]:
-    """Dedupliziert Leads nach normalisiertem Namen + Stadt, bevorzugt enriched Leads"""
-    if not leads:
-        return leads
-    
-    # Gruppiere nach (normalized_name, normalized_city)
-    grouped = {}
-    for lead in leads:
-        name = normalize_name(lead.get("company", ""))
-        city = normalize_name(lead.get("city", ""))
-        key = (name, city)
-        
-        if key not in grouped:
-            grouped[key] = []
-        grouped[key].append(lead)
-    
-    # Für jede Gruppe: bevorzuge enriched Lead (hat mehr Kontaktdaten)
-    deduped = []
-    for key, group_leads in grouped.items():
-        if len(group_leads) == 1:
-            deduped.append(group_leads[0])
-        else:
-            # Sortiere: enriched zuerst, dann nach Score
-            sorted_leads = sorted(
-                group_leads,
-                key=lambda x: (
-                    "enriched" in str(x.get("source", "")).lower(),
-                    x.get("score", 0)
-                ),
-                reverse=True
-            )
-            deduped.append(sorted_leads[0])
-    
-    return deduped
-
-
+    """Fuzzy-Deduplizierung (Name/Ort, Domain, Telefon), bevorzugt enriched Leads"""
+    return dedupe_leads(leads)
@@ -0,0 +1,222 @@
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, JSON, select
+
+from . import export_catalog
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow optional: Spalten-Export ist dann nicht verfügbar
+    pa = None
+
+# Typisierte, komprimierte Spalten-Exporte (Parquet oder Arrow IPC) für Analyse-Tools
+COLUMNAR_BATCH_SIZE = int(os.getenv("COLUMNAR_BATCH_SIZE", "10000"))
+COLUMNAR_COMPRESSION = os.getenv("COLUMNAR_COMPRESSION", "zstd")
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+MODEL_TABLES = ["lead", "interaction", "offer", "offer_item"]
+AUDIT_TABLE = "audit"
+TABLES = MODEL_TABLES + [AUDIT_TABLE]
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow nicht installiert (pip install pyarrow)")
+
+
+def _json_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _sql_datetime(value: Any) -> Optional[datetime]:
+    # SQLite liefert bei Core-Selects teils Strings statt datetime
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _iso_utc(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).astimezone(timezone.utc)
+
+
+def _column_spec(column) -> Tuple[Any, Optional[Callable[[Any], Any]]]:
+    """Arrow-Typ und optionaler Konverter zu einer SQLAlchemy-Spalte"""
+    kind = column.type
+    if isinstance(kind, Boolean):
+        return pa.bool_(), None
+    if isinstance(kind, Integer):
+        return pa.int64(), None
+    if isinstance(kind, Float):
+        return pa.float64(), None
+    if isinstance(kind, DateTime):
+        return pa.timestamp("us"), _sql_datetime
+    if isinstance(kind, JSON):
+        return pa.string(), _json_text
+    return pa.string(), None
+
+
+def table_schema(table) -> Tuple[Any, List[Optional[Callable[[Any], Any]]]]:
+    fields, converters = [], []
+    for column in table.columns:
+        kind, convert = _column_spec(column)
+        fields.append(pa.field(column.name, kind, nullable=True))
+        converters.append(convert)
+    return pa.schema(fields), converters
+
+
+def audit_schema() -> Tuple[Any, List[Optional[Callable[[Any], Any]]]]:
+    spec = [
+        ("id", pa.int64(), None),
+        ("ts", pa.timestamp("ms", tz="UTC"), _iso_utc),
+        ("user_id", pa.string(), None),
+        ("action", pa.string(), None),
+        ("entity_type", pa.string(), None),
+        ("entity_id", pa.string(), None),
+        ("level", pa.string(), None),
+        ("ip", pa.string(), None),
+        ("user_agent", pa.string(), None),
+        ("path", pa.string(), None),
+        ("method", pa.string(), None),
+        ("status", pa.int64(), None),
+        ("payload_json", pa.string(), None),
+    ]
+    return pa.schema([pa.field(name, kind) for name, kind, _ in spec]), [convert for _, _, convert in spec]
+
+
+def _batches(rows: Iterable[Sequence[Any]], schema, converters, batch_size: int) -> Iterator[Any]:
+    """Bildet aus Zeilen spaltenweise RecordBatches fester Größe"""
+    columns: List[List[Any]] = [[] for _ in schema]
+    count = 0
+    for row in rows:
+        for i, value in enumerate(row):
+            convert = converters[i]
+            columns[i].append(convert(value) if convert and value is not None else value)
+        count += 1
+        if count >= batch_size:
+            yield pa.RecordBatch.from_arrays([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema)
+            columns = [[] for _ in schema]
+            count = 0
+    if count:
+        yield pa.RecordBatch.from_arrays([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema)
+
+
+def write_batches(path: str, schema, batches: Iterable[Any], fmt: str = "parquet") -> int:
+    """Schreibt Batches nacheinander (ein Row-Group/Record-Batch pro Batch); liefert die Zeilenzahl"""
+    _require_pyarrow()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unbekanntes Format: {fmt}")
+    tmp = path + ".tmp"
+    rows = 0
+    try:
+        if fmt == "parquet":
+            with pq.ParquetWriter(tmp, schema, compression=COLUMNAR_COMPRESSION) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+        else:
+            options = pa_ipc.IpcWriteOptions(compression=COLUMNAR_COMPRESSION)
+            with pa_ipc.new_file(tmp, schema, options=options) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return rows
+
+
+def export_table(engine, table, path: str, fmt: str = "parquet", batch_size: int = COLUMNAR_BATCH_SIZE) -> int:
+    """Exportiert eine SQLAlchemy-Tabelle per Server-Cursor (yield_per), sortiert nach Primärschlüssel"""
+    _require_pyarrow()
+    schema, converters = table_schema(table)
+    query = select(*table.columns).order_by(*table.primary_key.columns)
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=batch_size).execute(query)
+        return write_batches(path, schema, _batches(result, schema, converters, batch_size), fmt)
+
+
+def export_audit(db_path: str, path: str, fmt: str = "parquet", batch_size: int = COLUMNAR_BATCH_SIZE) -> int:
+    _require_pyarrow()
+    schema, converters = audit_schema()
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(f"SELECT {', '.join(schema.names)} FROM audit_log ORDER BY id")
+        cursor.arraysize = batch_size
+        rows = (row for chunk in iter(lambda: cursor.fetchmany(batch_size), []) for row in chunk)
+        return write_batches(path, schema, _batches(rows, schema, converters, batch_size), fmt)
+    finally:
+        conn.close()
+
+
+def _model_tables() -> Dict[str, Any]:
+    try:
+        from backend.models import Interaction, Lead, Offer, OfferItem
+    except ImportError:
+        from models import Interaction, Lead, Offer, OfferItem
+    return {m.__tablename__: m.__table__ for m in (Lead, Interaction, Offer, OfferItem)}
+
+
+def _default_engine():
+    try:
+        from backend.db import engine
+    except ImportError:
+        from db import engine
+    return engine
+
+
+def _default_audit_db() -> str:
+    try:
+        from backend.audit_logger import AUDIT_DB
+    except ImportError:
+        from audit_logger import AUDIT_DB
+    return AUDIT_DB
+
+
+def export_all(
+    outdir: str,
+    tables: Optional[Sequence[str]] = None,
+    fmt: str = "parquet",
+    engine=None,
+    audit_db: Optional[str] = None,
+    batch_size: int = COLUMNAR_BATCH_SIZE,
+) -> List[Dict[str, Any]]:
+    """Exportiert die gewünschten Tabellen nach `outdir`; eine Datei pro Tabelle"""
+    _require_pyarrow()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unbekanntes Format: {fmt}")
+    tables = list(tables or TABLES)
+    unknown = [t for t in tables if t not in TABLES]
+    if unknown:
+        raise ValueError(f"Unbekannte Tabellen: {unknown}")
+    os.makedirs(outdir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    model_tables = _model_tables()
+    out: List[Dict[str, Any]] = []
+    for name in tables:
+        path = os.path.join(outdir, f"{name}_{stamp}{FORMATS[fmt]}")
+        if name == AUDIT_TABLE:
+            db_path = audit_db or _default_audit_db()
+            rows = export_audit(db_path, path, fmt, batch_size) if os.path.exists(db_path) else None
+        else:
+            rows = export_table(engine or _default_engine(), model_tables[name], path, fmt, batch_size)
+        if rows is None:
+            continue
+        export_catalog.register(path, source=name, rows=rows)
+        out.append({"table": name, "name": os.path.basename(path), "path": path, "rows": rows, "size": os.path.getsize(path)})
+    return out
@@ -1,107 +1,131 @@
+import os
 import re
+import asyncio
+import logging
+import threading
 import httpx
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
+from . import page_cache
+from .stage_pipeline import Pipeline, Stage, stage_workers
+
+logger = logging.getLogger(__name__)
+
+# Concurrency-Limits für die async Enrichment-Engine
+ENRICH_MAX_CONCURRENCY = int(os.getenv("ENRICH_MAX_CONCURRENCY", "20"))
+ENRICH_PER_HOST_CONCURRENCY = int(os.getenv("ENRICH_PER_HOST_CONCURRENCY", "2"))
+ENRICH_LEAD_BUDGET_SECONDS = float(os.getenv("ENRICH_LEAD_BUDGET_SECONDS", "15"))
+# Enrichment-Stufe: Leads laufen in Batches durch, Batches parallel per PIPELINE_WORKERS_ENRICH
+ENRICH_BATCH_SIZE = int(os.getenv("ENRICH_BATCH_SIZE", "25"))
+ENRICH_STAGE_WORKERS = 2
+
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+IMPRESSUM_KEYWORDS = ["impressum", "imprint", "legal", "rechtliches", "kontakt", "contact"]
+COMMON_PATHS = ["/impressum", "/imprint", "/legal", "/rechtliches", "/kontakt", "/contact"]
+REQUIRED_FIELDS = ["company", "category", "city", "street", "postcode", "phone", "email", "website", "score", "source", "lat", "lon"]
+
+
+def find_impressum_in_html(html: str, website_url: str) -> Optional[str]:
+    """Sucht einen Impressum-/Kontakt-Link im HTML der Hauptseite"""
+    soup = BeautifulSoup(html, "html.parser")
+    for link in soup.find_all("a", href=True):
+        href = link.get("href", "").lower()
+        text = link.get_text().lower()
+        if any(keyword in href or keyword in text for keyword in IMPRESSUM_KEYWORDS):
+            return urljoin(website_url, link["href"])
+    return None
+
+
+def extract_contacts_from_html(html: str) -> Dict[str, Optional[str]]:
+    """Extrahiere Telefon und E-Mail aus bereits geladenem HTML"""
+    result = {"phone": None, "email": None}
+    soup = BeautifulSoup(html, "html.parser")
+    page_text = soup.get_text()
+
+    # Telefonnummer Regex
+    phone_pattern = r'\+?\d[\d\s\/\-\(\)]{6,}'
+    phone_matches = re.findall(phone_pattern, page_text)
+    if phone_matches:
+        # Nimm die erste gefundene Nummer
+        phone = phone_matches[0].strip()
+        # Bereinige
+        phone = re.sub(r'[\s\(\)]', '', phone)
+        result["phone"] = phone
+
+    # Email Regex
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    email_matches = re.findall(email_pattern, page_text)
+    if email_matches:
+        # Filtere typische Nicht-Email-Adressen
+        valid_emails = [e for e in email_matches if not any(
+            skip in e.lower() for skip in ["example.com", "test.com", "domain.com", "image", "logo"]
+        )]
+        if valid_emails:
+            result["email"] = valid_emails[0]
+
+    # Suche auch in mailto-Links
+    for link in soup.find_all("a", href=True):
+        href = link.get("href", "")
+        if href.startswith("mailto:"):
+            email = href.replace("mailto:", "").split("?")[0]
+            if email:
+                result["email"] = email
+                break
+
+    return result
 
 
 def fetch_impressum_links(website_url: str) -> Optional[str]:
     """Finde Impressum-URL auf einer Website"""
     if not website_url or not website_url.startswith(("http://", "https://")):
         return None
-    
+
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        with httpx.Client(timeout=10.0, headers=headers, follow_redirects=True) as client:
+        with httpx.Client(timeout=10.0, headers=BROWSER_HEADERS, follow_redirects=True) as client:
             # Versuche Hauptseite
-            response = client.get(website_url)
+            response = page_cache.get(client, website_url)
             if response.status_code != 200:
                 return None
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Suche nach Impressum-Links
-            impressum_keywords = ["impressum", "imprint", "legal", "rechtliches", "kontakt", "contact"]
-            
-            # Suche in Links
-            for link in soup.find_all("a", href=True):
-                href = link.get("href", "").lower()
-                text = link.get_text().lower()
-                if any(keyword in href or keyword in text for keyword in impressum_keywords):
-                    impressum_url = urljoin(website_url, link["href"])
-                    return impressum_url
-            
+
+            impressum_url = find_impressum_in_html(response.text, website_url)
+            if impressum_url:
+                return impressum_url
+
             # Versuche direkte Impressum-URLs
             base_url = f"{urlparse(website_url).scheme}://{urlparse(website_url).netloc}"
-            common_paths = ["/impressum", "/imprint", "/legal", "/rechtliches", "/kontakt", "/contact"]
-            for path in common_paths:
+            for path in COMMON_PATHS:
                 try:
                     test_url = urljoin(base_url, path)
-                    test_response = client.get(test_url, timeout=5.0)
+                    test_response = page_cache.get(client, test_url, timeout=5.0)
                     if test_response.status_code == 200:
                         return test_url
                 except Exception:
                     continue
     except Exception:
         pass
-    
+
     return None
 
 
 def extract_contacts_from_page(url: str) -> Dict[str, Optional[str]]:
     """Extrahiere Kontaktdaten von einer Seite"""
     result = {"phone": None, "email": None}
-    
+
     if not url:
         return result
-    
+
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        with httpx.Client(timeout=10.0, headers=headers, follow_redirects=True) as client:
-            response = client.get(url)
+        with httpx.Client(timeout=10.0, headers=BROWSER_HEADERS, follow_redirects=True) as client:
+            response = page_cache.get(client, url)
             if response.status_code != 200:
                 return result
-            
-            text = response.text
-            soup = BeautifulSoup(text, "html.parser")
-            page_text = soup.get_text()
-            
-            # Telefonnummer Regex
-            phone_pattern = r'\+?\d[\d\s\/\-\(\)]{6,}'
-            phone_matches = re.findall(phone_pattern, page_text)
-            if phone_matches:
-                # Nimm die erste gefundene Nummer
-                phone = phone_matches[0].strip()
-                # Bereinige
-                phone = re.sub(r'[\s\(\)]', '', phone)
-                result["phone"] = phone
-            
-            # Email Regex
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            email_matches = re.findall(email_pattern, page_text)
-            if email_matches:
-                # Filtere typische Nicht-Email-Adressen
-                valid_emails = [e for e in email_matches if not any(
-                    skip in e.lower() for skip in ["example.com", "test.com", "domain.com", "image", "logo"]
-                )]
-                if valid_emails:
-                    result["email"] = valid_emails[0]
-            
-            # Suche auch in mailto-Links
-            for link in soup.find_all("a", href=True):
-                href = link.get("href", "")
-                if href.startswith("mailto:"):
-                    email = href.replace("mailto:", "").split("?")[0]
-                    if email:
-                        result["email"] = email
-                        break
+            result = extract_contacts_from_html(response.text)
     except Exception:
         pass
-    
+
     return result
 
 
@@ -109,10 +133,10 @@ def normalize_phone_e164(phone: str) -> str:
     """Normalisiere Telefonnummer nach E.164, wenn möglich"""
     if not phone:
         return phone
-    
+
     # Entferne alle Nicht-Ziffern außer +
     cleaned = re.sub(r'[^\d+]', '', phone)
-    
+
     # Wenn mit + beginnt, behalte es
     if cleaned.startswith("+"):
         # Prüfe auf gültige Ländervorwahl (1-3 Ziffern)
@@ -130,89 +154,283 @@ def normalize_phone_e164(phone: str) -> str:
             cleaned = "+49" + cleaned
             if len(cleaned) <= 15:
                 return cleaned
-    
+
     # Fallback: Original zurückgeben
     return phone
 
 
+def _normalize_website(website: Optional[str]) -> str:
+    website = website or ""
+    if website and not website.startswith(("http://", "https://")):
+        website = f"https://{website}"
+    return website
+
+
+def _finalize_lead(lead: Dict, state: Dict) -> Dict:
+    """Baut aus Lead + gesammelten Enrichment-Daten den angereicherten Lead"""
+    enriched_lead = lead.copy()
+    # Behalte bestehenden source oder setze auf enriched
+    existing_source = enriched_lead.get("source", "osm")
+    enriched_lead["source"] = f"{existing_source}/enriched" if existing_source != "enriched" else "enriched"
+
+    enriched_lead["proof_impressum_url"] = state.get("impressum_url")
+    enriched_lead["proof_contact_url"] = state.get("contact_url")
+
+    contacts = state.get("contacts") or {}
+    # Überschreibe nur wenn noch nicht vorhanden
+    if not enriched_lead.get("phone") and contacts.get("phone"):
+        enriched_lead["phone"] = contacts["phone"]
+    if not enriched_lead.get("email") and contacts.get("email"):
+        enriched_lead["email"] = contacts["email"]
+
+    # Normalisiere vorhandene Telefonnummer
+    if enriched_lead.get("phone"):
+        enriched_lead["phone"] = normalize_phone_e164(enriched_lead["phone"])
+
+    # Stelle sicher, dass alle erforderlichen Felder vorhanden sind
+    for field in REQUIRED_FIELDS:
+        if field not in enriched_lead:
+            if field == "score":
+                enriched_lead[field] = 0
+            elif field in ["lat", "lon"]:
+                enriched_lead[field] = None
+            else:
+                enriched_lead[field] = ""
+
+    return enriched_lead
+
+
+class _Limits:
+    """Globales Concurrency-Limit plus ein Semaphore pro Host"""
+
+    def __init__(self, max_concurrency: int, per_host: int):
+        self.global_sem = asyncio.Semaphore(max(max_concurrency, 1))
+        self.per_host = max(per_host, 1)
+        self.hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def host(self, url: str) -> asyncio.Semaphore:
+        netloc = urlparse(url).netloc.lower()
+        sem = self.hosts.get(netloc)
+        if sem is None:
+            sem = self.hosts[netloc] = asyncio.Semaphore(self.per_host)
+        return sem
+
+
+async def _get_text(client: httpx.AsyncClient, limits: _Limits, url: str, timeout: float = 10.0) -> Optional[str]:
+    """GET mit Host- und Global-Limit über den Seiten-Cache; liefert HTML bei 200, sonst None"""
+    # Erst den Host-Slot, dann den globalen Slot belegen, damit wartende
+    # Requests auf einen vollen Host keine globalen Slots blockieren
+    async with limits.host(url):
+        async with limits.global_sem:
+            try:
+                response = await page_cache.aget(client, url, timeout=timeout)
+            except Exception:
+                return None
+    if response.status_code != 200:
+        return None
+    return response.text
+
+
+async def _probe_common_paths(client: httpx.AsyncClient, limits: _Limits, website: str) -> Optional[str]:
+    """Prüft die Standard-Impressum-Pfade parallel, erster Treffer in Pfad-Reihenfolge gewinnt"""
+    parsed = urlparse(website)
+    base_url = f"{parsed.scheme}://{parsed.netloc}"
+    urls = [urljoin(base_url, path) for path in COMMON_PATHS]
+    pages = await asyncio.gather(*[_get_text(client, limits, u, timeout=5.0) for u in urls])
+    for url, html in zip(urls, pages):
+        if html is not None:
+            return url
+    return None
+
+
+async def _collect(client: httpx.AsyncClient, limits: _Limits, lead: Dict, state: Dict) -> None:
+    """Sammelt Impressum-URL und Kontaktdaten für einen Lead in state"""
+    website = _normalize_website(lead.get("website"))
+    home_html = None
+
+    if website:
+        home_html = await _get_text(client, limits, website)
+        if home_html is not None:
+            state["impressum_url"] = find_impressum_in_html(home_html, website)
+            if not state["impressum_url"]:
+                state["impressum_url"] = await _probe_common_paths(client, limits, website)
+
+    # Kontaktdaten nur suchen, wenn noch etwas fehlt
+    if lead.get("phone") and lead.get("email"):
+        return
+
+    impressum_url = state.get("impressum_url")
+    if impressum_url:
+        html = home_html if impressum_url == website else await _get_text(client, limits, impressum_url)
+        if html is not None:
+            state["contacts"] = extract_contacts_from_html(html)
+            state["contact_url"] = impressum_url
+
+    contacts = state.get("contacts") or {}
+    if not contacts.get("phone") and not contacts.get("email") and home_html is not None:
+        state["contacts"] = extract_contacts_from_html(home_html)
+        state["contact_url"] = website
+
+
+async def _enrich_one(client: httpx.AsyncClient, limits: _Limits, lead: Dict, budget: float) -> Dict:
+    """Reichert einen Lead innerhalb des Zeitbudgets an; bei Timeout zählt der bisherige Stand"""
+    state: Dict = {"impressum_url": None, "contact_url": None, "contacts": None}
+    try:
+        await asyncio.wait_for(_collect(client, limits, lead, state), timeout=budget)
+    except asyncio.TimeoutError:
+        logger.info(f"Enrichment-Budget überschritten für {lead.get('website')}")
+    except Exception as e:
+        logger.warning(f"Enrichment fehlgeschlagen für {lead.get('website')}: {e}")
+    return _finalize_lead(lead, state)
+
+
+def _new_client(max_concurrency: int, transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    client_limits = httpx.Limits(max_connections=max(max_concurrency, 1), max_keepalive_connections=max(max_concurrency, 1))
+    return httpx.AsyncClient(
+        headers=BROWSER_HEADERS,
+        follow_redirects=True,
+        timeout=10.0,
+        limits=client_limits,
+        transport=transport,
+    )
+
+
+async def enrich_leads_async(
+    leads: List[Dict],
+    max_concurrency: int = ENRICH_MAX_CONCURRENCY,
+    per_host: int = ENRICH_PER_HOST_CONCURRENCY,
+    lead_budget: float = ENRICH_LEAD_BUDGET_SECONDS,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> List[Dict]:
+    """Bereichert alle Leads nebenläufig über einen gemeinsamen AsyncClient"""
+    if not leads:
+        return []
+
+    limits = _Limits(max_concurrency, per_host)
+    async with _new_client(max_concurrency, transport) as client:
+        return list(await asyncio.gather(*[_enrich_one(client, limits, lead, lead_budget) for lead in leads]))
+
+
+async def iter_enriched(
+    leads: List[Dict],
+    max_concurrency: int = ENRICH_MAX_CONCURRENCY,
+    per_host: int = ENRICH_PER_HOST_CONCURRENCY,
+    lead_budget: float = ENRICH_LEAD_BUDGET_SECONDS,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> AsyncIterator[Tuple[int, Dict]]:
+    """Wie enrich_leads_async, liefert aber (Index, Lead) in Fertigstellungs-Reihenfolge"""
+    if not leads:
+        return
+
+    limits = _Limits(max_concurrency, per_host)
+    async with _new_client(max_concurrency, transport) as client:
+        async def _indexed(i: int, lead: Dict) -> Tuple[int, Dict]:
+            return i, await _enrich_one(client, limits, lead, lead_budget)
+
+        tasks = [asyncio.ensure_future(_indexed(i, lead)) for i, lead in enumerate(leads)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client trennt die Verbindung → restliche Fetches abbrechen
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _run_coroutine(coro):
+    """Führt eine Coroutine aus sync-Code aus, auch wenn im Thread bereits ein Loop läuft"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    box: Dict = {}
+
+    def _runner():
+        try:
+            box["result"] = asyncio.run(coro)
+        except BaseException as e:  # pragma: no cover - wird im Aufrufer erneut geworfen
+            box["error"] = e
+
+    t = threading.Thread(target=_runner, daemon=True)
+    t.start()
+    t.join()
+    if "error" in box:
+        raise box["error"]
+    return box["result"]
+
+
 def enrich_leads(leads: List[Dict]) -> List[Dict]:
     """Bereichere Leads mit Kontaktdaten aus Impressum"""
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    enriched = []
-    
-    for lead in leads:
-        enriched_lead = lead.copy()
-        # Behalte bestehenden source oder setze auf enriched
-        existing_source = enriched_lead.get("source", "osm")
-        enriched_lead["source"] = f"{existing_source}/enriched" if existing_source != "enriched" else "enriched"
-        
-        # Initialisiere Proof-Links
-        enriched_lead["proof_contact_url"] = None
-        enriched_lead["proof_impressum_url"] = None
-        
-        website = lead.get("website", "")
-        if website and not website.startswith(("http://", "https://")):
-            website = f"https://{website}"
-        
-        # Versuche Impressum zu finden
-        impressum_url = None
-        if website:
+    if not leads:
+        return []
+    return _run_coroutine(enrich_leads_async(leads))
+
+
+class EnrichmentSession:
+    """Gemeinsamer AsyncClient samt Limits auf einem eigenen Loop-Thread; enrich() ist aus beliebigen Threads aufrufbar"""
+
+    def __init__(
+        self,
+        max_concurrency: int = ENRICH_MAX_CONCURRENCY,
+        per_host: int = ENRICH_PER_HOST_CONCURRENCY,
+        lead_budget: float = ENRICH_LEAD_BUDGET_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.lead_budget = lead_budget
+        self.transport = transport
+        self._limits = _Limits(max_concurrency, per_host)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="enrich-session", daemon=True)
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _open(self) -> None:
+        self._client = _new_client(self.max_concurrency, self.transport)
+
+    async def _enrich(self, leads: List[Dict]) -> List[Dict]:
+        return list(await asyncio.gather(*[_enrich_one(self._client, self._limits, lead, self.lead_budget) for lead in leads]))
+
+    def enrich(self, leads: List[Dict]) -> List[Dict]:
+        return self._call(self._enrich(leads))
+
+    def __enter__(self) -> "EnrichmentSession":
+        self._thread.start()
+        self._call(self._open())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        try:
+            if self._client is not None:
+                self._call(self._client.aclose())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+
+def enrich_staged(leads: List[Dict], batch_size: int = ENRICH_BATCH_SIZE,
+                  transport: Optional[httpx.AsyncBaseTransport] = None) -> List[Dict]:
+    """Enrichment als Pipeline-Stufe: Batches teilen sich Client und Limits, Reihenfolge der Leads bleibt erhalten"""
+    if not leads:
+        return []
+    batch_size = max(batch_size, 1)
+    out = list(leads)
+    with EnrichmentSession(transport=transport) as session:
+        def _batch(item: Tuple[int, List[Dict]]) -> Tuple[int, List[Dict]]:
+            start, batch = item
             try:
-                impressum_url = fetch_impressum_links(website)
-                enriched_lead["proof_impressum_url"] = impressum_url
+                return start, session.enrich(batch)
             except Exception as e:
-                logger.warning(f"Impressum nicht gefunden für {website}: {e}")
-                enriched_lead["proof_impressum_url"] = None
-        
-        # Wenn noch keine Kontaktdaten vorhanden
-        if not enriched_lead.get("phone") or not enriched_lead.get("email"):
-            # Extrahiere Kontaktdaten
-            contacts = {"phone": None, "email": None}
-            contact_url = None
-            
-            if impressum_url:
-                try:
-                    contacts = extract_contacts_from_page(impressum_url)
-                    contact_url = impressum_url
-                except Exception:
-                    pass
-            
-            if (not contacts.get("phone") and not contacts.get("email")) and website:
-                try:
-                    contacts = extract_contacts_from_page(website)
-                    contact_url = website
-                except Exception:
-                    pass
-            
-            # Setze Proof-Contact-URL
-            if contact_url:
-                enriched_lead["proof_contact_url"] = contact_url
-            
-            # Überschreibe nur wenn noch nicht vorhanden
-            if not enriched_lead.get("phone") and contacts.get("phone"):
-                enriched_lead["phone"] = normalize_phone_e164(contacts["phone"])
-            
-            if not enriched_lead.get("email") and contacts.get("email"):
-                enriched_lead["email"] = contacts["email"]
-        
-        # Normalisiere vorhandene Telefonnummer
-        if enriched_lead.get("phone"):
-            enriched_lead["phone"] = normalize_phone_e164(enriched_lead["phone"])
-        
-        # Stelle sicher, dass alle erforderlichen Felder vorhanden sind
-        required_fields = ["company", "category", "city", "street", "postcode", "phone", "email", "website", "score", "source", "lat", "lon"]
-        for field in required_fields:
-            if field not in enriched_lead:
-                if field == "score":
-                    enriched_lead[field] = 0
-                elif field in ["lat", "lon"]:
-                    enriched_lead[field] = None
-                else:
-                    enriched_lead[field] = ""
-        
-        enriched.append(enriched_lead)
-    
-    return enriched
+                # Enrichment-Fehler: Batch unverändert übernehmen
+                logger.warning("Enrichment-Batch fehlgeschlagen: %s", e)
+                return start, batch
 
+        pipeline = Pipeline("enrich", [Stage("enrich", _batch, workers=stage_workers("enrich", ENRICH_STAGE_WORKERS))])
+        for start, batch in pipeline.iter((start, leads[start:start + batch_size]) for start in range(0, len(leads), batch_size)):
+            out[start:start + len(batch)] = batch
+    return out
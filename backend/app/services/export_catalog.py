@@ -0,0 +1,281 @@
+import base64
+import gzip
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Katalog aller Export-Dateien: Exporter tragen ein, was sie schreiben; die Liste kommt per Index statt iterdir/stat
+EXPORT_CATALOG_DB = Path(os.getenv("EXPORT_CATALOG_DB", "backend/data/export_catalog.db"))
+if not EXPORT_CATALOG_DB.is_absolute():
+    # wie EXPORT_DIR relativ zum Backend-Root, nicht zum Arbeitsverzeichnis
+    EXPORT_CATALOG_DB = (Path(__file__).resolve().parents[2] / EXPORT_CATALOG_DB).resolve()
+# Retention: Text-Exporte nach n Tagen gzippen, nach m Tagen löschen, Gesamtgröße begrenzen
+EXPORT_GZIP_AFTER_DAYS = float(os.getenv("EXPORT_GZIP_AFTER_DAYS", "7"))
+EXPORT_MAX_AGE_DAYS = float(os.getenv("EXPORT_MAX_AGE_DAYS", "90"))
+EXPORT_MAX_BYTES = int(os.getenv("EXPORT_MAX_BYTES", str(2 * 1024 ** 3)))
+
+KINDS = {".csv", ".xlsx", ".json", ".md", ".ndjson", ".parquet", ".arrow", ".pdf"}
+# Bereits komprimierte Formate (ZIP/zstd/PDF-Streams) bringen mit gzip nichts
+GZIP_KINDS = {"csv", "json", "md", "ndjson"}
+
+_init_lock = threading.Lock()
+_initialized_for: Optional[Path] = None
+_synced: set = set()
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized_for
+    EXPORT_CATALOG_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(EXPORT_CATALOG_DB), timeout=10)
+    if _initialized_for != EXPORT_CATALOG_DB:
+        with _init_lock:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS export_catalog (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE,
+                    path TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    source TEXT,
+                    category TEXT,
+                    city TEXT,
+                    rows INTEGER,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    compressed INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_export_catalog_created ON export_catalog(created_at, id);
+                CREATE INDEX IF NOT EXISTS idx_export_catalog_kind ON export_catalog(kind, created_at, id);
+                CREATE INDEX IF NOT EXISTS idx_export_catalog_category ON export_catalog(category, created_at, id);
+                CREATE INDEX IF NOT EXISTS idx_export_catalog_city ON export_catalog(city, created_at, id);
+                """
+            )
+            conn.commit()
+            _initialized_for = EXPORT_CATALOG_DB
+    return conn
+
+
+def kind_of(name: str) -> str:
+    base = name[:-3] if name.endswith(".gz") else name
+    return os.path.splitext(base)[1].lstrip(".").lower()
+
+
+def register(
+    path: str,
+    source: Optional[str] = None,
+    category: Optional[str] = None,
+    city: Optional[str] = None,
+    rows: Optional[int] = None,
+    created_at: Optional[float] = None,
+) -> None:
+    """Trägt eine geschriebene Export-Datei ein (oder aktualisiert sie); Fehler brechen den Export nie ab"""
+    try:
+        stat = os.stat(path)
+        name = os.path.basename(path)
+        conn = _connect()
+        try:
+            conn.execute(
+                """
+                INSERT INTO export_catalog (name, path, kind, source, category, city, rows, size, compressed, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    path = excluded.path, size = excluded.size, compressed = excluded.compressed,
+                    source = COALESCE(excluded.source, source), category = COALESCE(excluded.category, category),
+                    city = COALESCE(excluded.city, city), rows = COALESCE(excluded.rows, rows)
+                """,
+                (name, os.path.realpath(path), kind_of(name), source, category or None, city or None, rows,
+                 stat.st_size, int(name.endswith(".gz")), created_at or stat.st_mtime),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception:
+        pass
+
+
+def lookup(name: str) -> Optional[Dict[str, Any]]:
+    try:
+        conn = _connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute("SELECT * FROM export_catalog WHERE name = ?", (name,)).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return dict(row) if row else None
+
+
+def _encode_cursor(created_at: float, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at!r}:{row_id}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit(":", 1)
+        return float(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Ungültiger Cursor")
+
+
+def list_page(
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    kind: Optional[str] = None,
+    category: Optional[str] = None,
+    city: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Neueste zuerst, Keyset-Pagination über (created_at, id); liefert (Einträge, nächster Cursor)"""
+    where, args = [], []
+    if kind:
+        where.append("kind = ?")
+        args.append(kind.lower().lstrip("."))
+    if category:
+        where.append("category = ?")
+        args.append(category)
+    if city:
+        where.append("city = ?")
+        args.append(city)
+    if cursor:
+        created_at, row_id = _decode_cursor(cursor)
+        where.append("(created_at < ? OR (created_at = ? AND id < ?))")
+        args.extend([created_at, created_at, row_id])
+    limit = max(1, min(limit, 500))
+    sql = "SELECT * FROM export_catalog"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    conn = _connect()
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = [dict(r) for r in conn.execute(sql, args + [limit + 1])]
+    finally:
+        conn.close()
+    next_cursor = _encode_cursor(rows[limit - 1]["created_at"], rows[limit - 1]["id"]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _delete(names: List[str]) -> None:
+    if not names:
+        return
+    conn = _connect()
+    try:
+        conn.executemany("DELETE FROM export_catalog WHERE name = ?", [(n,) for n in names])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _is_export(entry: Path) -> bool:
+    name = entry.name[:-3] if entry.name.endswith(".gz") else entry.name
+    return entry.is_file() and os.path.splitext(name)[1].lower() in KINDS
+
+
+def sync_dir(directory: Path) -> Dict[str, int]:
+    """Gleicht Katalog und Verzeichnis ab (Altbestand eintragen, verschwundene Dateien austragen)"""
+    directory = Path(directory)
+    on_disk = {entry.name: entry for entry in directory.iterdir() if _is_export(entry)} if directory.exists() else {}
+    conn = _connect()
+    try:
+        known = {name: path for name, path in conn.execute("SELECT name, path FROM export_catalog")}
+    finally:
+        conn.close()
+    root = str(directory.resolve())
+    gone = [name for name, path in known.items() if os.path.dirname(path) == root and name not in on_disk]
+    _delete(gone)
+    added = 0
+    for name, entry in on_disk.items():
+        if name not in known:
+            register(str(entry))
+            added += 1
+    return {"added": added, "removed": len(gone)}
+
+
+def ensure_synced(directory: Path) -> None:
+    """Einmal pro Prozess und Verzeichnis abgleichen (Bestand vor Einführung des Katalogs)"""
+    key = str(Path(directory).resolve())
+    if key not in _synced:
+        sync_dir(Path(directory))
+        _synced.add(key)
+
+
+def _gzip(path: str) -> str:
+    target = path + ".gz"
+    tmp = target + ".tmp"
+    with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, target)
+    # Zeitstempel erhalten, damit Alter und Sortierung gleich bleiben
+    stat = os.stat(path)
+    os.utime(target, (stat.st_atime, stat.st_mtime))
+    os.remove(path)
+    return target
+
+
+def apply_retention(
+    directory: Path,
+    gzip_after_days: float = EXPORT_GZIP_AFTER_DAYS,
+    max_age_days: float = EXPORT_MAX_AGE_DAYS,
+    max_bytes: int = EXPORT_MAX_BYTES,
+    now: Optional[float] = None,
+) -> Dict[str, int]:
+    """Gzippt ältere Text-Exporte, löscht abgelaufene und danach die ältesten, bis das Größenbudget passt"""
+    sync_dir(Path(directory))
+    now = now or time.time()
+    conn = _connect()
+    conn.row_factory = sqlite3.Row
+    try:
+        root = str(Path(directory).resolve())
+        rows = [dict(r) for r in conn.execute("SELECT * FROM export_catalog ORDER BY created_at ASC, id ASC")
+                if os.path.dirname(r["path"]) == root]
+    finally:
+        conn.close()
+
+    stats = {"gzipped": 0, "expired": 0, "evicted": 0, "bytes_freed": 0}
+    keep: List[Dict[str, Any]] = []
+    removed: List[str] = []
+    for row in rows:
+        age_days = (now - row["created_at"]) / 86400
+        if max_age_days and age_days > max_age_days:
+            stats["bytes_freed"] += row["size"]
+            _remove_file(row["path"])
+            removed.append(row["name"])
+            stats["expired"] += 1
+            continue
+        if gzip_after_days and age_days > gzip_after_days and not row["compressed"] and row["kind"] in GZIP_KINDS:
+            try:
+                target = _gzip(row["path"])
+            except OSError:
+                keep.append(row)
+                continue
+            removed.append(row["name"])
+            register(target, created_at=row["created_at"], source=row["source"], category=row["category"],
+                     city=row["city"], rows=row["rows"])
+            stats["bytes_freed"] += row["size"] - os.path.getsize(target)
+            row = {**row, "name": os.path.basename(target), "path": target, "size": os.path.getsize(target)}
+            stats["gzipped"] += 1
+        keep.append(row)
+
+    total = sum(r["size"] for r in keep)
+    for row in keep:  # älteste zuerst
+        if total <= max_bytes:
+            break
+        _remove_file(row["path"])
+        removed.append(row["name"])
+        total -= row["size"]
+        stats["bytes_freed"] += row["size"]
+        stats["evicted"] += 1
+    _delete(removed)
+    return stats
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,119 @@
+import os
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from .lead_dedupe import normalize_domain
+
+T = TypeVar("T")
+
+# Gleichzeitige Seitenabrufe insgesamt
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+# Höflichkeit pro Domain: Requests pro Sekunde und erlaubter Burst
+FETCH_DOMAIN_RATE = float(os.getenv("FETCH_DOMAIN_RATE", "1.0"))
+FETCH_DOMAIN_BURST = int(os.getenv("FETCH_DOMAIN_BURST", "2"))
+_POLL_SECONDS = 0.25
+
+
+class TokenBucket:
+    """Token-Bucket: `rate` Tokens pro Sekunde, höchstens `burst` auf Vorrat"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 0.001)
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        # Nimmt ein Token (ggf. auf Vorschuss) und liefert die nötige Wartezeit
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, stop: Optional[threading.Event] = None) -> bool:
+        """Blockiert bis ein Token frei ist; False, wenn vorher abgebrochen wurde"""
+        delay = self._reserve()
+        if delay <= 0:
+            return True
+        if stop is None:
+            time.sleep(delay)
+            return True
+        return not stop.wait(delay)
+
+
+class DomainLimiter:
+    """Ein Token-Bucket pro Domain"""
+
+    def __init__(self, rate: float = FETCH_DOMAIN_RATE, burst: int = FETCH_DOMAIN_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        domain = normalize_domain(url) or url
+        with self._lock:
+            bucket = self._buckets.get(domain)
+            if bucket is None:
+                bucket = self._buckets[domain] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+
+def fetch_pool(
+    urls: Iterable[str],
+    fetch: Callable[[str], Optional[T]],
+    want: Optional[int] = None,
+    accept: Optional[Callable[[T], bool]] = None,
+    max_workers: int = FETCH_MAX_WORKERS,
+    limiter: Optional[DomainLimiter] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Iterator[Tuple[str, T]]:
+    """Ruft URLs parallel ab und liefert (url, Ergebnis) in Fertigstellungsreihenfolge.
+
+    Leere Ergebnisse und Fehler werden übersprungen. Sobald `want` Ergebnisse `accept` erfüllen
+    (oder `should_stop` greift), werden die restlichen Abrufe verworfen."""
+    urls = list(urls)
+    if not urls:
+        return
+    limiter = limiter or DomainLimiter()
+    stop = threading.Event()
+
+    def work(url: str):
+        if stop.is_set() or not limiter.bucket(url).acquire(stop):
+            return None
+        return fetch(url)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))), thread_name_prefix="fetch")
+    accepted = 0
+    done_count = 0
+    try:
+        pending = {pool.submit(work, url): url for url in urls}
+        while pending:
+            if should_stop and should_stop():
+                break
+            done, _ = wait(pending, timeout=_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                done_count += 1
+                if on_progress:
+                    on_progress(done_count, len(urls))
+                try:
+                    result = future.result()
+                except Exception:
+                    continue
+                if not result:
+                    continue
+                yield url, result
+                if accept is None or accept(result):
+                    accepted += 1
+                if want is not None and accepted >= want:
+                    return
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
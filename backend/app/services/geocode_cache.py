@@ -0,0 +1,128 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+GEOCODE_DB = Path(os.getenv("GEOCODE_DB", "backend/data/cache/geocode.db"))
+if not GEOCODE_DB.is_absolute():
+    GEOCODE_DB = (Path(__file__).resolve().parents[2] / GEOCODE_DB).resolve()
+# Relation-IDs von Orten ändern sich praktisch nie
+GEOCODE_TTL_SECONDS = int(os.getenv("GEOCODE_TTL_SECONDS", str(180 * 86400)))
+# "Nicht gefunden" nur kurz merken, damit Tippfehler-Korrekturen in OSM durchkommen
+GEOCODE_NEGATIVE_TTL_SECONDS = int(os.getenv("GEOCODE_NEGATIVE_TTL_SECONDS", "86400"))
+
+_init_lock = threading.Lock()
+_initialized_for: Optional[Path] = None
+
+
+def normalize_location(location: str) -> str:
+    """Normalisiert einen Ortsnamen als Cache-Key ("  Neheim, Deutschland" → "neheim")"""
+    key = (location or "").strip().casefold()
+    key = re.sub(r",?\s*(deutschland|germany)$", "", key)
+    key = re.sub(r"\s+", " ", key)
+    return key.strip(" ,")
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized_for
+    GEOCODE_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(GEOCODE_DB), timeout=10)
+    if _initialized_for != GEOCODE_DB:
+        with _init_lock:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS geocode (
+                    location_key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    area_id INTEGER,
+                    osm_type TEXT,
+                    osm_id INTEGER,
+                    display_name TEXT,
+                    lat REAL,
+                    lon REAL,
+                    resolved_at REAL NOT NULL
+                )
+                """
+            )
+            # Ältere Datenbanken ohne Koordinaten nachrüsten
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(geocode)")}
+            for column in ("lat", "lon"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE geocode ADD COLUMN {column} REAL")
+            conn.commit()
+            _initialized_for = GEOCODE_DB
+    return conn
+
+
+def lookup(location: str) -> Tuple[bool, Optional[int]]:
+    """Gibt (hit, area_id) zurück; hit=True mit area_id=None ist ein gecachtes "nicht gefunden" """
+    key = normalize_location(location)
+    if not key:
+        return False, None
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT area_id, resolved_at FROM geocode WHERE location_key = ?", (key,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return False, None
+    area_id, resolved_at = row
+    ttl = GEOCODE_TTL_SECONDS if area_id is not None else GEOCODE_NEGATIVE_TTL_SECONDS
+    if time.time() - resolved_at > ttl:
+        return False, None
+    return True, area_id
+
+
+def lookup_point(location: str) -> Optional[Tuple[float, float]]:
+    """Gecachter Mittelpunkt (lat, lon) eines Ortes oder None"""
+    key = normalize_location(location)
+    if not key:
+        return None
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT lat, lon, resolved_at FROM geocode WHERE location_key = ?", (key,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row or row[0] is None or row[1] is None:
+        return None
+    if time.time() - row[2] > GEOCODE_TTL_SECONDS:
+        return None
+    return row[0], row[1]
+
+
+def store(location: str, area_id: Optional[int], osm_type: Optional[str] = None,
+          osm_id: Optional[int] = None, display_name: Optional[str] = None,
+          lat: Optional[float] = None, lon: Optional[float] = None) -> None:
+    """Speichert ein Geocoding-Ergebnis; area_id=None speichert ein negatives Ergebnis"""
+    key = normalize_location(location)
+    if not key:
+        return
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO geocode (location_key, query, area_id, osm_type, osm_id, display_name, lat, lon, resolved_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, location, area_id, osm_type, osm_id, display_name, lat, lon, time.time()),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def stats() -> Dict[str, int]:
+    """Anzahl positiver und negativer Einträge"""
+    conn = _connect()
+    try:
+        positive, negative = conn.execute(
+            "SELECT COUNT(area_id), COUNT(*) - COUNT(area_id) FROM geocode"
+        ).fetchone()
+    finally:
+        conn.close()
+    return {"positive": positive or 0, "negative": negative or 0}
@@ -0,0 +1,147 @@
+import csv
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from . import export_catalog
+from .xlsx_stream import new_workbook, row_getter, write_sheet
+
+# Ein Export = ein kanonisches, kompaktes JSON; CSV/XLSX/MD werden erst beim ersten Abruf daraus gerendert
+CANONICAL_SUFFIX = ".json"
+DEFAULT_FIELDS = ["company", "city", "category", "website", "email", "phone", "source", "ts"]
+HASH_LENGTH = 16
+
+_render_locks: Dict[str, threading.Lock] = {}
+_render_locks_guard = threading.Lock()
+
+
+def canonical_bytes(rows: List[Dict]) -> bytes:
+    """Kompakte, deterministische Serialisierung (Grundlage für den Inhalts-Hash)"""
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8")
+
+
+def content_hash(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()[:HASH_LENGTH]
+
+
+def fieldnames(rows: List[Dict]) -> List[str]:
+    return sorted({key for row in rows for key in row.keys()}) if rows else list(DEFAULT_FIELDS)
+
+
+def _atomic_write(path: str, write: Callable[[str], None]) -> None:
+    # Erst in eine Temp-Datei, dann umbenennen: Leser sehen nie halb geschriebene Exporte
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def write_canonical(rows: List[Dict], outdir: str, prefix: str,
+                    category: Optional[str] = None, city: Optional[str] = None) -> str:
+    """Schreibt das kanonische JSON; identischer Inhalt wird wiederverwendet statt neu geschrieben"""
+    os.makedirs(outdir, exist_ok=True)
+    payload = canonical_bytes(rows)
+    path = os.path.join(outdir, f"{prefix}_{content_hash(payload)}{CANONICAL_SUFFIX}")
+    if not os.path.exists(path) and not os.path.exists(path + ".gz"):
+        def write(tmp: str) -> None:
+            with open(tmp, "wb") as handle:
+                handle.write(payload)
+        _atomic_write(path, write)
+        export_catalog.register(path, source=prefix, category=category, city=city, rows=len(rows))
+    return path
+
+
+def _existing(path: str) -> Optional[str]:
+    # Von der Retention gegzippte Dateien zählen weiter als vorhanden
+    for candidate in (path, path + ".gz"):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def load_rows(canonical_path: str) -> List[Dict]:
+    opener = gzip.open if canonical_path.endswith(".gz") else open
+    with opener(canonical_path, "rt", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _render_csv(rows: List[Dict], fields: List[str], path: str, base: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+def _render_xlsx(rows: List[Dict], fields: List[str], path: str, base: str) -> None:
+    workbook = new_workbook()
+    values = row_getter(fields)
+    write_sheet(workbook, "leads", fields, (values(row) for row in rows), styled=False)
+    workbook.save(path)
+
+
+def _render_md(rows: List[Dict], fields: List[str], path: str, base: str) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(
+            "# LeadHunter Report\n\n"
+            f"- Rows: {len(rows)}\n"
+            f"- Export: {base}.csv, {base}.xlsx, {base}{CANONICAL_SUFFIX}\n"
+        )
+
+
+RENDERERS: Dict[str, Callable[[List[Dict], List[str], str, str], None]] = {
+    ".csv": _render_csv,
+    ".xlsx": _render_xlsx,
+    ".md": _render_md,
+}
+
+
+def canonical_for(path: str) -> Optional[str]:
+    """Pfad des kanonischen JSON zu einer (noch nicht gerenderten) Zieldatei, falls renderbar"""
+    stem, suffix = os.path.splitext(path)
+    if suffix.lower() not in RENDERERS:
+        return None
+    return _existing(stem + CANONICAL_SUFFIX)
+
+
+def _lock_for(path: str) -> threading.Lock:
+    with _render_locks_guard:
+        lock = _render_locks.get(path)
+        if lock is None:
+            lock = _render_locks[path] = threading.Lock()
+        return lock
+
+
+def render(path: str) -> Optional[str]:
+    """Rendert die Zieldatei aus dem kanonischen JSON (einmalig, parallel sicher); None wenn nicht möglich"""
+    if os.path.isfile(path):
+        return path
+    canonical = canonical_for(path)
+    if canonical is None:
+        return None
+    with _lock_for(path):
+        if os.path.isfile(path):
+            return path
+        rows = load_rows(canonical)
+        stem, suffix = os.path.splitext(path)
+        renderer = RENDERERS[suffix.lower()]
+        _atomic_write(path, lambda tmp: renderer(rows, fieldnames(rows), tmp, os.path.basename(stem)))
+        meta = export_catalog.lookup(os.path.basename(canonical)) or {}
+        export_catalog.register(path, source=meta.get("source"), category=meta.get("category"),
+                                city=meta.get("city"), rows=len(rows))
+    return path
+
+
+def export_paths(canonical_path: str) -> Dict[str, str]:
+    """Pfade aller Formate; nur "json" existiert sofort, der Rest entsteht beim Abruf"""
+    stem = os.path.splitext(canonical_path)[0]
+    paths = {"json": canonical_path}
+    for suffix in RENDERERS:
+        paths[suffix.lstrip(".")] = stem + suffix
+    return paths
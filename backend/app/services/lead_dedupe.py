@@ -0,0 +1,272 @@
+import os
+import re
+import struct
+import hashlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# MinHash-Signatur: 16 Hashwerte, LSH mit 4 Bändern à 4 Zeilen (Kandidaten ab ca. 0.7 Jaccard)
+NUM_HASHES = 16
+BANDS = 4
+ROWS = NUM_HASHES // BANDS
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", "0.7"))
+# Entartete LSH-Buckets (z.B. "elektro service") nicht unbegrenzt wachsen lassen
+MAX_BUCKET_SIZE = int(os.getenv("DEDUPE_MAX_BUCKET_SIZE", "500"))
+
+LEGAL_FORMS = {
+    "gmbh", "mbh", "co", "kg", "ag", "ug", "ohg", "gbr", "ek", "ev", "eg", "se", "ltd", "inc",
+    "partg", "partgmbb", "haftungsbeschraenkt", "inh", "inhaber", "und", "the",
+}
+FREEMAIL_DOMAINS = {
+    "gmail.com", "googlemail.com", "web.de", "gmx.de", "gmx.net", "t-online.de", "outlook.com",
+    "outlook.de", "hotmail.com", "hotmail.de", "yahoo.com", "yahoo.de", "freenet.de", "icloud.com",
+    "aol.com", "arcor.de", "online.de", "mail.de", "posteo.de",
+}
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", "é": "e", "è": "e", "á": "a", "à": "a"})
+
+
+def normalize_company(name: Optional[str]) -> str:
+    """Normalisiert Firmennamen: Umlaute, Rechtsformen und Satzzeichen entfernen"""
+    s = (name or "").casefold().translate(_UMLAUTS)
+    s = s.replace("&", " und ").replace("+", " und ")
+    # "e.K.", "e. V.", "GmbH & Co. KG" → Tokens ohne Punkte
+    s = re.sub(r"\b([a-z])\.\s*([a-z])\.", r"\1\2", s)
+    s = re.sub(r"[^a-z0-9]+", " ", s)
+    tokens = [t for t in s.split() if t not in LEGAL_FORMS]
+    return " ".join(tokens)
+
+
+def normalize_domain(value: Optional[str]) -> str:
+    """Host ohne www. aus URL, Domain oder E-Mail-Adresse"""
+    v = (value or "").strip().lower()
+    if not v:
+        return ""
+    if "@" in v and "/" not in v:
+        v = v.rsplit("@", 1)[1]
+    elif "://" in v:
+        v = urlparse(v).netloc
+    else:
+        v = v.split("/", 1)[0]
+    v = v.split(":", 1)[0]
+    return v[4:] if v.startswith("www.") else v
+
+
+def normalize_phone(value: Optional[str]) -> str:
+    """Nationale Ziffernfolge (+49/0049 → 0), mindestens 6 Ziffern, sonst leer"""
+    digits = re.sub(r"\D", "", value or "")
+    if (value or "").strip().startswith("+49"):
+        digits = "0" + digits[2:]
+    elif digits.startswith("0049"):
+        digits = "0" + digits[4:]
+    return digits if len(digits) >= 6 else ""
+
+
+def _first(lead: Dict, *names: str) -> str:
+    for name in names:
+        v = lead.get(name)
+        if isinstance(v, (list, tuple)):
+            v = v[0] if v else ""
+        if v:
+            return str(v)
+    return ""
+
+
+@lru_cache(maxsize=200000)
+def _shingle_hashes(shingle: str) -> Tuple[int, ...]:
+    # Ein blake2b-Digest liefert NUM_HASHES unabhängige 32-Bit-Hashfunktionen
+    digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=4 * NUM_HASHES).digest()
+    return struct.unpack(f"<{NUM_HASHES}I", digest)
+
+
+def minhash(normalized_name: str) -> Optional[Tuple[int, ...]]:
+    """MinHash-Signatur über Zeichen-3-Gramme des normalisierten Namens"""
+    if not normalized_name:
+        return None
+    padded = f" {normalized_name} "
+    shingles = {padded[i:i + 3] for i in range(max(len(padded) - 2, 1))}
+    return tuple(map(min, zip(*(_shingle_hashes(s) for s in shingles))))
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Geschätzte Jaccard-Ähnlichkeit zweier Signaturen"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_HASHES
+
+
+class _Record:
+    __slots__ = ("ref", "name", "sig", "domain", "phone", "email", "postcode", "city")
+
+    def __init__(self, ref, lead: Dict):
+        self.ref = ref
+        self.name = normalize_company(_first(lead, "company", "name", "title"))
+        self.sig = minhash(self.name)
+        email = _first(lead, "email", "contact_email", "emails").strip().lower()
+        self.email = email
+        domain = normalize_domain(_first(lead, "website", "domain", "url", "source_url"))
+        if not domain and email:
+            mail_domain = normalize_domain(email)
+            domain = "" if mail_domain in FREEMAIL_DOMAINS else mail_domain
+        self.domain = domain
+        self.phone = normalize_phone(_first(lead, "phone", "phones"))
+        self.postcode = re.sub(r"\D", "", _first(lead, "postcode"))
+        self.city = normalize_company(_first(lead, "city"))
+
+    def strong_keys(self) -> List[str]:
+        keys = []
+        if self.domain:
+            keys.append("dom:" + self.domain)
+        if self.phone:
+            keys.append("tel:" + self.phone)
+        if self.email:
+            keys.append("mail:" + self.email)
+        return keys
+
+    def block(self) -> str:
+        return self.postcode or self.city
+
+    def bands(self, block: str) -> List[Tuple]:
+        if not self.sig:
+            return []
+        return [(block, b, self.sig[b * ROWS:(b + 1) * ROWS]) for b in range(BANDS)]
+
+
+def _same_place(a: _Record, b: _Record) -> bool:
+    """PLZ bzw. Ort widersprechen sich nicht (Filialen einer Kette bleiben getrennt)"""
+    if a.postcode and b.postcode and a.postcode != b.postcode:
+        return False
+    if not (a.postcode and b.postcode) and a.city and b.city and a.city != b.city:
+        return False
+    return True
+
+
+def _compatible(a: _Record, b: _Record) -> bool:
+    """Namensähnliche Kandidaten nur zusammenführen, wenn nichts dagegen spricht"""
+    if not _same_place(a, b):
+        return False
+    if a.domain and b.domain and a.domain != b.domain:
+        return False
+    return True
+
+
+class DedupeIndex:
+    """Inkrementeller Dublettenindex: exakte Blocking-Keys (Domain/Telefon/E-Mail) plus MinHash-LSH"""
+
+    def __init__(self, threshold: float = DEDUPE_THRESHOLD):
+        self.threshold = threshold
+        # pro Key ein Eintrag je Standort-Cluster (gleiche Domain/Telefonzentrale in mehreren Orten)
+        self._strong: Dict[str, List[_Record]] = {}
+        self._buckets: Dict[Tuple, List[_Record]] = {}
+        self.size = 0
+
+    def _find(self, rec: _Record):
+        for key in rec.strong_keys():
+            for other in self._strong.get(key, ()):
+                if _same_place(rec, other):
+                    return other.ref
+        if not rec.sig:
+            return None
+        # LSH-Buckets sind nach Ort geblockt; Einträge ohne Ort (z.B. aus der lead-Tabelle) liegen im Block ""
+        blocks = [rec.block(), ""] if rec.block() else [""]
+        seen = set()
+        for band in (band for block in blocks for band in rec.bands(block)):
+            for other in self._buckets.get(band, ()):
+                if id(other) in seen:
+                    continue
+                seen.add(id(other))
+                if similarity(rec.sig, other.sig) >= self.threshold and _compatible(rec, other):
+                    return other.ref
+        return None
+
+    def _add_strong(self, rec: _Record) -> None:
+        for key in rec.strong_keys():
+            entries = self._strong.setdefault(key, [])
+            if len(entries) < MAX_BUCKET_SIZE and not any(e.ref == rec.ref for e in entries):
+                entries.append(rec)
+
+    def _add(self, rec: _Record) -> None:
+        self._add_strong(rec)
+        for band in rec.bands(rec.block()):
+            bucket = self._buckets.setdefault(band, [])
+            if len(bucket) < MAX_BUCKET_SIZE:
+                bucket.append(rec)
+        self.size += 1
+
+    def match(self, lead: Dict):
+        """Referenz des bekannten Duplikats oder None"""
+        return self._find(_Record(None, lead))
+
+    def add(self, ref, lead: Dict):
+        """Fügt einen Lead hinzu; liefert die Referenz eines bereits bekannten Duplikats oder None"""
+        rec = _Record(ref, lead)
+        found = self._find(rec)
+        if found is None:
+            self._add(rec)
+        else:
+            # Zusätzliche Identifikatoren des Duplikats dem Cluster zuordnen
+            rec.ref = found
+            self._add_strong(rec)
+        return found
+
+    @classmethod
+    def from_db(cls, session=None, batch_size: int = 1000, threshold: float = DEDUPE_THRESHOLD) -> "DedupeIndex":
+        """Baut den Index über die bestehende lead-Tabelle (gestreamt in Batches)"""
+        try:
+            from backend.db import SessionLocal
+            from backend.models import Lead
+        except ImportError:
+            from db import SessionLocal
+            from models import Lead
+        own = session is None
+        session = session or SessionLocal()
+        index = cls(threshold)
+        try:
+            rows = session.query(Lead.id, Lead.company, Lead.contact_email).yield_per(batch_size)
+            for lead_id, company, email in rows:
+                index.add(lead_id, {"company": company, "email": email})
+        finally:
+            if own:
+                session.close()
+        return index
+
+
+def _rank(lead: Dict) -> Tuple:
+    # enriched zuerst, dann Score, dann Anzahl gefüllter Felder
+    return (
+        "enriched" in str(lead.get("source", "")).lower(),
+        lead.get("score", 0) or 0,
+        sum(1 for v in lead.values() if v not in (None, "", [], {})),
+    )
+
+
+def dedupe_leads(leads: Iterable[Dict], threshold: float = DEDUPE_THRESHOLD) -> List[Dict]:
+    """Fuzzy-Deduplizierung; pro Cluster bleibt der beste Lead, ergänzt um fehlende Felder der anderen"""
+    leads = list(leads)
+    if not leads:
+        return leads
+    index = DedupeIndex(threshold)
+    clusters: Dict[int, List[Dict]] = {}
+    for i, lead in enumerate(leads):
+        found = index.add(i, lead)
+        clusters.setdefault(i if found is None else found, []).append(lead)
+
+    out = []
+    for _, members in sorted(clusters.items()):
+        if len(members) == 1:
+            out.append(members[0])
+            continue
+        best = dict(max(members, key=_rank))
+        for other in members:
+            for k, v in other.items():
+                if not best.get(k) and v:
+                    best[k] = v
+        out.append(best)
+    return out
+
+
+def filter_new(leads: Iterable[Dict], index: DedupeIndex) -> List[Dict]:
+    """Inkrementell: nur Leads, die weder im Index noch untereinander doppelt sind"""
+    out = []
+    for lead in dedupe_leads(leads, index.threshold):
+        if index.add(("new", len(out)), lead) is None:
+            out.append(lead)
+    return out
@@ -1,11 +1,7 @@
-import csv
-import json
 import os
-from datetime import datetime
 from typing import Dict, List
 
-from openpyxl import Workbook
-
+from app.services.lazy_export import export_paths, write_canonical
 from app.services.lead_providers.csv_provider import load_csv_list
 from app.services.lead_providers.web_permitted import crawl
 
@@ -19,46 +15,20 @@ def ensure_dir(path: str) -> str:
   return path
 
 
-def export_rows(rows: List[Dict[str, str]], outdir: str, prefix: str) -> Dict[str, str]:
+def export_rows(rows: List[Dict[str, str]], outdir: str, prefix: str,
+                category: str = "", city: str = "") -> Dict[str, str]:
+  # Nur das kanonische JSON wird geschrieben; CSV/XLSX/MD rendert /api/exports/{fname} bei Bedarf.
+  # Der Dateiname trägt den Inhalts-Hash, identische Läufe verwenden vorhandene Dateien weiter.
   ensure_dir(outdir)
-  timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-  base = os.path.join(outdir, f"{prefix}_{timestamp}")
-
-  fieldnames = (
-    sorted({key for row in rows for key in row.keys()})
-    if rows
-    else ["company", "city", "category", "website", "email", "phone", "source", "ts"]
-  )
-
-  csv_path = base + ".csv"
-  with open(csv_path, "w", newline="", encoding="utf-8") as handle:
-    writer = csv.DictWriter(handle, fieldnames=fieldnames)
-    writer.writeheader()
-    for row in rows:
-      writer.writerow(row)
-
-  workbook = Workbook()
-  sheet = workbook.active
-  sheet.title = "leads"
-  sheet.append(fieldnames)
-  for row in rows:
-    sheet.append([row.get(field, "") for field in fieldnames])
-  xlsx_path = base + ".xlsx"
-  workbook.save(xlsx_path)
-
-  json_path = base + ".json"
-  with open(json_path, "w", encoding="utf-8") as handle:
-    json.dump(rows, handle, ensure_ascii=False, indent=2)
-
-  md_path = base + ".md"
-  with open(md_path, "w", encoding="utf-8") as handle:
-    handle.write(
-      "# LeadHunter Report\n\n"
-      f"- Rows: {len(rows)}\n"
-      f"- Export: {os.path.basename(csv_path)}, {os.path.basename(xlsx_path)}, {os.path.basename(json_path)}\n"
-    )
-
-  return {"csv": csv_path, "xlsx": xlsx_path, "json": json_path, "md": md_path}
+  return export_paths(write_canonical(rows, outdir, prefix, category, city))
+
+
+def _matches(row: Dict[str, str], category: str, location: str) -> bool:
+  if category and row.get("category") and category.lower() not in row.get("category", "").lower():
+    return False
+  if location and row.get("city") and location.lower() not in row.get("city", "").lower():
+    return False
+  return True
 
 
 async def run_real(category: str, location: str) -> Dict[str, str]:
@@ -67,20 +37,8 @@ async def run_real(category: str, location: str) -> Dict[str, str]:
 
   if provider == "csv":
     seed = env("CSV_INPUT", os.path.join("backend", "data", "inputs", "leads_seed.csv"))
-    rows = load_csv_list(seed)
-    if category:
-      rows = [
-        row
-        for row in rows
-        if not row.get("category") or category.lower() in row.get("category", "").lower()
-      ]
-    if location:
-      rows = [
-        row
-        for row in rows
-        if not row.get("city") or location.lower() in row.get("city", "").lower()
-      ]
-    return export_rows(rows, outdir, "leads_real_csv")
+    rows = [row for row in load_csv_list(seed) if _matches(row, category, location)]
+    return export_rows(rows, outdir, "leads_real_csv", category, location)
 
   if provider == "web_permitted":
     allow = [item.strip() for item in env("ALLOWLIST_DOMAINS", "").split(";") if item.strip()]
@@ -101,9 +59,8 @@ async def run_real(category: str, location: str) -> Dict[str, str]:
       seeds.append(f"https://example.com/allowed/branchenbuch?city={loc}")
 
     seeds = sorted(set(seeds))
+    # Ein Crawl über alle Seeds in dieser Event-Loop: ein Client, AIMD-Raten pro Host ohne Thread-Konkurrenz
     rows = await crawl(seeds, allow, rps, concurrency, retry, backoff)
-    return export_rows(rows, outdir, "leads_real_web")
-
-  return export_rows([], outdir, "leads_real_unknown")
-
+    return export_rows(rows, outdir, "leads_real_web", category, location)
 
+  return export_rows([], outdir, "leads_real_unknown", category, location)
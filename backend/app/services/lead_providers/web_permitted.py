@@ -2,7 +2,8 @@ import asyncio
 import os
 import re
 import time
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import httpx
 
@@ -36,7 +37,57 @@ def extract_contacts(html: str, base: str) -> List[Dict[str, str]]:
   return output
 
 
-async def fetch(client: httpx.AsyncClient, url: str, timeout: int = 10) -> Tuple[str, str]:
+# AIMD pro Host: additive Erhöhung bei schnellen Antworten, multiplikative Senkung bei 429/503/Latenzspitzen
+AIMD_DECREASE = 0.5
+AIMD_STEPS_TO_CEILING = 10
+AIMD_LATENCY_SPIKE = 2.0
+AIMD_MIN_SPIKE_SECONDS = 0.5
+AIMD_MIN_RPS = 0.05
+
+
+class AimdRate:
+  """Adaptive Request-Rate für einen Host, gedeckelt durch `ceiling` (Requests/s)"""
+
+  def __init__(self, ceiling: float, start: Optional[float] = None):
+    self.ceiling = max(ceiling, AIMD_MIN_RPS)
+    self.rate = min(self.ceiling, start if start is not None else self.ceiling / 2)
+    self.step = self.ceiling / AIMD_STEPS_TO_CEILING
+    self.latency: Optional[float] = None
+    self._next_slot = 0.0
+
+  def reserve(self) -> float:
+    """Reserviert den nächsten Sendezeitpunkt; liefert die Wartezeit in Sekunden"""
+    now = time.monotonic()
+    slot = max(now, self._next_slot)
+    self._next_slot = slot + 1.0 / self.rate
+    return slot - now
+
+  def on_response(self, status: int, latency: float, retry_after: Optional[float] = None) -> None:
+    spike = (
+      self.latency is not None
+      and latency > AIMD_LATENCY_SPIKE * self.latency
+      and latency > AIMD_MIN_SPIKE_SECONDS
+    )
+    if status in (0, 429, 503) or spike:
+      self.rate = max(AIMD_MIN_RPS, self.rate * AIMD_DECREASE)
+      pause = retry_after if retry_after is not None else 1.0 / self.rate
+      self._next_slot = max(self._next_slot, time.monotonic() + pause)
+    elif status < 500:
+      self.rate = min(self.ceiling, self.rate + self.step)
+    if status and status < 500 and status != 429:
+      self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+
+
+def _retry_after(resp: httpx.Response) -> Optional[float]:
+  value = resp.headers.get("retry-after")
+  try:
+    return min(float(value), 60.0) if value else None
+  except ValueError:
+    return None
+
+
+async def fetch_status(client: httpx.AsyncClient, url: str, timeout: int = 10) -> Tuple[int, str, Optional[float]]:
+  """(Status, HTML bei 200, Retry-After); Status 0 bei Netzwerkfehlern"""
   try:
     resp = await client.get(
       url,
@@ -44,11 +95,14 @@ async def fetch(client: httpx.AsyncClient, url: str, timeout: int = 10) -> Tuple
       follow_redirects=True,
       headers={"User-Agent": "Freiraum-LeadHunter/1.0"},
     )
-    if resp.status_code == 200:
-      return url, resp.text
-    return url, ""
   except Exception:
-    return url, ""
+    return 0, "", None
+  return resp.status_code, resp.text if resp.status_code == 200 else "", _retry_after(resp)
+
+
+async def fetch(client: httpx.AsyncClient, url: str, timeout: int = 10) -> Tuple[str, str]:
+  _, html, _ = await fetch_status(client, url, timeout)
+  return url, html
 
 
 async def crawl(
@@ -58,29 +112,35 @@ async def crawl(
   concurrency: int,
   retry: int,
   backoff_ms: int,
+  transport: Optional[httpx.AsyncBaseTransport] = None,
+  rates: Optional[Dict[str, AimdRate]] = None,
 ) -> List[Dict[str, str]]:
+  """Crawlt erlaubte URLs; `rps` ist die Obergrenze pro Host, die tatsächliche Rate regelt AIMD"""
   filtered = [url for url in urls if domain_allowed(url, allowlist)]
   if not filtered:
     return []
 
   semaphore = asyncio.Semaphore(max(concurrency, 1))
   results: List[Dict[str, str]] = []
-  delay = 1.0 / max(rps, 0.1)
+  rates = {} if rates is None else rates
 
-  async with httpx.AsyncClient() as client:
+  async with httpx.AsyncClient(transport=transport) as client:
     async def one(target: str):
+      host = (urlsplit(target).hostname or target).lower()
+      rate = rates.setdefault(host, AimdRate(rps))
       for attempt in range(retry + 1):
+        # Warten auf den Host-Slot ohne Semaphore, damit andere Hosts weiterlaufen
+        await asyncio.sleep(rate.reserve())
         async with semaphore:
-          await asyncio.sleep(delay)
-          _, html = await fetch(client, target)
-          if html:
-            results.extend(extract_contacts(html, target))
-            return
+          started = time.monotonic()
+          status, html, retry_after = await fetch_status(client, target)
+          rate.on_response(status, time.monotonic() - started, retry_after)
+        if html:
+          results.extend(extract_contacts(html, target))
+          return
+        if status and status < 500 and status != 429:
+          return
         await asyncio.sleep(backoff_ms / 1000.0)
 
     await asyncio.gather(*[one(url) for url in filtered])
   return results
-
-
-
-
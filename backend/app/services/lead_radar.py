@@ -1,4 +1,9 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy optional: Fallback auf die zeilenweise Berechnung
+    np = None
 
 
 # Simple transparent score: presence weights + recency
@@ -11,27 +16,121 @@ WEIGHTS = {
     "source": 5,
 }
 
+# Gewichtsprofile für das Batch-Scoring ("default" entspricht WEIGHTS)
+PROFILES: Dict[str, Dict[str, int]] = {
+    "default": WEIGHTS,
+    "outreach": {"email": 35, "phone": 15, "website": 15, "city": 10, "category": 10, "source": 5},
+    "phone": {"email": 10, "phone": 35, "website": 10, "city": 15, "category": 10, "source": 5},
+}
+
+CATEGORY_BONUS_TERMS = ["shk", "elektro", "heizung", "sanit", "install"]
+CATEGORY_BONUS = 10
+MAX_SCORE = 100
+
+
+def _present(v) -> bool:
+    if isinstance(v, str):
+        return bool(v.strip())
+    return bool(v)
+
+
+def _category_bonus(category) -> int:
+    cat = (category or "").lower()
+    return CATEGORY_BONUS if any(x in cat for x in CATEGORY_BONUS_TERMS) else 0
+
 
 def score_one(r: Dict) -> Dict:
     """Berechnet einen Score für einen einzelnen Lead."""
     s = 0
     for k, w in WEIGHTS.items():
-        v = r.get(k, "")
-        if isinstance(v, str) and v.strip():
+        if _present(r.get(k, "")):
             s += w
-        elif v:
-            s += w
-    
+
     # Bonus wenn explizit SHK/Elektro etc.
-    cat = (r.get("category", "") or "").lower()
-    if any(x in cat for x in ["shk", "elektro", "heizung", "sanit", "install"]):
-        s += 10
-    
+    s += _category_bonus(r.get("category", ""))
+
     return {**r, "score": min(100, s)}
 
 
-def score_list(rows: List[Dict]) -> List[Dict]:
-    """Berechnet Scores für eine Liste von Leads."""
-    return [score_one(r) for r in rows]
+def resolve_profile(profile: Union[str, Dict[str, int], None]) -> Dict[str, int]:
+    """Gewichte zu einem Profilnamen oder eigenem Dict (unbekannt → default)"""
+    if isinstance(profile, dict):
+        return profile
+    return PROFILES.get(profile or "default", WEIGHTS)
+
+
+def presence_matrix(rows: Sequence[Dict], fields: Sequence[str]):
+    """(n, f)-Matrix der Feldbelegung als uint8, spaltenweise gefüllt, ohne Kopien der Leads"""
+    flags = np.zeros((len(rows), len(fields)), dtype=np.uint8)
+    for j, field in enumerate(fields):
+        flags[:, j] = np.fromiter((_present(r.get(field, "")) for r in rows), dtype=np.uint8, count=len(rows))
+    return flags
+
 
+def category_bonus_vector(rows: Sequence[Dict]):
+    """Kategorie-Bonus pro Lead; der Substring-Test läuft nur einmal je Kategorie"""
+    cache: Dict[str, int] = {}
 
+    def bonus(category) -> int:
+        key = category or ""
+        if key not in cache:
+            cache[key] = _category_bonus(key)
+        return cache[key]
+
+    return np.fromiter((bonus(r.get("category", "")) for r in rows), dtype=np.int32, count=len(rows))
+
+
+def _all_fields() -> List[str]:
+    fields: List[str] = []
+    for weights in PROFILES.values():
+        fields.extend(f for f in weights if f not in fields)
+    return fields
+
+
+class LeadFeatures:
+    """Spaltenweise Merkmale eines Lead-Bestands; Neu-Scoring mit anderen Gewichten ist nur noch ein Matrixprodukt"""
+
+    def __init__(self, rows: Sequence[Dict], fields: Optional[Sequence[str]] = None):
+        self.fields = list(fields or _all_fields())
+        self.flags = presence_matrix(rows, self.fields)
+        self.bonus = category_bonus_vector(rows)
+
+    def __len__(self) -> int:
+        return len(self.bonus)
+
+    def score(self, profile: Union[str, Dict[str, int], None] = None):
+        weights = resolve_profile(profile)
+        missing = [f for f in weights if f not in self.fields]
+        if missing:
+            raise KeyError(f"Felder nicht vorberechnet: {missing}")
+        w = np.fromiter((weights.get(f, 0) for f in self.fields), dtype=np.int32, count=len(self.fields))
+        scores = self.flags @ w
+        scores += self.bonus
+        np.minimum(scores, MAX_SCORE, out=scores)
+        return scores
+
+
+def score_batch(rows: Sequence[Dict], profile: Union[str, Dict[str, int], None] = None):
+    """Scores für viele Leads als Vektor (numpy int32; ohne numpy: Liste)"""
+    weights = resolve_profile(profile)
+    if np is None:
+        return [
+            min(MAX_SCORE, sum(w for k, w in weights.items() if _present(r.get(k, ""))) + _category_bonus(r.get("category", "")))
+            for r in rows
+        ]
+    return LeadFeatures(rows, list(weights)).score(weights)
+
+
+def apply_scores(rows: List[Dict], scores) -> List[Dict]:
+    """Schreibt berechnete Scores in die vorhandenen Lead-Dicts"""
+    for r, s in zip(rows, scores.tolist() if hasattr(scores, "tolist") else scores):
+        r["score"] = s
+    return rows
+
+
+def score_list(rows: List[Dict], profile: Optional[Union[str, Dict[str, int]]] = None, inplace: bool = False) -> List[Dict]:
+    """Berechnet Scores für eine Liste von Leads."""
+    scores = score_batch(rows, profile)
+    if inplace:
+        return apply_scores(rows, scores)
+    return [{**r, "score": s} for r, s in zip(rows, scores.tolist() if hasattr(scores, "tolist") else scores)]
@@ -1,133 +1,353 @@
+import os
+import re
 import time
 import json
+import threading
 import httpx
 from typing import Dict, List, Tuple, Optional
 from .osm_filters import OSM_CATEGORY_TAGS, CONTACT_KEYS
-from .cache_dedupe import make_key, load_cache, save_cache, dedupe
+from .cache_dedupe import make_key, load_cache, save_cache, load_state, save_state, dedupe
 from .retry_policy import with_retry
+from . import geocode_cache, spatial_index
 
 NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
 OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 
+# Inkrementelle Aktualisierung nach Ablauf des Caches (newer:-Diff statt Vollabruf)
+OSM_INCREMENTAL = os.getenv("OSM_INCREMENTAL", "1") != "0"
+# Ältere Stände werden komplett neu geladen
+OSM_INCREMENTAL_MAX_AGE_SECONDS = int(os.getenv("OSM_INCREMENTAL_MAX_AGE_SECONDS", str(14 * 86400)))
+
+
+# Nominatim Usage Policy: höchstens 1 Request pro Sekunde
+NOMINATIM_MIN_INTERVAL = float(os.getenv("NOMINATIM_MIN_INTERVAL", "1.0"))
+_nominatim_lock = threading.Lock()
+_nominatim_last_call = 0.0
+
+
+def _nominatim_throttle() -> None:
+    global _nominatim_last_call
+    with _nominatim_lock:
+        wait = _nominatim_last_call + NOMINATIM_MIN_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _nominatim_last_call = time.monotonic()
+
+
+def _nominatim_area(location: str) -> Tuple[Optional[int], Optional[Dict]]:
+    """Fragt Nominatim nach dem Ort; liefert (area_id, Treffer) oder (None, None)"""
+    params = {
+        "q": f"{location}, Deutschland",
+        "format": "json",
+        "limit": 1,
+        "addressdetails": 1
+    }
+    headers = {"User-Agent": "Freiraum-Mitarbeiter/1.0 (contact: local)"}
+    _nominatim_throttle()
+    with httpx.Client(timeout=20.0, headers=headers) as c:
+        r = c.get(NOMINATIM_URL, params=params)
+        r.raise_for_status()
+        arr = r.json()
+    if not arr:
+        return None, None
+    osm_id = arr[0].get("osm_id")
+    osm_type = arr[0].get("osm_type")  # relation/way/node
+    if osm_type == "relation":
+        return 3600000000 + int(osm_id), arr[0]  # area id for relation
+    elif osm_type == "way":
+        return 2400000000 + int(osm_id), arr[0]
+    elif osm_type == "node":
+        return 3600000000 + int(osm_id), arr[0]  # fallback
+    return None, arr[0]
+
 
 def resolve_area_id(location: str) -> Optional[int]:
-    """Get OSM administrative area id for a town/city in DE"""
-    def _resolve():
-        params = {
-            "q": f"{location}, Deutschland",
-            "format": "json",
-            "limit": 1,
-            "addressdetails": 1
-        }
-        headers = {"User-Agent": "Freiraum-Mitarbeiter/1.0 (contact: local)"}
-        with httpx.Client(timeout=20.0, headers=headers) as c:
-            r = c.get(NOMINATIM_URL, params=params)
-            r.raise_for_status()
-            arr = r.json()
-            if not arr:
-                return None
-            osm_id = arr[0].get("osm_id")
-            osm_type = arr[0].get("osm_type")  # relation/way/node
-            if osm_type == "relation":
-                return 3600000000 + int(osm_id)  # area id for relation
-            elif osm_type == "way":
-                return 2400000000 + int(osm_id)
-            elif osm_type == "node":
-                return 3600000000 + int(osm_id)  # fallback
+    """Get OSM administrative area id for a town/city in DE (persistent gecacht)"""
+    hit, area_id = geocode_cache.lookup(location)
+    if hit:
+        return area_id
+    area_id, _ = _geocode(location)
+    return area_id
+
+
+def _geocode(location: str) -> Tuple[Optional[int], Dict]:
+    area_id, match = with_retry(lambda: _nominatim_area(location))
+    match = match or {}
+    osm_id = match.get("osm_id")
+    lat, lon = match.get("lat"), match.get("lon")
+    geocode_cache.store(
+        location,
+        area_id,
+        osm_type=match.get("osm_type"),
+        osm_id=int(osm_id) if osm_id is not None else None,
+        display_name=match.get("display_name"),
+        lat=float(lat) if lat is not None else None,
+        lon=float(lon) if lon is not None else None,
+    )
+    return area_id, match
+
+
+def resolve_point(location: str) -> Optional[Tuple[float, float]]:
+    """Mittelpunkt (lat, lon) eines Ortes für Umkreisabfragen (persistent gecacht)"""
+    point = geocode_cache.lookup_point(location)
+    if point:
+        return point
+    hit, area_id = geocode_cache.lookup(location)
+    if hit and area_id is None:
         return None
-    
-    return with_retry(_resolve)
+    _, match = _geocode(location)
+    if match.get("lat") is None or match.get("lon") is None:
+        return None
+    return float(match["lat"]), float(match["lon"])
 
 
-def _tag_expr(tag: Dict[str, str]) -> str:
-    """e.g. {"craft":"hvac"} -> ["craft"="hvac"]"""
-    k, v = list(tag.items())[0]
-    return f'["{k}"="{v}"]'
+def preload_area_ids(locations: Optional[List[str]] = None) -> Dict[str, Optional[int]]:
+    """Löst bekannte Orte vorab auf (Default: HSK-Städte aus dem Voice-Intent)"""
+    if locations is None:
+        from .voice_intent import CITY_KEYWORDS
+        locations = [city.capitalize() for city in CITY_KEYWORDS]
+    resolved: Dict[str, Optional[int]] = {}
+    for location in locations:
+        try:
+            resolved[location] = resolve_area_id(location)
+        except Exception:
+            # Netzwerkfehler nicht negativ cachen, beim nächsten Hunt erneut versuchen
+            resolved[location] = None
+    return resolved
 
 
-def build_query(category: str, area_id: int) -> str:
-    """Build Overpass QL query for category in area"""
+def _category_tags(category: str) -> List[Dict[str, str]]:
     tags = OSM_CATEGORY_TAGS.get(category.lower(), [])
     if not tags:
         # generic shop fallback
         tags = [{"shop": "*"}]
+    return tags
+
+
+def build_tag_index(categories: List[str]) -> Dict[str, Dict[str, List[str]]]:
+    """Reverse-Index Tag-Key → Tag-Value → Kategorien ("*" = beliebiger Wert)"""
+    index: Dict[str, Dict[str, List[str]]] = {}
+    for category in categories:
+        for tag in _category_tags(category):
+            k, v = list(tag.items())[0]
+            cats = index.setdefault(k, {}).setdefault(v, [])
+            if category not in cats:
+                cats.append(category)
+    return index
+
+
+def _statements(categories: List[str], area_id: int, newer: Optional[str] = None) -> str:
+    index = build_tag_index(categories)
+    flt = f'(newer:"{newer}")' if newer else ""
     lines = []
-    for t in tags:
-        lines.append(f'  node(area:{area_id}){_tag_expr(t)};')
-        lines.append(f'  way(area:{area_id}){_tag_expr(t)};')
-        lines.append(f'  relation(area:{area_id}){_tag_expr(t)};')
-    body = "\n".join(lines)
+    for k, values in index.items():
+        if "*" in values:
+            lines.append(f'  nwr(area:{area_id})["{k}"]{flt};')
+            continue
+        union = "|".join(re.escape(v) for v in sorted(values))
+        lines.append(f'  nwr(area:{area_id})["{k}"~"^({union})$"]{flt};')
+    return "\n".join(lines)
+
+
+def build_multi_query(categories: List[str], area_id: int) -> str:
+    """Build one Overpass QL query (nwr + Regex-Union pro Tag-Key) for many categories in area"""
+    body = _statements(categories, area_id)
     q = f"""
 [out:json][timeout:60];
-area({area_id})->.searchArea;
 (
 {body}
 );
-out tags center 200;
+out tags center {200 * max(len(categories), 1)};
 """
     return q
 
 
-def fetch_pois(category: str, location: str, use_cache: bool = True) -> List[Dict]:
-    """Fetch POIs from OSM Overpass API for category and location"""
-    # Prüfe Cache
-    cache_key = make_key(category, location)
-    if use_cache:
-        cached_leads = load_cache(cache_key)
-        if cached_leads is not None:
-            return cached_leads
-    
-    area_id = resolve_area_id(location)
-    if not area_id:
-        return []
-    
-    q = build_query(category, area_id)
+def build_diff_query(categories: List[str], area_id: int, since: str) -> str:
+    """Diff-Abfrage: seit `since` geänderte Elemente mit Tags, dazu nur die IDs aller aktuellen Treffer (für Löschungen)"""
+    q = f"""
+[out:json][timeout:60];
+(
+{_statements(categories, area_id, newer=since)}
+);
+out tags center;
+(
+{_statements(categories, area_id)}
+);
+out ids;
+"""
+    return q
+
+
+def build_query(category: str, area_id: int) -> str:
+    """Build Overpass QL query for category in area"""
+    return build_multi_query([category], area_id)
+
+
+def _element_to_row(el: Dict, category: str, location: str) -> Dict:
+    tags = el.get("tags", {})
+    row = {}
+
+    # basic identity
+    row["company"] = tags.get("name") or tags.get("operator") or ""
+    row["category"] = category
+
+    # address
+    row["street"] = tags.get("addr:street", "")
+    row["housenumber"] = tags.get("addr:housenumber", "")
+    row["postcode"] = tags.get("addr:postcode", "")
+    row["city"] = tags.get("addr:city", location)  # Fallback auf location
+
+    # contacts
+    row["phone"] = tags.get("phone") or tags.get("contact:phone") or ""
+    row["email"] = tags.get("email") or tags.get("contact:email") or ""
+    row["website"] = tags.get("website") or tags.get("contact:website") or tags.get("url") or ""
+
+    # geo
+    row["lat"] = el.get("lat") or (el.get("center") or {}).get("lat")
+    row["lon"] = el.get("lon") or (el.get("center") or {}).get("lon")
+
+    # source
+    row["source"] = "osm"
+    row["osm_type"] = el.get("type", "")
+    row["osm_id"] = el.get("id")
+    return row
+
+
+def _ref(item: Dict) -> str:
+    if "osm_type" in item:
+        return f"{item.get('osm_type')}/{item.get('osm_id')}"
+    return f"{item.get('type')}/{item.get('id')}"
+
+
+def merge_diff(states: Dict[str, Dict[str, Dict]], elements: List[Dict], location: str) -> List[Dict]:
+    """Führt das Ergebnis einer Diff-Abfrage in die Zeilen pro Kategorie ein; liefert entfernte Zeilen"""
+    changed = [el for el in elements if el.get("tags")]
+    changed_refs = {_ref(el) for el in changed}
+    live = {_ref(el) for el in elements}
+    removed: List[Dict] = []
+    for rows in states.values():
+        for ref in list(rows):
+            if ref in changed_refs or ref not in live:
+                row = rows.pop(ref)
+                if ref not in live:
+                    removed.append(row)
+    # Geänderte Elemente neu zuordnen (Kategorie kann sich durch Tag-Änderungen verschieben)
+    for category, new_rows in split_elements(changed, list(states), location).items():
+        for row in new_rows:
+            states[category][_ref(row)] = row
+    return removed
+
+
+def split_elements(elements: List[Dict], categories: List[str], location: str) -> Dict[str, List[Dict]]:
+    """Verteilt die Elemente einer Sammelabfrage über den Reverse-Index auf ihre Kategorien"""
+    index = build_tag_index(categories)
+    results: Dict[str, List[Dict]] = {category: [] for category in categories}
+    for el in elements:
+        tags = el.get("tags", {})
+        matched: List[str] = []
+        for k in index.keys() & tags.keys():
+            values = index[k]
+            for category in values.get(tags[k], []) + values.get("*", []):
+                if category not in matched:
+                    matched.append(category)
+        for category in matched:
+            results[category].append(_element_to_row(el, category, location))
+    return results
+
+
+def _overpass(q: str) -> Dict:
     headers = {"User-Agent": "Freiraum-Mitarbeiter/1.0 (contact: local)"}
-    
+
     def _fetch_overpass():
         with httpx.Client(timeout=60.0, headers=headers) as c:
             r = c.post(OVERPASS_URL, data={"data": q})
             r.raise_for_status()
             return r.json()
-    
-    data = with_retry(_fetch_overpass)
-    
-    elements = data.get("elements", [])
-    results = []
-    for el in elements:
-        tags = el.get("tags", {})
-        row = {}
-        
-        # basic identity
-        row["company"] = tags.get("name") or tags.get("operator") or ""
-        row["category"] = category
-        
-        # address
-        row["street"] = tags.get("addr:street", "")
-        row["housenumber"] = tags.get("addr:housenumber", "")
-        row["postcode"] = tags.get("addr:postcode", "")
-        row["city"] = tags.get("addr:city", location)  # Fallback auf location
-        
-        # contacts
-        row["phone"] = tags.get("phone") or tags.get("contact:phone") or ""
-        row["email"] = tags.get("email") or tags.get("contact:email") or ""
-        row["website"] = tags.get("website") or tags.get("contact:website") or tags.get("url") or ""
-        
-        # geo
-        row["lat"] = el.get("lat") or (el.get("center") or {}).get("lat")
-        row["lon"] = el.get("lon") or (el.get("center") or {}).get("lon")
-        
-        # source
-        row["source"] = "osm"
-        
-        results.append(row)
-    
-    # Deduplizierung
-    results = dedupe(results)
-    
-    # Speichere im Cache
-    if use_cache:
-        save_cache(cache_key, results)
-    
+
+    return with_retry(_fetch_overpass)
+
+
+def _osm_timestamp(data: Dict, started: float) -> str:
+    """Datenstand der Antwort (osm3s.timestamp_osm_base), sonst Abfragebeginn mit Sicherheitsabstand"""
+    ts = (data.get("osm3s") or {}).get("timestamp_osm_base")
+    if ts:
+        return ts
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(started - 300))
+
+
+def fetch_pois_multi(categories: List[str], location: str, use_cache: bool = True) -> Dict[str, List[Dict]]:
+    """Fetch POIs for many categories in one area (one full or diff Overpass request for all of them)"""
+    results: Dict[str, List[Dict]] = {}
+    missing: List[str] = []
+    for category in categories:
+        if category in results or category in missing:
+            continue
+        if use_cache:
+            cached_leads = load_cache(make_key(category, location))
+            if cached_leads is not None:
+                results[category] = cached_leads
+                continue
+        missing.append(category)
+
+    if not missing:
+        return results
+
+    area_id = resolve_area_id(location)
+    if not area_id:
+        for category in missing:
+            results[category] = []
+        return results
+
+    # Gemerkter Stand pro Kategorie/Ort → nur Änderungen seit dem letzten Abruf holen
+    states: Dict[str, Dict[str, Dict]] = {}
+    since: Dict[str, str] = {}
+    if use_cache and OSM_INCREMENTAL:
+        for category in missing:
+            state = load_state(make_key(category, location))
+            if state and time.time() - state.get("fetched_at", 0) < OSM_INCREMENTAL_MAX_AGE_SECONDS:
+                states[category] = state.get("rows", {})
+                since[category] = state["since"]
+
+    full = [category for category in missing if category not in states]
+    incremental = [category for category in missing if category in states]
+    removed: List[Dict] = []
+    if full:
+        started = time.time()
+        data = _overpass(build_multi_query(full, area_id))
+        split = split_elements(data.get("elements", []), full, location)
+        for category in full:
+            states[category] = {_ref(row): row for row in split[category]}
+            since[category] = _osm_timestamp(data, started)
+    if incremental:
+        started = time.time()
+        # ISO-Zeitstempel sind lexikographisch sortierbar: ältester Stand bestimmt das Diff-Fenster
+        data = _overpass(build_diff_query(incremental, area_id, min(since[c] for c in incremental)))
+        removed = merge_diff({category: states[category] for category in incremental}, data.get("elements", []), location)
+        for category in incremental:
+            since[category] = _osm_timestamp(data, started)
+
+    for category in missing:
+        # Deduplizierung
+        rows = dedupe(list(states[category].values()))
+        # Speichere im Cache
+        if use_cache:
+            key = make_key(category, location)
+            save_cache(key, rows)
+            if OSM_INCREMENTAL:
+                save_state(key, {"since": since[category], "fetched_at": time.time(), "rows": states[category]})
+        results[category] = rows
+
+    # Frische Treffer für Umkreisabfragen vorhalten
+    try:
+        index = spatial_index.get_index()
+        index.upsert(row for category in missing for row in results[category])
+        index.delete(spatial_index.poi_key(row) for row in removed)
+    except Exception:
+        pass
+
     return results
 
+
+def fetch_pois(category: str, location: str, use_cache: bool = True) -> List[Dict]:
+    """Fetch POIs from OSM Overpass API for category and location"""
+    return fetch_pois_multi([category], location, use_cache=use_cache)[category]
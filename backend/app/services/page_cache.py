@@ -0,0 +1,281 @@
+import os
+import json
+import asyncio
+import time
+import hashlib
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import httpx
+
+# Content-adressierter Seiten-Cache: meta/<sha1(url)>.json zeigt auf blobs/<sha256(body)>
+PAGE_CACHE_DIR = Path(os.getenv("PAGE_CACHE_DIR", "backend/data/cache/pages"))
+if not PAGE_CACHE_DIR.is_absolute():
+    PAGE_CACHE_DIR = (Path(__file__).resolve().parents[2] / PAGE_CACHE_DIR).resolve()
+# Innerhalb dieses Fensters wird ohne Netzwerk aus dem Cache geliefert
+PAGE_CACHE_FRESH_SECONDS = int(os.getenv("PAGE_CACHE_FRESH_SECONDS", "21600"))
+# Einträge, die länger nicht bestätigt wurden, werden verworfen
+PAGE_CACHE_TTL_SECONDS = int(os.getenv("PAGE_CACHE_TTL_SECONDS", str(14 * 86400)))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+PAGE_CACHE_EVICT_EVERY = 50
+
+_KEEP_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+_lock = threading.Lock()
+_stores_since_evict = 0
+
+
+@dataclass
+class CachedPage:
+    """Antwort-Objekt mit der Schnittstelle, die die Scraper von requests/httpx nutzen"""
+    url: str
+    status_code: int
+    content: bytes = b""
+    encoding: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+    revalidated: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise httpx.HTTPStatusError(
+                f"HTTP {self.status_code} for {self.url}",
+                request=httpx.Request("GET", self.url),
+                response=httpx.Response(self.status_code),
+            )
+
+
+def _meta_dir() -> Path:
+    return PAGE_CACHE_DIR / "meta"
+
+
+def _blob_dir() -> Path:
+    return PAGE_CACHE_DIR / "blobs"
+
+
+def normalize_url(url: str) -> str:
+    """Normalisiert eine URL für den Cache-Key (Schema/Host klein, ohne Fragment, sortierte Query)"""
+    parts = urlsplit((url or "").strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def _key(url: str) -> str:
+    return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def lookup(url: str) -> Optional[Dict]:
+    """Lädt die Metadaten eines Cache-Eintrags, falls Body und Eintrag noch gültig sind"""
+    meta_file = _meta_dir() / f"{_key(url)}.json"
+    try:
+        with open(meta_file, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except Exception:
+        return None
+    if time.time() - meta.get("validated_at", 0) > PAGE_CACHE_TTL_SECONDS:
+        return None
+    if not (_blob_dir() / meta.get("body_sha", "-")).exists():
+        return None
+    return meta
+
+
+def _load_page(meta: Dict, revalidated: bool = False) -> Optional[CachedPage]:
+    try:
+        content = (_blob_dir() / meta["body_sha"]).read_bytes()
+    except Exception:
+        return None
+    return CachedPage(
+        url=meta["url"],
+        status_code=meta.get("status", 200),
+        content=content,
+        encoding=meta.get("encoding"),
+        headers=meta.get("headers", {}),
+        from_cache=True,
+        revalidated=revalidated,
+    )
+
+
+def conditional_headers(meta: Optional[Dict]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since für die Revalidierung"""
+    headers: Dict[str, str] = {}
+    if not meta:
+        return headers
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def _touch(url: str, meta: Dict) -> None:
+    meta["validated_at"] = time.time()
+    _atomic_write(_meta_dir() / f"{_key(url)}.json", json.dumps(meta).encode("utf-8"))
+
+
+def store(url: str, status: int, headers: Dict[str, str], content: bytes, encoding: Optional[str]) -> None:
+    """Speichert eine 200-Antwort; identische Bodies teilen sich einen Blob"""
+    global _stores_since_evict
+    if status != 200:
+        return
+    lowered = {k.lower(): v for k, v in (headers or {}).items()}
+    body_sha = hashlib.sha256(content).hexdigest()
+    blob = _blob_dir() / body_sha
+    if not blob.exists():
+        _atomic_write(blob, content)
+    now = time.time()
+    meta = {
+        "url": normalize_url(url),
+        "status": status,
+        "headers": {k: lowered[k] for k in _KEEP_HEADERS if k in lowered},
+        "etag": lowered.get("etag"),
+        "last_modified": lowered.get("last-modified"),
+        "encoding": encoding,
+        "body_sha": body_sha,
+        "size": len(content),
+        "fetched_at": now,
+        "validated_at": now,
+    }
+    _atomic_write(_meta_dir() / f"{_key(url)}.json", json.dumps(meta).encode("utf-8"))
+
+    with _lock:
+        _stores_since_evict += 1
+        run_evict = _stores_since_evict >= PAGE_CACHE_EVICT_EVERY
+        if run_evict:
+            _stores_since_evict = 0
+    if run_evict:
+        # Aufräumen liest alle Meta-Dateien: im Hintergrund, nicht im Request-Pfad des Aufrufers
+        threading.Thread(target=_evict_quietly, name="page-cache-evict", daemon=True).start()
+
+
+def _evict_quietly() -> None:
+    try:
+        evict()
+    except Exception:
+        pass
+
+
+def evict(max_bytes: int = None, ttl_seconds: int = None) -> Dict[str, int]:
+    """Entfernt abgelaufene Einträge, dann die am längsten unbestätigten bis zum Größenlimit"""
+    max_bytes = PAGE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    ttl_seconds = PAGE_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    now = time.time()
+    removed = 0
+    entries = []
+    with _lock:
+        for meta_file in _meta_dir().glob("*.json"):
+            try:
+                with open(meta_file, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            except Exception:
+                meta_file.unlink(missing_ok=True)
+                removed += 1
+                continue
+            if now - meta.get("validated_at", 0) > ttl_seconds:
+                meta_file.unlink(missing_ok=True)
+                removed += 1
+                continue
+            entries.append((meta.get("validated_at", 0), meta_file, meta.get("body_sha"), meta.get("size", 0)))
+
+        # Blob-Größe nur einmal zählen, auch wenn mehrere URLs darauf zeigen
+        refs: Dict[str, int] = {}
+        for _, _, sha, _ in entries:
+            refs[sha] = refs.get(sha, 0) + 1
+        total = sum({e[2]: e[3] for e in entries}.values())
+        entries.sort(key=lambda e: e[0])
+        for _, meta_file, sha, size in entries:
+            if total <= max_bytes:
+                break
+            meta_file.unlink(missing_ok=True)
+            removed += 1
+            refs[sha] -= 1
+            if refs[sha] == 0:
+                total -= size
+
+        # Unreferenzierte Blobs aufräumen (frisch geschriebene gehören evtl. zu einem laufenden store())
+        live = {sha for sha, n in refs.items() if n > 0}
+        for blob in _blob_dir().glob("*"):
+            if blob.name in live or blob.name.startswith("."):
+                continue
+            try:
+                if now - blob.stat().st_mtime > 60:
+                    blob.unlink(missing_ok=True)
+            except OSError:
+                continue
+
+    return {"removed": removed, "bytes": total}
+
+
+def _cached(url: str) -> Tuple[Optional[CachedPage], Optional[Dict]]:
+    """Frischer Eintrag → (Seite, Meta); sonst (None, Meta für die Revalidierung)"""
+    meta = lookup(url)
+    if meta and time.time() - meta.get("validated_at", 0) < PAGE_CACHE_FRESH_SECONDS:
+        page = _load_page(meta)
+        if page:
+            return page, meta
+    return None, meta
+
+
+def _settle(url: str, meta: Optional[Dict], status: int, headers: Dict[str, str], content: bytes, encoding: Optional[str]) -> CachedPage:
+    """Antwort verbuchen: 304 → Cache-Eintrag bestätigen, sonst speichern"""
+    if status == 304 and meta:
+        page = _load_page(meta, revalidated=True)
+        if page:
+            _touch(url, meta)
+            return page
+    store(url, status, headers, content, encoding)
+    return CachedPage(url=url, status_code=status, content=content, encoding=encoding, headers=dict(headers))
+
+
+def _resolve(url: str, send: Callable[[Dict[str, str]], Tuple[int, Dict[str, str], bytes, Optional[str]]]) -> CachedPage:
+    """Gemeinsamer Ablauf: frisch → Cache, sonst bedingter Request, 304 → Cache"""
+    page, meta = _cached(url)
+    if page:
+        return page
+    return _settle(url, meta, *send(conditional_headers(meta)))
+
+
+def get(client: httpx.Client, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10.0) -> CachedPage:
+    """Cache-bewusster GET über einen httpx.Client"""
+    def _send(extra: Dict[str, str]):
+        r = client.get(url, headers={**(headers or {}), **extra}, timeout=timeout)
+        return r.status_code, dict(r.headers), r.content, r.encoding
+    return _resolve(url, _send)
+
+
+def get_requests(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 15.0) -> CachedPage:
+    """Cache-bewusster GET über requests (für die Lead-Hunter-Scraper)"""
+    import requests
+
+    def _send(extra: Dict[str, str]):
+        r = requests.get(url, headers={**(headers or {}), **extra}, timeout=timeout)
+        return r.status_code, dict(r.headers), r.content, r.encoding
+    return _resolve(url, _send)
+
+
+async def aget(client: httpx.AsyncClient, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10.0) -> CachedPage:
+    """Cache-bewusster GET über einen httpx.AsyncClient; Dateizugriffe laufen im Thread, nicht im Event-Loop"""
+    page, meta = await asyncio.to_thread(_cached, url)
+    if page:
+        return page
+    r = await client.get(url, headers={**(headers or {}), **conditional_headers(meta)}, timeout=timeout)
+    return await asyncio.to_thread(_settle, url, meta, r.status_code, dict(r.headers), r.content, r.encoding)
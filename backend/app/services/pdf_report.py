@@ -1,7 +1,7 @@
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
@@ -9,6 +9,7 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from collections import defaultdict
+from functools import lru_cache
 
 # Export directory - resolve relative to backend root
 _backend_root = Path(__file__).resolve().parents[2]
@@ -18,40 +19,91 @@ if not EXPORT_DIR.is_absolute():
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def build_pdf(leads: List[Dict], category: str = "", city: str = "") -> str:
-    """Erstellt einen PDF-Report für OSM Leads"""
-    if not leads:
-        leads = []
-    
+@lru_cache(maxsize=1)
+def report_styles() -> Dict:
+    """Stylesheet und Tabellen-Styles; einmal pro Prozess aufgebaut (Render-Worker behalten sie)"""
+    styles = getSampleStyleSheet()
+    grid = ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#333333"))
+    rows_bg = ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.HexColor("#2a2a2a"), colors.HexColor("#1a1a1a")])
+    header = [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#FF7300")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ]
+    return {
+        "base": styles,
+        "title": ParagraphStyle(
+            "CustomTitle",
+            parent=styles["Heading1"],
+            fontSize=24,
+            textColor=colors.HexColor("#FF7300"),
+            spaceAfter=30,
+            alignment=TA_CENTER
+        ),
+        "heading": ParagraphStyle(
+            "CustomHeading",
+            parent=styles["Heading2"],
+            fontSize=16,
+            textColor=colors.HexColor("#FF7300"),
+            spaceAfter=12,
+            spaceBefore=20
+        ),
+        "meta": TableStyle([
+            ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#1a1a1a")),
+            ("TEXTCOLOR", (0, 0), (-1, -1), colors.white),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+            ("TOPPADDING", (0, 0), (-1, -1), 8),
+            grid,
+        ]),
+        "kpi": TableStyle(header + [
+            ("FONTSIZE", (0, 0), (-1, -1), 11),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+            ("TOPPADDING", (0, 0), (-1, -1), 8),
+            grid,
+            rows_bg,
+        ]),
+        "top10": TableStyle(header + [
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+            ("TOPPADDING", (0, 0), (-1, -1), 6),
+            grid,
+            rows_bg,
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ]),
+        "pivot": TableStyle(header + [
+            ("ALIGN", (1, 0), (-1, -1), "CENTER"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+            ("TOPPADDING", (0, 0), (-1, -1), 6),
+            grid,
+            rows_bg,
+        ]),
+    }
+
+
+def report_filename(category: str = "", city: str = "") -> str:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     category_clean = (category or "all").replace(" ", "_")
     city_clean = (city or "all").replace(" ", "_")
-    filename = f"osm_report_{category_clean}_{city_clean}_{timestamp}.pdf"
-    filepath = EXPORT_DIR / filename
+    return f"osm_report_{category_clean}_{city_clean}_{timestamp}.pdf"
+
+
+def render_report(leads: List[Dict], category: str, city: str, filepath: str, created: Optional[str] = None) -> None:
+    """Rendert den OSM-Lead-Report nach `filepath` (läuft auch im Render-Worker)"""
+    if not leads:
+        leads = []
     
     doc = SimpleDocTemplate(str(filepath), pagesize=A4)
     story = []
     
-    styles = getSampleStyleSheet()
-    
-    # Custom Styles
-    title_style = ParagraphStyle(
-        "CustomTitle",
-        parent=styles["Heading1"],
-        fontSize=24,
-        textColor=colors.HexColor("#FF7300"),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    heading_style = ParagraphStyle(
-        "CustomHeading",
-        parent=styles["Heading2"],
-        fontSize=16,
-        textColor=colors.HexColor("#FF7300"),
-        spaceAfter=12,
-        spaceBefore=20
-    )
+    cached = report_styles()
+    styles = cached["base"]
+    title_style = cached["title"]
+    heading_style = cached["heading"]
     
     # Header
     story.append(Paragraph("Freiraum Mitarbeiter", title_style))
@@ -62,20 +114,11 @@ def build_pdf(leads: List[Dict], category: str = "", city: str = "") -> str:
     meta_data = [
         ["Kategorie:", category or "Alle"],
         ["Stadt:", city or "Alle"],
-        ["Erstellt:", datetime.now().strftime("%d.%m.%Y %H:%M:%S")],
+        ["Erstellt:", created or datetime.now().strftime("%d.%m.%Y %H:%M:%S")],
         ["Anzahl Leads:", str(len(leads))]
     ]
     meta_table = Table(meta_data, colWidths=[4 * cm, 6 * cm])
-    meta_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#1a1a1a")),
-        ("TEXTCOLOR", (0, 0), (-1, -1), colors.white),
-        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 10),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-        ("TOPPADDING", (0, 0), (-1, -1), 8),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#333333"))
-    ]))
+    meta_table.setStyle(cached["meta"])
     story.append(meta_table)
     story.append(PageBreak())
     
@@ -105,17 +148,7 @@ def build_pdf(leads: List[Dict], category: str = "", city: str = "") -> str:
         ["Ø Score", f"{avg_score:.1f}"]
     ]
     kpi_table = Table(kpi_data, colWidths=[6 * cm, 6 * cm])
-    kpi_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#FF7300")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 11),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-        ("TOPPADDING", (0, 0), (-1, -1), 8),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#333333")),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.HexColor("#2a2a2a"), colors.HexColor("#1a1a1a")])
-    ]))
+    kpi_table.setStyle(cached["kpi"])
     story.append(kpi_table)
     story.append(Spacer(1, 1 * cm))
     
@@ -136,18 +169,7 @@ def build_pdf(leads: List[Dict], category: str = "", city: str = "") -> str:
         ])
     
     top10_table = Table(top10_data, colWidths=[3 * cm, 2.5 * cm, 1.5 * cm, 3 * cm, 2.5 * cm, 3 * cm])
-    top10_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#FF7300")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 0), (-1, -1), 6),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#333333")),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.HexColor("#2a2a2a"), colors.HexColor("#1a1a1a")]),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE")
-    ]))
+    top10_table.setStyle(cached["top10"])
     story.append(top10_table)
     story.append(PageBreak())
     
@@ -180,22 +202,9 @@ def build_pdf(leads: List[Dict], category: str = "", city: str = "") -> str:
         ])
     
     pivot_table = Table(pivot_data, colWidths=[4 * cm, 2 * cm, 2 * cm, 2 * cm, 2 * cm])
-    pivot_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#FF7300")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-        ("ALIGN", (1, 0), (-1, -1), "CENTER"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 9),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 0), (-1, -1), 6),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#333333")),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.HexColor("#2a2a2a"), colors.HexColor("#1a1a1a")])
-    ]))
+    pivot_table.setStyle(cached["pivot"])
     story.append(pivot_table)
     
     # Build PDF
     doc.build(story)
-    
-    return filename
 
@@ -0,0 +1,323 @@
+import asyncio
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from . import export_catalog
+
+# Dokument-Rendering (ReportLab/openpyxl) außerhalb der Request-Threads in einem Prozess-Pool.
+# Ergebnisse liegen unter dem Hash der Eingaben; gleiche Anfragen bekommen sofort die vorhandene Datei.
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", os.path.join("backend", "data", "cache", "render"))
+if not os.path.isabs(RENDER_CACHE_DIR):
+    RENDER_CACHE_DIR = str((Path(__file__).resolve().parents[2] / RENDER_CACHE_DIR).resolve())
+RENDER_JOB_HISTORY = int(os.getenv("RENDER_JOB_HISTORY", "200"))
+# Cache-Dateien, die länger nicht geliefert wurden, werden verworfen; danach die ältesten bis zum Größenlimit
+RENDER_CACHE_TTL_SECONDS = int(os.getenv("RENDER_CACHE_TTL_SECONDS", str(3 * 86400)))
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+RENDER_CACHE_EVICT_EVERY = 20
+# Gerade gelieferte Dateien bleiben liegen, bis der Download sie gelesen hat
+RENDER_CACHE_GRACE_SECONDS = 120
+
+
+def _render_osm_report(payload: Dict[str, Any], path: str) -> None:
+    from .pdf_report import render_report
+    render_report(payload.get("leads") or [], payload.get("category", ""), payload.get("city", ""), path, payload.get("created"))
+
+
+def _render_osm_excel(payload: Dict[str, Any], path: str) -> None:
+    from .export_osm_excel import write_osm_workbook
+    write_osm_workbook(payload.get("leads") or [], path)
+
+
+def _render_kpi_report(payload: Dict[str, Any], path: str) -> None:
+    try:
+        from backend.reports import render_kpi_pdf
+    except ImportError:
+        from reports import render_kpi_pdf
+    render_kpi_pdf(payload, path, payload.get("created"))
+
+
+def _render_audit_report(payload: Dict[str, Any], path: str) -> None:
+    try:
+        from backend.audit_logger import render_audit_pdf
+    except ImportError:
+        from audit_logger import render_audit_pdf
+    render_audit_pdf(payload.get("rows") or [], path, payload.get("created"))
+
+
+def _render_offer(payload: Dict[str, Any], path: str) -> None:
+    try:
+        from backend.offers import render_offer_pdf
+    except ImportError:
+        from offers import render_offer_pdf
+    render_offer_pdf(payload, path)
+
+
+# Dokumentart → (Dateiendung, Renderer); Renderer laufen im Worker-Prozess
+RENDERERS: Dict[str, Tuple[str, Callable[[Dict[str, Any], str], None]]] = {
+    "osm_report": (".pdf", _render_osm_report),
+    "osm_excel": (".xlsx", _render_osm_excel),
+    "kpi_report": (".pdf", _render_kpi_report),
+    "audit_report": (".pdf", _render_audit_report),
+    "offer": (".pdf", _render_offer),
+}
+
+
+def _worker_init() -> None:
+    # Styles/Templates einmal pro Worker aufbauen; report_styles() ist pro Prozess gecacht
+    try:
+        from .pdf_report import report_styles
+        report_styles()
+    except Exception:
+        pass
+
+
+def _execute(kind: str, payload: Dict[str, Any], path: str) -> str:
+    """Läuft im Worker: rendert in eine Temp-Datei und benennt sie atomar um"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        RENDERERS[kind][1](payload, tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def input_key(kind: str, payload: Dict[str, Any]) -> str:
+    raw = json.dumps({"kind": kind, "payload": payload}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+@dataclass
+class RenderJob:
+    id: str
+    kind: str
+    key: str
+    path: str
+    status: str = "queued"  # queued | done | error
+    cached: bool = False
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status,
+            "cached": self.cached,
+            "file": os.path.basename(self.path) if self.status == "done" else None,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class RenderFarm:
+    """Prozess-Pool für Dokumente mit Eingabe-Hash-Cache und nachverfolgbaren Jobs"""
+
+    def __init__(self, workers: int = RENDER_WORKERS, cache_dir: str = RENDER_CACHE_DIR):
+        self.workers = max(1, workers)
+        self.cache_dir = cache_dir
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, RenderJob]" = OrderedDict()
+        self._inflight: Dict[str, RenderJob] = {}
+        self._lock = threading.Lock()
+        self._renders_since_evict = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: gleiches Verhalten wie unter Windows, kein fork eines Prozesses mit laufenden Threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_worker_init,
+            )
+        return self._pool
+
+    def path_for(self, kind: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{kind}_{key}{RENDERERS[kind][0]}")
+
+    def _remember(self, job: RenderJob) -> None:
+        self._jobs[job.id] = job
+        while len(self._jobs) > RENDER_JOB_HISTORY:
+            self._jobs.popitem(last=False)
+
+    def submit(
+        self, kind: str, payload: Dict[str, Any], path: Optional[str] = None, stamp: Optional[Dict[str, Any]] = None
+    ) -> RenderJob:
+        """Liefert einen fertigen Job bei Cache-Treffer, einen laufenden bei gleicher Anfrage, sonst einen neuen.
+
+        Mit `path` bestimmt der Aufrufer den Zielort (dessen Name dann den Inhalts-Hash tragen sollte; das
+        Verzeichnis muss existieren). `stamp` geht nur ins Rendering, nicht in den Hash (z. B. "created")."""
+        if kind not in RENDERERS:
+            raise ValueError(f"Unbekannte Dokumentart: {kind}")
+        key = input_key(kind, payload)
+        if path is None:
+            path = self.path_for(kind, key)
+            os.makedirs(self.cache_dir, exist_ok=True)
+        with self._lock:
+            running = self._inflight.get(key)
+            if running is not None:
+                return running
+            job = RenderJob(id=uuid.uuid4().hex, kind=kind, key=key, path=path)
+            self._remember(job)
+            if os.path.isfile(path):
+                job.status, job.cached, job.finished_at = "done", True, time.time()
+                if os.path.dirname(path) == self.cache_dir:
+                    try:
+                        os.utime(path)  # mtime = letzte Lieferung, Grundlage für evict()
+                    except OSError:
+                        pass
+                return job
+            job.future = self._executor().submit(_execute, kind, {**payload, **(stamp or {})}, path)
+            self._inflight[key] = job
+        job.future.add_done_callback(lambda f, job=job: self._finish(job, f))
+        return job
+
+    def _finish(self, job: RenderJob, future: Future) -> None:
+        with self._lock:
+            self._inflight.pop(job.key, None)
+            error = future.exception()
+            job.status = "error" if error else "done"
+            job.error = str(error) if error else None
+            job.finished_at = time.time()
+            self._renders_since_evict += 1
+            due = self._renders_since_evict >= RENDER_CACHE_EVICT_EVERY
+            if due:
+                self._renders_since_evict = 0
+        if due:
+            self.evict()
+
+    def evict(self, max_bytes: Optional[int] = None, ttl_seconds: Optional[int] = None) -> Dict[str, int]:
+        """Entfernt abgelaufene Cache-Dateien, dann die am längsten nicht gelieferten bis zum Größenlimit"""
+        max_bytes = RENDER_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        ttl_seconds = RENDER_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        removed = 0
+        entries = []
+        with self._lock:
+            busy = {job.path for job in self._inflight.values()}
+            try:
+                names = os.listdir(self.cache_dir)
+            except OSError:
+                names = []
+            for name in names:
+                path = os.path.join(self.cache_dir, name)
+                if path in busy or name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime < RENDER_CACHE_GRACE_SECONDS:
+                    continue
+                if now - stat.st_mtime > ttl_seconds:
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except OSError:
+                        pass
+                    continue
+                entries.append((stat.st_mtime, path, stat.st_size))
+
+            total = sum(size for _, _, size in entries)
+            for _, path, size in sorted(entries):
+                if total <= max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    removed += 1
+                    total -= size
+                except OSError:
+                    pass
+        return {"removed": removed, "bytes": total}
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list:
+        with self._lock:
+            return [job.as_dict() for job in reversed(self._jobs.values())]
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_farm: Optional[RenderFarm] = None
+_farm_lock = threading.Lock()
+
+
+def get_farm() -> RenderFarm:
+    global _farm
+    with _farm_lock:
+        if _farm is None:
+            _farm = RenderFarm()
+            atexit.register(_farm.shutdown)
+        return _farm
+
+
+async def wait_for(job: RenderJob) -> str:
+    """Wartet ohne Thread-Blockade auf einen Job; liefert den Dateipfad"""
+    if job.future is not None:
+        try:
+            await asyncio.wrap_future(job.future)
+        except Exception as e:
+            raise RuntimeError(f"Rendering fehlgeschlagen: {e}") from e
+    return job.path
+
+
+async def render(
+    kind: str, payload: Dict[str, Any], path: Optional[str] = None, stamp: Optional[Dict[str, Any]] = None
+) -> str:
+    return await wait_for(get_farm().submit(kind, payload, path, stamp))
+
+
+def export_dir() -> Path:
+    configured = os.getenv("EXPORT_DIR", "backend/data/exports")
+    path = Path(configured)
+    if not path.is_absolute():
+        path = (Path(__file__).resolve().parents[2] / configured).resolve()
+    return path
+
+
+def _name_part(value: Any) -> str:
+    # Request-Werte landen im Dateinamen: nur Wortzeichen und Bindestrich, leer → "all"
+    return re.sub(r"[^\w-]", "_", str(value or "").strip()) or "all"
+
+
+async def render_export(
+    kind: str,
+    payload: Dict[str, Any],
+    name: Iterable[Any],
+    stamp: Optional[Dict[str, Any]] = None,
+    **meta: Any,
+) -> str:
+    """Rendert direkt nach EXPORT_DIR (Name trägt den Eingabe-Hash) und trägt die Datei in den Export-Katalog ein"""
+    target_dir = export_dir().resolve()
+    prefix = "_".join(_name_part(part) for part in name)
+    path = target_dir / f"{prefix}_{input_key(kind, payload)}{RENDERERS[kind][0]}"
+    if path.resolve().parent != target_dir:
+        raise ValueError(f"Ungültiger Exportname: {prefix}")
+    target_dir.mkdir(parents=True, exist_ok=True)
+    result = await render(kind, payload, str(path), stamp)
+    export_catalog.register(result, **meta)
+    return result
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import logging
+import os
+from datetime import datetime, timedelta
 from typing import Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
 _logger = logging.getLogger(__name__)
@@ -21,6 +24,24 @@ def _heartbeat():
     _logger.debug("scheduler heartbeat ok")
 
 
+def _preload_geocodes():
+    from .osm_overpass import preload_area_ids
+
+    resolved = preload_area_ids()
+    _logger.info("Geocode preload: %d/%d Orte aufgelöst", sum(1 for v in resolved.values() if v), len(resolved))
+
+
+def _export_retention():
+    from pathlib import Path
+    from .export_catalog import apply_retention
+
+    export_dir = Path(os.getenv("EXPORT_DIR", "backend/data/exports"))
+    if not export_dir.is_absolute():
+        export_dir = (Path(__file__).resolve().parents[2] / export_dir).resolve()
+    stats = apply_retention(export_dir)
+    _logger.info("Export-Retention: %s", stats)
+
+
 def start_scheduler() -> BackgroundScheduler:
     scheduler = get_scheduler()
     if not scheduler.running:
@@ -33,6 +54,24 @@ def start_scheduler() -> BackgroundScheduler:
                 max_instances=1,
                 coalesce=True,
             )
+        if os.getenv("GEOCODE_PRELOAD", "1") == "1" and not scheduler.get_job("geocode-preload"):
+            scheduler.add_job(
+                _preload_geocodes,
+                DateTrigger(run_date=datetime.now().astimezone() + timedelta(seconds=5)),
+                id="geocode-preload",
+                replace_existing=True,
+                max_instances=1,
+            )
+        if os.getenv("EXPORT_RETENTION", "1") == "1" and not scheduler.get_job("export-retention"):
+            scheduler.add_job(
+                _export_retention,
+                IntervalTrigger(hours=float(os.getenv("EXPORT_RETENTION_INTERVAL_HOURS", "6"))),
+                id="export-retention",
+                next_run_time=datetime.now().astimezone() + timedelta(minutes=2),
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
         scheduler.start()
         _logger.info("Scheduler started")
     return scheduler
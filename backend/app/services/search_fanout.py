@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, List, Optional
+
+from .lead_dedupe import normalize_domain
+
+# Gleichzeitige Suchanfragen über alle Provider und Query-Varianten
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "6"))
+_POLL_SECONDS = 0.5
+
+
+def fan_out(
+    tasks: Iterable[Callable[[], List[str]]],
+    want: int,
+    max_concurrency: int = SEARCH_MAX_CONCURRENCY,
+    skip: Optional[Callable[[str], bool]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> List[str]:
+    """Führt Suchaufrufe parallel aus, merged die Links nach Domain in Ankunftsreihenfolge
+    und bricht ab, sobald `want` Links vorliegen (noch wartende Aufrufe werden verworfen)"""
+    tasks = list(tasks)
+    out: List[str] = []
+    if not tasks or want <= 0:
+        return out
+    seen = set()
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(tasks))), thread_name_prefix="search")
+    try:
+        # Reihenfolge der Tasks = Priorität: frühe Tasks starten zuerst
+        pending = {pool.submit(task) for task in tasks}
+        while pending:
+            if should_stop and should_stop():
+                break
+            done, pending = wait(pending, timeout=_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    links = future.result() or []
+                except Exception:
+                    continue
+                for url in links:
+                    if skip and skip(url):
+                        continue
+                    domain = normalize_domain(url) or url
+                    if domain in seen:
+                        continue
+                    seen.add(domain)
+                    out.append(url)
+                    if len(out) >= want:
+                        return out
+    finally:
+        # Laufende Requests enden von selbst, nicht gestartete werden gestrichen
+        pool.shutdown(wait=False, cancel_futures=True)
+    return out
@@ -0,0 +1,194 @@
+import os
+import json
+import math
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# Persistenter räumlicher Index über Lead-Koordinaten (SQLite R-Tree, sonst B-Tree auf lat/lon)
+SPATIAL_DB = Path(os.getenv("SPATIAL_DB", "backend/data/cache/spatial.db"))
+if not SPATIAL_DB.is_absolute():
+    SPATIAL_DB = (Path(__file__).resolve().parents[2] / SPATIAL_DB).resolve()
+# Umkreissuche für nearest-k: Start- und Maximalradius in km
+NEAREST_START_KM = 2.0
+NEAREST_MAX_KM = float(os.getenv("SPATIAL_NEAREST_MAX_KM", "300"))
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Großkreisdistanz in km"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat: float, lon: float, radius_km: float):
+    """Umschließende Box (min_lat, min_lon, max_lat, max_lon) eines Kreises"""
+    dlat = radius_km / KM_PER_DEG_LAT
+    dlon = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+def poi_key(row: Dict) -> str:
+    """Stabiler Schlüssel pro Kategorie und OSM-Objekt (ohne osm_id: Name + Koordinaten)"""
+    category = (row.get("category") or "").lower()
+    if row.get("osm_id"):
+        return f"{category}|{row.get('osm_type', '')}/{row['osm_id']}"
+    raw = f"{category}|{(row.get('company') or '').casefold()}|{float(row['lat']):.5f}|{float(row['lon']):.5f}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SpatialIndex:
+    """POI-Tabelle mit R-Tree für bbox-, Umkreis- und nearest-k-Abfragen"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS poi (
+                id INTEGER PRIMARY KEY,
+                poi_key TEXT NOT NULL UNIQUE,
+                category TEXT NOT NULL,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_poi_category ON poi (category)")
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS poi_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+            )
+            self.rtree = True
+        except sqlite3.OperationalError:
+            # SQLite ohne R-Tree-Modul: Bereichsabfrage über den zusammengesetzten Index
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_poi_lat_lon ON poi (lat, lon)")
+            self.rtree = False
+        self._conn.commit()
+
+    def upsert(self, rows: Iterable[Dict]) -> int:
+        """Fügt Leads mit Koordinaten ein bzw. aktualisiert sie; liefert die Anzahl"""
+        now = time.time()
+        count = 0
+        with self._lock, self._conn:
+            for row in rows:
+                if row.get("lat") is None or row.get("lon") is None:
+                    continue
+                lat, lon = float(row["lat"]), float(row["lon"])
+                key = poi_key(row)
+                self._conn.execute(
+                    "INSERT INTO poi (poi_key, category, lat, lon, data, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(poi_key) DO UPDATE SET lat = excluded.lat, lon = excluded.lon, "
+                    "data = excluded.data, updated_at = excluded.updated_at",
+                    (key, (row.get("category") or "").lower(), lat, lon,
+                     json.dumps(row, ensure_ascii=False, separators=(",", ":")), now),
+                )
+                if self.rtree:
+                    poi_id = self._conn.execute("SELECT id FROM poi WHERE poi_key = ?", (key,)).fetchone()[0]
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO poi_rtree (id, min_lat, max_lat, min_lon, max_lon) VALUES (?, ?, ?, ?, ?)",
+                        (poi_id, lat, lat, lon, lon),
+                    )
+                count += 1
+        return count
+
+    def delete(self, keys: Iterable[str]) -> int:
+        """Entfernt POIs anhand ihrer poi_key"""
+        removed = 0
+        with self._lock, self._conn:
+            for key in keys:
+                row = self._conn.execute("SELECT id FROM poi WHERE poi_key = ?", (key,)).fetchone()
+                if not row:
+                    continue
+                self._conn.execute("DELETE FROM poi WHERE id = ?", (row[0],))
+                if self.rtree:
+                    self._conn.execute("DELETE FROM poi_rtree WHERE id = ?", (row[0],))
+                removed += 1
+        return removed
+
+    def _bbox_rows(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                   category: Optional[str] = None, limit: Optional[int] = None):
+        if self.rtree:
+            sql = ("SELECT p.lat, p.lon, p.data FROM poi_rtree r JOIN poi p ON p.id = r.id "
+                   "WHERE r.min_lat >= ? AND r.max_lat <= ? AND r.min_lon >= ? AND r.max_lon <= ?")
+        else:
+            sql = "SELECT p.lat, p.lon, p.data FROM poi p WHERE p.lat BETWEEN ? AND ? AND p.lon BETWEEN ? AND ?"
+        params: List = [min_lat, max_lat, min_lon, max_lon]
+        if category:
+            sql += " AND p.category = ?"
+            params.append(category.lower())
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+             category: Optional[str] = None, limit: int = 1000) -> List[Dict]:
+        """Alle POIs innerhalb der Box"""
+        return [json.loads(data) for _, _, data in self._bbox_rows(min_lat, min_lon, max_lat, max_lon, category, limit)]
+
+    def _within(self, lat: float, lon: float, radius_km: float, category: Optional[str]) -> List[tuple]:
+        hits = []
+        for plat, plon, data in self._bbox_rows(*radius_bbox(lat, lon, radius_km), category=category):
+            distance = haversine_km(lat, lon, plat, plon)
+            if distance <= radius_km:
+                hits.append((distance, data))
+        hits.sort(key=lambda h: h[0])
+        return hits
+
+    @staticmethod
+    def _with_distance(hits: List[tuple]) -> List[Dict]:
+        out = []
+        for distance, data in hits:
+            row = json.loads(data)
+            row["distance_km"] = round(distance, 3)
+            out.append(row)
+        return out
+
+    def radius(self, lat: float, lon: float, radius_km: float,
+               category: Optional[str] = None, limit: int = 1000) -> List[Dict]:
+        """POIs im Umkreis, nach Entfernung sortiert (mit distance_km)"""
+        return self._with_distance(self._within(lat, lon, radius_km, category)[:limit])
+
+    def nearest(self, lat: float, lon: float, k: int = 10, category: Optional[str] = None,
+                max_km: float = NEAREST_MAX_KM) -> List[Dict]:
+        """Die k nächsten POIs (Umkreis wird verdoppelt, bis k Treffer sicher enthalten sind)"""
+        radius_km = NEAREST_START_KM
+        while True:
+            hits = self._within(lat, lon, radius_km, category)
+            if len(hits) >= k or radius_km >= max_km:
+                return self._with_distance(hits[:k])
+            radius_km = min(radius_km * 2, max_km)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM poi").fetchone()[0]
+            per_category = dict(self._conn.execute("SELECT category, COUNT(*) FROM poi GROUP BY category").fetchall())
+        return {"pois": total, "categories": per_category, "rtree": self.rtree}
+
+
+_index: Optional[SpatialIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> SpatialIndex:
+    """Prozessweite Index-Instanz"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SpatialIndex(SPATIAL_DB)
+    return _index
@@ -0,0 +1,224 @@
+import os
+import time
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+# Gestufte Verarbeitung: jede Stufe hat eigene Worker, zwischen den Stufen liegen begrenzte Queues (Backpressure)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+PIPELINE_HISTORY = 20
+_POLL_SECONDS = 0.1
+_DONE = object()
+
+
+def stage_workers(name: str, default: int) -> int:
+    """Worker-Anzahl einer Stufe, überschreibbar per PIPELINE_WORKERS_<NAME>"""
+    try:
+        return max(1, int(os.getenv(f"PIPELINE_WORKERS_{name.upper()}", str(default))))
+    except ValueError:
+        return max(1, default)
+
+
+@dataclass
+class Stage:
+    """Eine Pipeline-Stufe: fn(item) → Ergebnis; None verwirft das Item, expand=True liefert mehrere Items"""
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    expand: bool = False
+    queue_size: int = PIPELINE_QUEUE_SIZE
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    workers: int
+    queue_size: int
+    received: int = 0
+    emitted: int = 0
+    dropped: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "received": self.received,
+            "emitted": self.emitted,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_size": self.queue_size,
+            "throughput_per_s": round(self.received / elapsed, 2) if elapsed > 0 else 0.0,
+            "utilization": round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed > 0 else 0.0,
+            "running": self.finished_at is None,
+        }
+
+
+_history: Deque["Pipeline"] = deque(maxlen=PIPELINE_HISTORY)
+_history_lock = threading.Lock()
+
+
+def recent_metrics() -> List[Dict[str, Any]]:
+    """Metriken der letzten Pipeline-Läufe (laufende zuerst)"""
+    with _history_lock:
+        runs = list(_history)
+    runs.sort(key=lambda p: (not p.running, -p.started_at))
+    return [p.metrics() for p in runs]
+
+
+class Pipeline:
+    """Thread-basierte Stufen-Pipeline; Ergebnisse der letzten Stufe kommen in Fertigstellungsreihenfolge"""
+
+    def __init__(self, name: str, stages: List[Stage], should_stop: Optional[Callable[[], bool]] = None):
+        if not stages:
+            raise ValueError("Pipeline ohne Stufen")
+        self.name = name
+        self.stages = stages
+        self.should_stop = should_stop
+        self.started_at = time.time()
+        self.running = False
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._queues = [queue.Queue(maxsize=max(1, s.queue_size)) for s in stages]
+        self._out: queue.Queue = queue.Queue(maxsize=max(1, stages[-1].queue_size))
+        self._metrics = [StageMetrics(s.name, max(1, s.workers), max(1, s.queue_size)) for s in stages]
+        self._alive = [max(1, s.workers) for s in stages]
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stopped(self) -> bool:
+        if not self._stop.is_set() and self.should_stop and self.should_stop():
+            self._stop.set()
+        return self._stop.is_set()
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        # Blockiert bei voller Queue (Backpressure), bricht aber bei stop() ab
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _close(self, index: int) -> None:
+        # Letzter Worker einer Stufe signalisiert der nächsten Stufe das Ende
+        with self._lock:
+            self._alive[index] -= 1
+            last = self._alive[index] == 0
+        if not last:
+            return
+        self._metrics[index].finished_at = time.time()
+        if index + 1 < len(self.stages):
+            for _ in range(max(1, self.stages[index + 1].workers)):
+                self._put(self._queues[index + 1], _DONE)
+        else:
+            self._put(self._out, _DONE)
+
+    def _feed(self, source: Iterable[Any]) -> None:
+        try:
+            for item in source:
+                if self.stopped() or not self._put(self._queues[0], item):
+                    break
+        except Exception:
+            self._metrics[0].errors += 1
+        finally:
+            for _ in range(max(1, self.stages[0].workers)):
+                self._put(self._queues[0], _DONE)
+
+    def _work(self, index: int) -> None:
+        stage, metrics = self.stages[index], self._metrics[index]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self.stages) else self._out
+        try:
+            while not self.stopped():
+                try:
+                    item = inbox.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                metrics.received += 1
+                metrics.queue_depth = inbox.qsize()
+                metrics.max_queue_depth = max(metrics.max_queue_depth, metrics.queue_depth + 1)
+                started = time.monotonic()
+                try:
+                    result = stage.fn(item)
+                except Exception:
+                    metrics.errors += 1
+                    continue
+                finally:
+                    metrics.busy_seconds += time.monotonic() - started
+                if result is None:
+                    metrics.dropped += 1
+                    continue
+                for out in (result if stage.expand else (result,)):
+                    if not self._put(outbox, out):
+                        return
+                    metrics.emitted += 1
+        finally:
+            self._close(index)
+
+    def iter(self, source: Iterable[Any]) -> Iterator[Any]:
+        """Startet die Pipeline und liefert Ergebnisse; Abbruch des Iterators stoppt alle Stufen"""
+        self.running = True
+        self.started_at = time.time()
+        for m in self._metrics:
+            m.started_at = self.started_at
+        with _history_lock:
+            _history.append(self)
+        threads = [threading.Thread(target=self._feed, args=(source,), name=f"{self.name}-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            for n in range(max(1, stage.workers)):
+                threads.append(threading.Thread(target=self._work, args=(index,), name=f"{self.name}-{stage.name}-{n}", daemon=True))
+        for t in threads:
+            t.start()
+        try:
+            while not self.stopped():
+                try:
+                    item = self._out.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self._stop.set()
+            self.running = False
+            now = time.time()
+            for m in self._metrics:
+                m.finished_at = m.finished_at or now
+
+    def run(self, source: Iterable[Any], limit: Optional[int] = None,
+            accept: Optional[Callable[[Any], bool]] = None) -> List[Any]:
+        """Sammelt die Ergebnisse; stoppt, sobald `limit` Ergebnisse `accept` erfüllen"""
+        out: List[Any] = []
+        hits = 0
+        for item in self.iter(source):
+            out.append(item)
+            if accept is None or accept(item):
+                hits += 1
+            if limit is not None and hits >= limit:
+                break
+        return out
+
+    def metrics(self) -> Dict[str, Any]:
+        for index, m in enumerate(self._metrics):
+            m.queue_depth = self._queues[index].qsize()
+        return {
+            "name": self.name,
+            "running": self.running,
+            "started_at": self.started_at,
+            "stages": [m.as_dict() for m in self._metrics],
+        }
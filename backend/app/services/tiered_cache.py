@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Zweistufiger Cache: In-Memory-LRU vor einer SQLite-Tabelle (Werte als zlib-komprimiertes JSON)
+TIERED_CACHE_DB = Path(os.getenv("TIERED_CACHE_DB", "backend/data/cache/cache.db"))
+if not TIERED_CACHE_DB.is_absolute():
+    TIERED_CACHE_DB = (Path(__file__).resolve().parents[2] / TIERED_CACHE_DB).resolve()
+TIERED_CACHE_MAX_BYTES = int(os.getenv("TIERED_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+TIERED_CACHE_MEMORY_ITEMS = int(os.getenv("TIERED_CACHE_MEMORY_ITEMS", "512"))
+DEFAULT_TTL_SECONDS = 86400
+
+# TTL pro Namespace; unbekannte Namespaces nutzen DEFAULT_TTL_SECONDS
+NAMESPACE_TTLS: Dict[str, int] = {
+    "osm": int(os.getenv("OSM_CACHE_TTL_SECONDS", "86400")),
+    "search": int(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(7 * 86400))),
+    "osm_state": int(os.getenv("OSM_STATE_TTL_SECONDS", str(30 * 86400))),
+}
+
+
+class TieredCache:
+    """LRU im Speicher + SQLite auf Platte, mit TTL pro Namespace, Größenlimit und Zählern"""
+
+    def __init__(self, path: Path, memory_items: int = TIERED_CACHE_MEMORY_ITEMS,
+                 max_bytes: int = TIERED_CACHE_MAX_BYTES, ttls: Optional[Dict[str, int]] = None):
+        self.path = Path(path)
+        self.memory_items = max(memory_items, 0)
+        self.max_bytes = max_bytes
+        self.ttls = dict(NAMESPACE_TTLS if ttls is None else ttls)
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, bytes]]" = OrderedDict()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "expired": 0, "evictions": 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed ON cache_entries (accessed_at)")
+        self._conn.commit()
+        self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+
+    def ttl_for(self, namespace: str) -> int:
+        return self.ttls.get(namespace, DEFAULT_TTL_SECONDS)
+
+    def _remember(self, mkey: Tuple[str, str], expires_at: float, raw: bytes) -> None:
+        if not self.memory_items:
+            return
+        self._memory[mkey] = (expires_at, raw)
+        self._memory.move_to_end(mkey)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Liefert den Wert oder None (fehlend/abgelaufen)"""
+        mkey = (namespace, key)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(mkey)
+            if entry is not None:
+                expires_at, raw = entry
+                if expires_at > now:
+                    self._memory.move_to_end(mkey)
+                    self.counters["memory_hits"] += 1
+                    return json.loads(raw)
+                del self._memory[mkey]
+
+            row = self._conn.execute(
+                "SELECT value, expires_at, size FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            blob, expires_at, size = row
+            if expires_at <= now:
+                with self._conn:
+                    self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+                self._disk_bytes -= size
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, namespace, key),
+                )
+            raw = zlib.decompress(blob)
+            self._remember(mkey, expires_at, raw)
+            self.counters["disk_hits"] += 1
+            return json.loads(raw)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Schreibt den Wert atomar in beide Stufen"""
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        blob = zlib.compress(raw)
+        now = time.time()
+        expires_at = now + (self.ttl_for(namespace) if ttl is None else ttl)
+        with self._lock:
+            with self._conn:
+                old = self._conn.execute(
+                    "SELECT size FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (namespace, key, blob, len(blob), expires_at, now),
+                )
+            self._disk_bytes += len(blob) - (old[0] if old else 0)
+            self._remember((namespace, key), expires_at, raw)
+            self.counters["sets"] += 1
+            if self._disk_bytes > self.max_bytes:
+                self._evict_to_size()
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._memory.pop((namespace, key), None)
+            with self._conn:
+                row = self._conn.execute(
+                    "SELECT size FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            if row:
+                self._disk_bytes -= row[0]
+
+    def purge_expired(self) -> int:
+        """Löscht alle abgelaufenen Einträge"""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                freed, count = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM cache_entries WHERE expires_at <= ?", (now,)
+                ).fetchone()
+                self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+            self._disk_bytes -= freed
+            for mkey in [k for k, (exp, _) in self._memory.items() if exp <= now]:
+                del self._memory[mkey]
+            self.counters["expired"] += count
+            return count
+
+    def _evict_to_size(self) -> None:
+        # Zuerst Abgelaufenes, dann die am längsten nicht gelesenen Einträge
+        self.purge_expired()
+        target = int(self.max_bytes * 0.9)
+        while self._disk_bytes > target:
+            rows = self._conn.execute(
+                "SELECT namespace, key, size FROM cache_entries ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                break
+            with self._conn:
+                for namespace, key, size in rows:
+                    self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+                    self._memory.pop((namespace, key), None)
+                    self._disk_bytes -= size
+                    self.counters["evictions"] += 1
+                    if self._disk_bytes <= target:
+                        break
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+            return {
+                **self.counters,
+                "memory_items": len(self._memory),
+                "disk_entries": entries,
+                "disk_bytes": self._disk_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache: Optional[TieredCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> TieredCache:
+    """Prozessweite Cache-Instanz"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TieredCache(TIERED_CACHE_DB)
+    return _cache
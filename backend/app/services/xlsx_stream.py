@@ -0,0 +1,101 @@
+import heapq
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+# Gemeinsame Bausteine für Excel-Exporte im write-only-Modus (Zeilen werden direkt in die Datei gestreamt)
+HEADER_FILL = PatternFill(start_color="FF7300", end_color="FF7300", fill_type="solid")
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_ALIGNMENT = Alignment(horizontal="center")
+
+
+class ColumnWidths:
+    """Maximale Zeichenlänge pro Spalte, ein str() pro Zelle"""
+
+    def __init__(self, headers: Sequence[Any]):
+        self.lengths = [len(str(h)) for h in headers]
+
+    def update(self, values: Sequence[Any]) -> None:
+        lengths = self.lengths
+        for i, value in enumerate(values):
+            n = len(str(value)) if value is not None else 4  # openpyxl-Altverhalten: str(None) == "None"
+            if n > lengths[i]:
+                lengths[i] = n
+
+    def apply(self, ws, cap: int) -> None:
+        """Setzt die Breiten; muss im write-only-Modus vor der ersten Zeile passieren"""
+        for i, n in enumerate(self.lengths, 1):
+            ws.column_dimensions[get_column_letter(i)].width = min(n + 2, cap)
+
+
+class TopN:
+    """Die n größten Einträge per Heap (stabil: bei Gleichstand gewinnt der frühere)"""
+
+    def __init__(self, n: int, key: Callable[[Any], Any]):
+        self.n = n
+        self.key = key
+        self._heap: List = []
+        self._seq = 0
+
+    def push(self, item: Any) -> None:
+        entry = (self.key(item), -self._seq, item)
+        self._seq += 1
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Any]:
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+def new_workbook() -> Workbook:
+    return Workbook(write_only=True)
+
+
+def header_row(ws, headers: Sequence[Any], styled: bool = True) -> List:
+    if not styled:
+        return list(headers)
+    cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = HEADER_FILL
+        cell.font = HEADER_FONT
+        cell.alignment = HEADER_ALIGNMENT
+        cells.append(cell)
+    return cells
+
+
+def write_sheet(
+    wb: Workbook,
+    title: str,
+    headers: Sequence[Any],
+    rows: Iterable[Sequence[Any]],
+    widths: Optional[ColumnWidths] = None,
+    width_cap: int = 50,
+    styled: bool = True,
+):
+    """Legt ein write-only-Sheet an: erst Breiten, dann Kopfzeile, dann die Zeilen"""
+    ws = wb.create_sheet(title)
+    if widths is not None:
+        widths.apply(ws, width_cap)
+    ws.append(header_row(ws, headers, styled))
+    for row in rows:
+        ws.append(row)
+    return ws
+
+
+def table_widths(headers: Sequence[Any], rows: Iterable[Sequence[Any]]) -> ColumnWidths:
+    widths = ColumnWidths(headers)
+    for row in rows:
+        widths.update(row)
+    return widths
+
+
+def row_getter(fields: Sequence[str], defaults: Optional[Dict[str, Any]] = None) -> Callable[[Dict], List[Any]]:
+    """Funktion, die aus einem Lead-Dict die Zeilenwerte in Spaltenreihenfolge holt"""
+    defaults = defaults or {}
+    return lambda lead: [lead.get(f, defaults.get(f, "")) for f in fields]
@@ -129,65 +129,54 @@ def export_csv(rows: List[Dict[str, Any]]) -> str:
 # PDF export via reportlab if available, else return None (caller falls back to CSV)
 def export_pdf(rows: List[Dict[str, Any]]) -> Optional[bytes]:
     try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.units import mm
-        import io, textwrap, json as _json
-
+        import io
         buf = io.BytesIO()
-        c = canvas.Canvas(buf, pagesize=A4)
-        w, h = A4
-        y = h - 20 * mm
-
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(20 * mm, y, "Freiraum Mitarbeiter – Audit Report")
-        y -= 8 * mm
-
-        c.setFont("Helvetica", 9)
-        now = dt.datetime.now().strftime("%Y-%m-%d %H:%M")
-        c.drawString(20 * mm, y, f"Erstellt: {now} | Einträge: {len(rows)}")
-        y -= 6 * mm
-
-        c.line(20 * mm, y, w - 20 * mm, y)
-        y -= 6 * mm
-
-        for r in rows:
-            block = f"[{r.get('ts')}] {r.get('user_id') or '-'} | {r.get('action')} | {r.get('path') or ''} {r.get('method') or ''} ({r.get('status') or ''})"
-            c.drawString(20 * mm, y, block[:120])
-            y -= 5 * mm
-
-            payload = r.get("payload_json") or ""
-            if payload:
-                ptxt = payload
-                wrap = textwrap.wrap(ptxt, width=110)
-                for line in wrap[:3]:
-                    c.drawString(25 * mm, y, line)
-                    y -= 4.5 * mm
-
-            y -= 2 * mm
-            if y < 25 * mm:
-                c.showPage()
-                y = h - 20 * mm
-                c.setFont("Helvetica", 9)
-
-        c.showPage()
-        c.save()
+        render_audit_pdf(rows, buf)
         return buf.getvalue()
     except Exception:
         return None
 
+def render_audit_pdf(rows: List[Dict[str, Any]], target, created: Optional[str] = None) -> None:
+    """Zeichnet den Audit-Report nach `target` (Pfad oder Buffer); läuft auch im Render-Worker"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import mm
+    import textwrap
 
+    c = canvas.Canvas(target, pagesize=A4)
+    w, h = A4
+    y = h - 20 * mm
 
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(20 * mm, y, "Freiraum Mitarbeiter – Audit Report")
+    y -= 8 * mm
 
+    c.setFont("Helvetica", 9)
+    now = created or dt.datetime.now().strftime("%Y-%m-%d %H:%M")
+    c.drawString(20 * mm, y, f"Erstellt: {now} | Einträge: {len(rows)}")
+    y -= 6 * mm
 
+    c.line(20 * mm, y, w - 20 * mm, y)
+    y -= 6 * mm
 
-
-
-
-
-
-
-
-
-
-
+    for r in rows:
+        block = f"[{r.get('ts')}] {r.get('user_id') or '-'} | {r.get('action')} | {r.get('path') or ''} {r.get('method') or ''} ({r.get('status') or ''})"
+        c.drawString(20 * mm, y, block[:120])
+        y -= 5 * mm
+
+        payload = r.get("payload_json") or ""
+        if payload:
+            ptxt = payload
+            wrap = textwrap.wrap(ptxt, width=110)
+            for line in wrap[:3]:
+                c.drawString(25 * mm, y, line)
+                y -= 4.5 * mm
+
+        y -= 2 * mm
+        if y < 25 * mm:
+            c.showPage()
+            y = h - 20 * mm
+            c.setFont("Helvetica", 9)
+
+    c.showPage()
+    c.save()
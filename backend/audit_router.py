@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import datetime as dt
 from fastapi import APIRouter, Query, Response
+from fastapi.responses import FileResponse
 from typing import Optional
-from .audit_logger import get_logger, export_csv, export_pdf
+from .audit_logger import get_logger, export_csv
+from .app.services import render_farm
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
@@ -31,7 +34,7 @@ def audit_export_csv(
     return Response(content=csv_txt, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=audit_export.csv"})
 
 @router.get("/export.pdf")
-def audit_export_pdf(
+async def audit_export_pdf(
     since: Optional[str] = Query(None),
     until: Optional[str] = Query(None),
     user_id: Optional[str] = Query(None),
@@ -40,12 +43,15 @@ def audit_export_pdf(
     offset: int = Query(0)
 ):
     rows = get_logger().list(since=since, until=until, user_id=user_id, action_like=action_like, limit=limit, offset=offset)
-    pdf = export_pdf(rows)
-    if pdf is None:
+    try:
+        # Rendering im Prozess-Pool; gleiche Einträge liefern den gecachten Report ("Erstellt:" = Zeitpunkt des Renderns)
+        created = dt.datetime.now().strftime("%Y-%m-%d %H:%M")
+        path = await render_farm.render("audit_report", {"rows": rows}, stamp={"created": created})
+    except Exception:
         # Fallback: CSV ausliefern, wenn kein reportlab da
         csv_txt = export_csv(rows)
         return Response(content=csv_txt, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=audit_export.csv"})
-    return Response(content=pdf, media_type="application/pdf", headers={"Content-Disposition": "attachment; filename=audit_report.pdf"})
+    return FileResponse(path, media_type="application/pdf", filename="audit_report.pdf")
 
 @router.post("/purge")
 def audit_purge(days: int = 90):
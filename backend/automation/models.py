@@ -1,10 +1,11 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, Boolean, Index
 from ..db import Base
 
 
 class ActionQueue(Base):
     __tablename__ = "action_queue"
+    __table_args__ = (Index("ix_action_queue_user_status_created", "user_id", "status", "created_at"),)
     
     id = Column(Integer, primary_key=True)
     user_id = Column(String(128), index=True)
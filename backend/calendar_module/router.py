@@ -1,16 +1,16 @@
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from datetime import datetime
 import os
 
+from ..app.core.db import engine_for
 from .models import Base, CalendarEvent
 from .msgraph import create_event_msgraph
 
 DATA_DIR = os.getenv("FREIRAUM_DATA_DIR", os.path.abspath(os.path.join(os.getcwd(), "data")))
 DB_URL = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'freiraum.db')}")
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False} if DB_URL.startswith("sqlite") else {})
+engine = engine_for(DB_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base.metadata.create_all(bind=engine)
 
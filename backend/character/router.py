@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, Body, HTTPException
 from typing import Any, Dict
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 import os
+from ..app.core.db import engine_for
 from .models import Base
 from .schemas import EventIn, EventOut, StateOut, ProfileOut, ProfileIn, ResetIn
 from .service import register_event, get_state, get_profile, update_profile, reset_user
@@ -17,7 +17,7 @@ DB_URL = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'freiraum
 
 
 
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False} if DB_URL.startswith("sqlite") else {})
+engine = engine_for(DB_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,6 +1,6 @@
 import os, pathlib
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from .app.core.db import engine_for
 
 BASE_DIR = pathlib.Path(__file__).resolve().parent
 DB_PATH = (BASE_DIR.parent / "data" / "freiraum.db")
@@ -8,7 +8,7 @@ DB_URL = f"sqlite:///{DB_PATH}"
 
 class Base(DeclarativeBase): pass
 
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+engine = engine_for(DB_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 def init_db():
@@ -1,6 +1,6 @@
 import os
 from datetime import datetime
-from openpyxl import Workbook
+from ..app.services.xlsx_stream import new_workbook, write_sheet
 
 
 def export_leads_xlsx(leads: list[dict], exports_dir: str) -> str:
@@ -8,15 +8,9 @@ def export_leads_xlsx(leads: list[dict], exports_dir: str) -> str:
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     path = os.path.join(exports_dir, f"leads_{ts}.xlsx")
     
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Leads"
-    
     headers = ["company", "category", "location", "city", "email(s)", "phone(s)", "website", "source"]
-    ws.append(headers)
-    
-    for l in leads:
-        ws.append([
+    rows = (
+        [
             l.get("company", ""),
             l.get("category", ""),
             l.get("location", ""),
@@ -25,24 +19,12 @@ def export_leads_xlsx(leads: list[dict], exports_dir: str) -> str:
             ", ".join(l.get("phones", [])),
             l.get("website", ""),
             l.get("source_url", ""),
-        ])
-    
+        ]
+        for l in leads
+    )
+
+    # write-only: Zeilen werden direkt gestreamt
+    wb = new_workbook()
+    write_sheet(wb, "Leads", headers, rows, styled=False)
     wb.save(path)
     return path
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
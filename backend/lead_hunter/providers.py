@@ -2,6 +2,7 @@ import re, time, random
 from typing import List, Dict
 import requests
 from bs4 import BeautifulSoup
+from ..app.services import page_cache
 
 USER_AGENTS = [
   "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36",
@@ -15,6 +16,13 @@ def _req(url: str) -> str:
   r.raise_for_status()
   return r.text
 
+def _req_page(url: str) -> str:
+  # Firmenseiten über den Seiten-Cache (Suchergebnisse bleiben ungecacht)
+  headers = {"User-Agent": random.choice(USER_AGENTS), "Accept-Language": "de-DE,de;q=0.9"}
+  r = page_cache.get_requests(url, headers=headers, timeout=15)
+  r.raise_for_status()
+  return r.text
+
 def ddg_links(query: str) -> List[str]:
   html = _req(f"https://duckduckgo.com/html/?q={requests.utils.quote(query)}")
   soup = BeautifulSoup(html, "lxml")
@@ -38,7 +46,7 @@ def bing_links(query: str) -> List[str]:
 def scrape_contact(url: str) -> Dict:
   # Simple page scrape to discover email/phone/company
   try:
-    html = _req(url)
+    html = _req_page(url)
   except Exception:
     return {}
   soup = BeautifulSoup(html, "lxml")
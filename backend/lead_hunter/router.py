@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Body
 from pydantic import BaseModel, Field
+from functools import partial
 from typing import List
 import os
 import requests
@@ -15,6 +16,10 @@ os.makedirs(EXPORTS_DIR, exist_ok=True)
 from .providers import ddg_links, bing_links, scrape_contact
 from .excel import export_leads_xlsx
 from .outreach import send_bulk
+from ..app.services.lead_dedupe import DedupeIndex, normalize_domain
+from ..app.services.search_fanout import SEARCH_MAX_CONCURRENCY
+from ..app.services.fetch_pool import FETCH_MAX_WORKERS
+from ..app.services.stage_pipeline import Pipeline, Stage, stage_workers
 
 
 class HuntIn(BaseModel):
@@ -70,44 +75,74 @@ def api_hunt(payload: HuntIn):
         for q in queries:
             if q not in qset: qset.append(q)
 
-        links = []
-        for q in qset:
-            try:
-                links.extend(ddg_links(q))
-            except Exception:
-                pass
-            if len(links) < 6:  # Fallback nur wenn mager
-                try:
-                    links.extend(bing_links(q))
-                except Exception:
-                    pass
-
-        # Deduplizieren & beschneiden
-        clean = []
+        # Stufen: Suche → ein Link pro Domain → Scrape. Die Suchaufrufe laufen in Listenreihenfolge;
+        # sobald max_links Domains beisammen sind, startet keine weitere Suche (Bing steht hinten)
+        blocked = ["facebook.com","instagram.com","x.com","twitter.com","youtube.com"]
+        tasks = [partial(ddg_links, q) for q in qset] + [partial(bing_links, q) for q in qset]
+        max_links = max(payload.count*5, 40)  # genug Material
         seen = set()
-        for u in links:
-            if any(host in u for host in ["facebook.com","instagram.com","x.com","twitter.com","youtube.com"]):
-                continue
-            if u in seen: continue
-            seen.add(u)
-            clean.append(u)
-        clean = clean[: max(payload.count*5, 40)]  # genug Material
 
-        results = []
-        for u in clean:
+        def first_per_domain(u: str):
+            if len(seen) >= max_links or any(host in u for host in blocked):
+                return None
+            domain = normalize_domain(u) or u
+            if domain in seen:
+                return None
+            seen.add(domain)
+            return u
+
+        def search(task):
+            if len(seen) >= max_links:
+                return None
+            return task()
+
+        def scrape(u: str):
             data = scrape_contact(u)
-            if not data: continue
-            entry = {
+            if not data: return None
+            return {
                 "company": data.get("company"),
                 "email": data.get("email"),
                 "phone": data.get("phone"),
                 "city": city,
                 "url": u
             }
-            # Nur speichern, wenn mindestens Email oder Telefon
-            if entry["email"] or entry["phone"]:
-                results.append(entry)
-            if len(results) >= payload.count: break
+
+        pipeline = Pipeline("api_hunt", [
+            Stage("search", search, workers=stage_workers("search", SEARCH_MAX_CONCURRENCY), expand=True),
+            Stage("dedupe", first_per_domain),
+            Stage("scrape", scrape, workers=stage_workers("scrape", FETCH_MAX_WORKERS)),
+        ])
+        # Bereits vorhandene Firmen nicht erneut anlegen
+        known = DedupeIndex()
+        if payload.save_to_db:
+            try:
+                known = DedupeIndex.from_db()
+            except Exception:
+                pass
+
+        # Nur Leads mit Email oder Telefon; dedupliziert wird vor dem Abschneiden,
+        # damit payload.count eindeutige neue Leads zusammenkommen (Duplikate zählen nicht mit)
+        has_contact = lambda entry: bool(entry["email"] or entry["phone"])
+        run_index = DedupeIndex()
+        kept, results, duplicates = [], [], []
+        for entry in pipeline.iter(tasks):
+            if not has_contact(entry):
+                continue
+            found = run_index.add(len(kept), entry)
+            if found is not None:
+                # Dublette im selben Lauf: fehlende Felder übernehmen
+                for k, v in entry.items():
+                    if v and not kept[found].get(k):
+                        kept[found][k] = v
+                continue
+            kept.append(entry)
+            if known.match(entry) is not None:
+                entry["duplicate"] = True
+                duplicates.append(entry)
+                continue
+            results.append(entry)
+            if len(results) >= payload.count:
+                break
         
         # Wenn keine Leads gefunden, hilfreiche Fehlermeldung
         if len(results) == 0:
@@ -138,6 +173,8 @@ def api_hunt(payload: HuntIn):
                 except Exception as e:
                     # If lead already exists or other error, still add to saved_leads without id
                     saved_leads.append(l)
+            # bekannte Firmen weiter mit ausgeben, markiert als duplicate
+            saved_leads.extend(duplicates)
         
         excel_path = None
         if payload.export_excel:
@@ -4,6 +4,7 @@ from typing import List, Dict
 from bs4 import BeautifulSoup
 from .config import load_config
 from .utils import EMAIL_RE, PHONE_RE, unique
+from ..app.services import page_cache
 
 
 def search_duckduckgo(category: str, location: str, count: int) -> List[str]:
@@ -37,7 +38,7 @@ def fetch_company_page(url: str) -> dict:
     cfg = load_config()
     headers = {"User-Agent": cfg["user_agent"]}
     try:
-        r = requests.get(url, headers=headers, timeout=cfg["timeout_sec"])
+        r = page_cache.get_requests(url, headers=headers, timeout=cfg["timeout_sec"])
         r.raise_for_status()
         html = r.text
     except Exception as e:
@@ -1,64 +1,68 @@
 from __future__ import annotations
 
-import os, re, time, json, random
+import os, re, time, threading
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
 
 import requests
 
 from bs4 import BeautifulSoup
 
+try:
 
+    from app.services import page_cache
 
-CACHE_FILE = os.path.join(os.environ.get("FREIRAUM_DATA_DIR", "data"), "lead_cache.json")
+    from app.services.tiered_cache import get_cache
 
-if not os.path.exists(os.path.dirname(CACHE_FILE)):
+    from app.services.lead_dedupe import dedupe_leads
 
-    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    from app.services.search_fanout import fan_out
 
-if not os.path.exists(CACHE_FILE):
+    from app.services.fetch_pool import fetch_pool
 
-    with open(CACHE_FILE, "w", encoding="utf-8") as f: json.dump({}, f)
+except ImportError:
 
+    from backend.app.services import page_cache
 
+    from backend.app.services.tiered_cache import get_cache
 
-def _load_cache():
+    from backend.app.services.lead_dedupe import dedupe_leads
 
-    try:
+    from backend.app.services.search_fanout import fan_out
 
-        with open(CACHE_FILE, "r", encoding="utf-8") as f: return json.load(f)
+    from backend.app.services.fetch_pool import fetch_pool
 
-    except: return {}
 
-def _save_cache(c):
 
-    with open(CACHE_FILE, "w", encoding="utf-8") as f: json.dump(c, f, ensure_ascii=False, indent=2)
+SEARCH_CACHE_NAMESPACE = "search"
 
 
 
-EMAIL_RE = re.compile(r"[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.I)
+def _cached_links(query: str):
 
-PHONE_RE = re.compile(r"(?:\+\d{1,3}\s?)?(?:\(?\d{2,4}\)?\s?)?\d[\d\s\/-]{5,}\d")
+    try: return get_cache().get(SEARCH_CACHE_NAMESPACE, query)
 
-DOMAIN_RE = re.compile(r"https?://([^/]+)/?", re.I)
+    except Exception: return None
 
+def _cache_links(query: str, links: List[str]):
 
+    try: get_cache().set(SEARCH_CACHE_NAMESPACE, query, links)
 
-def dedupe(leads: List[Dict[str,Any]]) -> List[Dict[str,Any]]:
+    except Exception: pass
 
-    seen = set(); out=[]
 
-    for l in leads:
 
-        key = (l.get("domain") or l.get("email") or l.get("phone") or l.get("name") or "").lower().strip()
+EMAIL_RE = re.compile(r"[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.I)
 
-        if not key: key = json.dumps(l, sort_keys=True)
+PHONE_RE = re.compile(r"(?:\+\d{1,3}\s?)?(?:\(?\d{2,4}\)?\s?)?\d[\d\s\/-]{5,}\d")
 
-        if key in seen: continue
+DOMAIN_RE = re.compile(r"https?://([^/]+)/?", re.I)
 
-        seen.add(key); out.append(l)
 
-    return out
+
+def dedupe(leads: List[Dict[str,Any]]) -> List[Dict[str,Any]]:
+
+    return dedupe_leads(leads)
 
 
 
@@ -174,29 +178,17 @@ def provider_google_cse(query: str, timeout=15, limit=10) -> List[str]:
 
 
 
-def search_with_fallbacks(query: str, limit=15, per_provider=10, timeout=15, backoff=True) -> List[str]:
-
-    c = _load_cache()
-
-    if query in c:
-
-        return c[query]
-
-    providers = [provider_duckduckgo, provider_bing, provider_google_cse]
-
-    links=[]
+def _provider_task(p, query: str, per_provider: int, timeout, backoff: bool, should_stop: Optional[Callable[[], bool]]):
 
-    for p in providers:
+    def run() -> List[str]:
 
         for attempt in range(3):
 
-            try:
-
-                res = p(query, timeout=timeout, limit=per_provider)
+            if should_stop and should_stop(): return []
 
-                links.extend(res or [])
+            try:
 
-                break
+                return p(query, timeout=timeout, limit=per_provider) or []
 
             except Exception:
 
@@ -204,59 +196,54 @@ def search_with_fallbacks(query: str, limit=15, per_provider=10, timeout=15, bac
 
                 continue
 
-    # dedupe by domain
-
-    seen = set(); out=[]
-
-    for u in links:
-
-        m = DOMAIN_RE.match(u)
-
-        d = m.group(1).lower() if m else u
-
-        if d in seen: continue
+        return []
 
-        seen.add(d); out.append(u)
+    return run
 
-        if len(out) >= limit: break
 
-    c[query]=out; _save_cache(c)
-
-    return out
 
+def search_with_fallbacks(query: str, limit=15, per_provider=10, timeout=15, backoff=True, should_stop: Optional[Callable[[], bool]] = None) -> List[str]:
 
+    cached = _cached_links(query)
 
-def fetch_leads(links: List[str], timeout=12, limit=50) -> List[Dict[str,Any]]:
+    if cached is not None:
 
-    out=[]
+        return cached
 
-    for idx,u in enumerate(links[:limit]):
+    providers = [provider_duckduckgo, provider_bing, provider_google_cse]
 
-        try:
+    # alle Provider parallel, Links nach Domain gemerged, Abbruch sobald limit erreicht
 
-            r = _http_get(u, timeout)
+    out = fan_out([_provider_task(p, query, per_provider, timeout, backoff, should_stop) for p in providers], want=limit, should_stop=should_stop)
 
-            r.raise_for_status()
+    if should_stop and should_stop(): return []
 
-            info = extract_contacts(r.text, u)
+    _cache_links(query, out)
 
-            out.append(info)
+    return out
 
-        except Exception:
 
-            continue
 
-        time.sleep(0.15) # be polite
+def fetch_contact(u: str, timeout=12, limiter=None, stop: Optional[threading.Event] = None) -> Optional[Dict[str,Any]]:
 
-    return dedupe(out)
+    # Warten auf den Token-Bucket endet sofort, wenn `stop` gesetzt wird (Job abgebrochen)
 
+    if limiter is not None and not limiter.bucket(u).acquire(stop): return None
 
+    r = page_cache.get_requests(u, headers={"user-agent":"Mozilla/5.0 FreiraumLeadHunter"}, timeout=timeout)
 
+    r.raise_for_status()
 
+    return extract_contacts(r.text, u)
 
 
 
+def fetch_leads(links: List[str], timeout=12, limit=50, should_stop: Optional[Callable[[], bool]] = None, on_progress: Optional[Callable[[int, int], None]] = None, want: Optional[int] = None) -> List[Dict[str,Any]]:
 
+    # paralleler Abruf mit Token-Bucket pro Domain (ersetzt das feste sleep); stoppt nach `want` Leads mit Kontakt
 
+    targets = links[:limit]
 
+    out = [info for _, info in fetch_pool(targets, lambda u: fetch_contact(u, timeout), want=want, accept=lambda l: bool(l.get("email") or l.get("phone")), should_stop=should_stop, on_progress=on_progress)]
 
+    return dedupe(out)
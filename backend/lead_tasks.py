@@ -1,17 +1,25 @@
 from __future__ import annotations
 
-import os, time, uuid, json, threading
+import os, time, uuid, json, threading, queue, itertools
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 
 from dataclasses import dataclass, field
 
 
 
-from sqlalchemy import create_engine, Column, String, Integer, Text, Float, Boolean
+from sqlalchemy import Column, String, Integer, Text, Float, Boolean, func, or_
 
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+try:
+
+    from backend.app.core.db import engine_for
+
+except ImportError:
+
+    from app.core.db import engine_for
+
 
 
 DATA_DIR = os.environ.get("FREIRAUM_DATA_DIR") or os.path.join(os.getcwd(), "data")
@@ -20,7 +28,7 @@ os.makedirs(DATA_DIR, exist_ok=True)
 
 DB_PATH = os.path.join(DATA_DIR, "lead_tasks.db")
 
-engine = create_engine(f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False})
+engine = engine_for(f"sqlite:///{DB_PATH}")
 
 SessionLocal = sessionmaker(bind=engine)
 
@@ -48,12 +56,64 @@ class LeadTask(Base):
 
     error = Column(Text)                        # error string
 
+    kind = Column(String, default="web_hunt")   # Handler-Name in der Job-Engine
+
+    priority = Column(Integer, default=5)       # höher = früher
+
+    attempts = Column(Integer, default=0)       # Neustarts nach Abbruch durch Prozessende
+
+    cancel_requested = Column(Boolean, default=False)
+
+    owner = Column(String)                      # Engine-Instanz, die den Task hält
+
+class LeadJobOwner(Base):
+
+    """Lebenszeichen je Engine-Instanz (prozessübergreifend, damit kein Worker die Tasks eines anderen übernimmt)"""
+
+    __tablename__ = "lead_job_owners"
+
+    owner = Column(String, primary_key=True)
+
+    heartbeat = Column(Float, default=time.time)
+
 
 
 Base.metadata.create_all(engine)
 
 
 
+def _ensure_columns():
+
+    # create_all legt keine neuen Spalten in bestehenden DBs an
+
+    added = {"kind": "VARCHAR DEFAULT 'web_hunt'", "priority": "INTEGER DEFAULT 5", "attempts": "INTEGER DEFAULT 0", "cancel_requested": "BOOLEAN DEFAULT 0", "owner": "VARCHAR"}
+
+    with engine.begin() as conn:
+
+        existing = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(lead_tasks)")}
+
+        for name, ddl in added.items():
+
+            if name not in existing: conn.exec_driver_sql(f"ALTER TABLE lead_tasks ADD COLUMN {name} {ddl}")
+
+
+
+_ensure_columns()
+
+
+
+LEAD_JOB_WORKERS = int(os.environ.get("LEAD_JOB_WORKERS", "2"))
+
+# Engines schreiben alle LEAD_JOB_HEARTBEAT_SECONDS ein Lebenszeichen; Tasks werden erst übernommen,
+
+# wenn das ihres Besitzers älter als LEAD_JOB_OWNER_TIMEOUT ist
+
+LEAD_JOB_HEARTBEAT_SECONDS = float(os.environ.get("LEAD_JOB_HEARTBEAT_SECONDS", "10"))
+
+LEAD_JOB_OWNER_TIMEOUT = float(os.environ.get("LEAD_JOB_OWNER_TIMEOUT", "60"))
+
+
+
 def save_task(sess, t: LeadTask):
 
     t.updated_at = time.time()
@@ -102,9 +162,413 @@ def update_task(task_id: str, **kwargs):
 
 
 
+class TaskCancelled(Exception):
+
+    pass
+
+
+
+class CancelToken:
+
+    """Kooperativer Abbruch: Fetch-Schleifen prüfen token.cancelled bzw. rufen raise_if_cancelled()"""
+
+    def __init__(self, task_id: str):
+
+        self.task_id = task_id
+
+        self._event = threading.Event()
+
+    def cancel(self):
+
+        self._event.set()
+
+    @property
+
+    def cancelled(self) -> bool:
+
+        return self._event.is_set()
+
+    def __call__(self) -> bool:
+
+        return self._event.is_set()
+
+    @property
+
+    def event(self) -> threading.Event:
+
+        # für Wartestellen, die auf ein Event warten (z. B. TokenBucket.acquire)
+
+        return self._event
+
+    def raise_if_cancelled(self):
+
+        if self._event.is_set(): raise TaskCancelled(self.task_id)
+
+
+
+class ProgressWriter:
+
+    """Sammelt Task-Updates und schreibt sie gebündelt (höchstens alle min_interval Sekunden)"""
+
+    def __init__(self, task_id: str, token: Optional[CancelToken] = None, min_interval: float = 1.0):
+
+        self.task_id = task_id
+
+        self.token = token
+
+        self.min_interval = min_interval
+
+        self._pending: Dict[str, Any] = {}
+
+        self._last_flush = 0.0
+
+        self._lock = threading.Lock()
+
+    def update(self, force: bool = False, **fields):
+
+        with self._lock:
+
+            self._pending.update(fields)
+
+            due = force or "status" in fields or time.time() - self._last_flush >= self.min_interval
+
+        if due: self.flush()
+
+    def flush(self):
+
+        with self._lock:
+
+            pending, self._pending = self._pending, {}
+
+            self._last_flush = time.time()
+
+        sess = SessionLocal()
+
+        try:
+
+            t = sess.get(LeadTask, self.task_id)
+
+            if not t: return
+
+            for k,v in pending.items():
+
+                setattr(t, k, v)
+
+            t.updated_at = time.time()
+
+            sess.commit()
+
+            # Abbruch aus einem anderen Prozess/Request übernehmen
+
+            if t.cancel_requested and self.token: self.token.cancel()
+
+        finally:
+
+            sess.close()
+
+
+
+class LeadJobEngine:
+
+    """Persistente Job-Engine auf der lead_tasks-Tabelle: Worker-Pool, Prioritäten, Resume, Cancel"""
+
+    def __init__(self, workers: int = LEAD_JOB_WORKERS):
+
+        self.workers = max(workers, 1)
+
+        self.handlers: Dict[str, Callable[[str, Dict[str, Any], CancelToken, ProgressWriter], Dict[str, Any]]] = {}
+
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+
+        self._seq = itertools.count()
+
+        self._tokens: Dict[str, CancelToken] = {}
+
+        self._lock = threading.Lock()
+
+        self._threads: List[threading.Thread] = []
+
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def register(self, kind: str, handler):
+
+        self.handlers[kind] = handler
+
+    def _enqueue(self, task_id: str, priority: int):
+
+        # höhere Priorität zuerst, bei Gleichstand FIFO
+
+        self._queue.put((-int(priority or 0), next(self._seq), task_id))
+
+    def submit(self, kind: str, params: Dict[str, Any], priority: int = 5) -> str:
+
+        sess = SessionLocal()
+
+        try:
+
+            t = LeadTask(id=str(uuid.uuid4()), kind=kind, status="queued", progress=0.0, priority=priority, attempts=0, cancel_requested=False, owner=self.owner, params=json.dumps(params))
+
+            save_task(sess, t)
+
+            task_id = t.id
+
+        finally:
+
+            sess.close()
+
+        self._enqueue(task_id, priority)
+
+        return task_id
+
+    def cancel(self, task_id: str) -> bool:
+
+        sess = SessionLocal()
+
+        try:
+
+            t = sess.get(LeadTask, task_id)
+
+            if not t: return False
+
+            t.cancel_requested = True
+
+            if t.status == "queued": t.status = "canceled"
+
+            t.updated_at = time.time()
+
+            sess.commit()
+
+        finally:
+
+            sess.close()
+
+        with self._lock:
+
+            token = self._tokens.get(task_id)
+
+        if token: token.cancel()
+
+        return True
+
+    def heartbeat(self):
+
+        sess = SessionLocal()
+
+        try:
+
+            now = time.time()
+
+            sess.merge(LeadJobOwner(owner=self.owner, heartbeat=now))
+
+            # Einträge längst beendeter Engines aufräumen
+
+            sess.query(LeadJobOwner).filter(LeadJobOwner.heartbeat < now - 10 * LEAD_JOB_OWNER_TIMEOUT).delete(synchronize_session=False)
+
+            sess.commit()
+
+        finally:
+
+            sess.close()
+
+    def resume_pending(self) -> int:
+
+        """Verwaiste queued/running Tasks übernehmen (Lebenszeichen des Besitzers abgelaufen); running zählt als abgebrochener Versuch"""
+
+        sess = SessionLocal()
+
+        resumable = []
+
+        try:
+
+            now = time.time()
+
+            alive = {o.owner for o in sess.query(LeadJobOwner).filter(LeadJobOwner.heartbeat >= now - LEAD_JOB_OWNER_TIMEOUT)}
+
+            alive.add(self.owner)
+
+            rows = sess.query(LeadTask).filter(LeadTask.status.in_(["queued", "running"])).order_by(LeadTask.created_at).all()
+
+            for t in rows:
+
+                if t.owner in alive: continue
+
+                values: Dict[str, Any] = {"owner": self.owner, "updated_at": now}
+
+                if t.cancel_requested: values["status"] = "canceled"
+
+                elif t.status == "running": values.update(status="queued", attempts=(t.attempts or 0) + 1)
+
+                # Compare-and-set: nur übernehmen, wenn keine andere Engine schneller war
+
+                same_owner = LeadTask.owner.is_(None) if t.owner is None else LeadTask.owner == t.owner
+
+                taken = sess.query(LeadTask).filter(LeadTask.id == t.id, LeadTask.status == t.status, same_owner).update(values, synchronize_session=False)
+
+                sess.commit()
+
+                if taken and values.get("status", t.status) == "queued": resumable.append((t.id, t.priority or 0))
+
+        finally:
+
+            sess.close()
+
+        for task_id, priority in resumable:
+
+            self._enqueue(task_id, priority)
+
+        return len(resumable)
+
+    def start(self):
+
+        with self._lock:
+
+            if self._threads: return
+
+            self.heartbeat()
+
+            for i in range(self.workers):
+
+                th = threading.Thread(target=self._work, name=f"lead-job-{i}", daemon=True)
+
+                th.start(); self._threads.append(th)
+
+            th = threading.Thread(target=self._keepalive, name="lead-job-heartbeat", daemon=True)
+
+            th.start(); self._threads.append(th)
+
+        self.resume_pending()
+
+    def _keepalive(self):
+
+        # Lebenszeichen erneuern und Tasks ausgefallener Engines übernehmen
+
+        while True:
+
+            time.sleep(LEAD_JOB_HEARTBEAT_SECONDS)
+
+            try:
+
+                self.heartbeat()
+
+                self.resume_pending()
+
+            except Exception:
+
+                pass
+
+    def _work(self):
+
+        while True:
+
+            _, _, task_id = self._queue.get()
+
+            try:
+
+                self._run(task_id)
+
+            except Exception:
+
+                pass
+
+            finally:
+
+                self._queue.task_done()
+
+    def _claim(self, task_id: str) -> Optional[tuple]:
+
+        """queued -> running als ein UPDATE: bei mehreren Engines gewinnt genau ein Worker"""
+
+        sess = SessionLocal()
+
+        try:
+
+            pending = sess.query(LeadTask).filter(LeadTask.id == task_id, LeadTask.status == "queued")
+
+            claimed = pending.filter(or_(LeadTask.cancel_requested.is_(None), LeadTask.cancel_requested == False)).update(  # noqa: E712
+
+                {"status": "running", "owner": self.owner, "updated_at": time.time(),
+
+                 "progress": func.max(func.coalesce(LeadTask.progress, 0.0), 5.0)}, synchronize_session=False)
+
+            if not claimed:
+
+                # noch queued, aber Abbruch angefordert
+
+                pending.update({"status": "canceled", "updated_at": time.time()}, synchronize_session=False)
+
+                sess.commit()
+
+                return None
+
+            sess.commit()
+
+            t = sess.get(LeadTask, task_id)
+
+            return t.kind or "web_hunt", json.loads(t.params or "{}")
+
+        finally:
+
+            sess.close()
+
+    def _run(self, task_id: str):
+
+        claimed = self._claim(task_id)
+
+        if claimed is None: return
+
+        kind, params = claimed
+
+        token = CancelToken(task_id)
+
+        progress = ProgressWriter(task_id, token)
+
+        with self._lock:
+
+            self._tokens[task_id] = token
+
+        try:
+
+            handler = self.handlers.get(kind)
+
+            if handler is None: raise RuntimeError(f"no handler for job kind '{kind}'")
+
+            result = handler(task_id, params, token, progress)
+
+            token.raise_if_cancelled()
+
+            progress.update(progress=100.0, result=json.dumps(result), status="done")
+
+        except TaskCancelled:
+
+            progress.update(status="canceled")
+
+        except Exception as e:
+
+            progress.update(status="error", error=str(e))
+
+        finally:
+
+            with self._lock:
+
+                self._tokens.pop(task_id, None)
+
+
+
+_engine: Optional[LeadJobEngine] = None
+
+_engine_lock = threading.Lock()
+
+
+
+def get_engine() -> LeadJobEngine:
+
+    global _engine
 
+    with _engine_lock:
 
+        if _engine is None: _engine = LeadJobEngine()
 
+        return _engine
 
 
 
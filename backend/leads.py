@@ -1,9 +1,14 @@
-import csv, io, re
+import csv, io, json, re, shutil, tempfile
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import insert
 from .db import SessionLocal
 from .models import Lead
 from .license import has_feature
+from .app.services.xlsx_stream import new_workbook, write_sheet
 import openpyxl
 
 router = APIRouter(prefix="/api/leads", tags=["leads"])
@@ -20,73 +25,136 @@ def _exists(db, company: str, email: str) -> bool:
         q = q.filter(Lead.contact_email==(email.strip()))
     return q.first() is not None
 
-def _upsert(db, company: str, name: str, email: str):
-    company = (company or "").strip()
-    name = (name or "").strip()
-    email = (email or "").strip()
-    if not company:
-        return False
+IMPORT_CHUNK_SIZE = 1000
+
+def _lead_keys(db):
+    """Dedupe-Schlüssel aller Leads, einmal pro Import geladen: (Firma, Mail)-Paare und Firmen"""
+    pairs, companies = set(), set()
+    for company, email in db.query(Lead.company, Lead.contact_email).yield_per(5000):
+        companies.add(company)
+        pairs.add((company, email or ""))
+    return pairs, companies
+
+def _clean(company, name, email):
+    company = str(company or "").strip()
+    name = str(name or "").strip()
+    email = str(email or "").strip()
     if email and not _valid_email(email):
         email = ""  # ungültige Mail ignorieren
-    if _exists(db, company, email):
-        return False
-    db.add(Lead(company=company, contact_name=name, contact_email=email, status="new"))
-    return True
+    return company, name, email
 
-@router.post("/import/csv")
-async def import_csv(file: UploadFile = File(...), 
-                     map_company: str = Form("company"),
-                     map_contact_name: str = Form("contact_name"),
-                     map_contact_email: str = Form("contact_email")):
-    if not has_feature("csv_import"):
-        raise HTTPException(403, "Feature not allowed in current tier")
+def _bulk_import(rows, chunk_size: int):
+    """Importiert (Firma, Name, Mail)-Zeilen chunkweise per executemany; liefert den Fortschritt je Chunk"""
     db = SessionLocal()
     try:
-        content = await file.read()
-        reader = csv.DictReader(io.StringIO(content.decode("utf-8")))
-        count = 0
-        for row in reader:
-            ok = _upsert(db,
-                row.get(map_company,""),
-                row.get(map_contact_name,""),
-                row.get(map_contact_email,"")
-            )
-            if ok: count += 1
-        db.commit()
-        return {"ok": True, "imported": count}
+        pairs, companies = _lead_keys(db)
+        stats = {"chunk": 0, "rows": 0, "imported": 0, "skipped": 0}
+        chunk = []
+        def flush():
+            if chunk:
+                db.execute(insert(Lead), chunk)
+                db.commit()
+            stats["chunk"] += 1
+            stats["imported"] += len(chunk)
+            chunk.clear()
+            return dict(stats)
+        for raw in rows:
+            stats["rows"] += 1
+            company, name, email = _clean(*raw)
+            # gleiche Regel wie _exists: mit Mail zählt das Paar, ohne Mail schon die Firma
+            if not company or ((company, email) in pairs if email else company in companies):
+                stats["skipped"] += 1
+            else:
+                pairs.add((company, email))
+                companies.add(company)
+                chunk.append({"company": company, "contact_name": name, "contact_email": email, "status": "new"})
+            if stats["rows"] % chunk_size == 0:
+                yield flush()
+        if chunk or stats["rows"] % chunk_size:
+            yield flush()
     finally:
         db.close()
 
+def _csv_rows(fh, map_company: str, map_contact_name: str, map_contact_email: str):
+    reader = csv.DictReader(io.TextIOWrapper(fh, encoding="utf-8-sig", newline=""))
+    for row in reader:
+        yield row.get(map_company, ""), row.get(map_contact_name, ""), row.get(map_contact_email, "")
+
+def _xlsx_rows(fh, map_company: str, map_contact_name: str, map_contact_email: str):
+    # read_only liest die Zeilen als Stream aus dem ZIP statt das ganze Blatt aufzubauen
+    wb = openpyxl.load_workbook(fh, read_only=True, data_only=True)
+    rows = wb.active.iter_rows(values_only=True)
+    headers = [str(h or "").strip() for h in next(rows, ())]
+    if map_company not in headers:
+        wb.close()
+        raise HTTPException(400, "Mapping: map_company header not found")
+    idx = [headers.index(h) if h in headers else None for h in (map_company, map_contact_name, map_contact_email)]
+    def gen():
+        try:
+            for row in rows:
+                yield tuple(row[i] if i is not None and i < len(row) else "" for i in idx)
+        finally:
+            wb.close()
+    return gen()
+
+def _spool(file: UploadFile):
+    # FastAPI schließt den Upload, bevor eine StreamingResponse läuft – daher eigene Kopie
+    tmp = tempfile.TemporaryFile()
+    shutil.copyfileobj(file.file, tmp)
+    tmp.seek(0)
+    return tmp
+
+def _stream_progress(progress, fh):
+    try:
+        last = {"chunk": 0, "rows": 0, "imported": 0, "skipped": 0}
+        for last in progress:
+            yield json.dumps(last) + "\n"
+        yield json.dumps({"ok": True, "done": True, **last}) + "\n"
+    finally:
+        fh.close()
+
+def _import_response(read_rows, file: UploadFile, mapping, chunk_size: int, progress: bool):
+    chunk_size = max(1, min(chunk_size, 10000))
+    if progress:
+        fh = _spool(file)
+        try:
+            rows = read_rows(fh, *mapping)
+        except Exception:
+            fh.close()
+            raise
+        return StreamingResponse(_stream_progress(_bulk_import(rows, chunk_size), fh),
+                                 media_type="application/x-ndjson")
+    last = {"chunk": 0, "rows": 0, "imported": 0, "skipped": 0}
+    for last in _bulk_import(read_rows(file.file, *mapping), chunk_size):
+        pass
+    return {"ok": True, "imported": last["imported"], "skipped": last["skipped"],
+            "rows": last["rows"], "chunks": last["chunk"]}
+
+@router.post("/import/csv")
+def import_csv(file: UploadFile = File(...),
+               map_company: str = Form("company"),
+               map_contact_name: str = Form("contact_name"),
+               map_contact_email: str = Form("contact_email"),
+               chunk_size: int = Form(IMPORT_CHUNK_SIZE),
+               progress: bool = Form(False)):
+    """CSV-Import im Stream; mit progress=true kommt pro Chunk eine NDJSON-Zeile."""
+    if not has_feature("csv_import"):
+        raise HTTPException(403, "Feature not allowed in current tier")
+    mapping = (map_company, map_contact_name, map_contact_email)
+    return _import_response(_csv_rows, file, mapping, chunk_size, progress)
+
 @router.post("/import/xlsx")
-async def import_xlsx(file: UploadFile = File(...),
-                      map_company: str = Form("company"),
-                      map_contact_name: str = Form("contact_name"),
-                      map_contact_email: str = Form("contact_email")):
+def import_xlsx(file: UploadFile = File(...),
+                map_company: str = Form("company"),
+                map_contact_name: str = Form("contact_name"),
+                map_contact_email: str = Form("contact_email"),
+                chunk_size: int = Form(IMPORT_CHUNK_SIZE),
+                progress: bool = Form(False)):
+    """XLSX-Import (read-only, zeilenweise); mit progress=true kommt pro Chunk eine NDJSON-Zeile."""
     if not has_feature("xlsx_import"):
         raise HTTPException(403, "Feature not allowed in current tier (need PRO)")
-    db = SessionLocal()
-    try:
-        content = await file.read()
-        wb = openpyxl.load_workbook(io.BytesIO(content))
-        ws = wb.active
-        headers = [ (ws.cell(row=1, column=c).value or "").strip() for c in range(1, ws.max_column+1) ]
-        try:
-            idx_company = headers.index(map_company)
-        except ValueError:
-            raise HTTPException(400, "Mapping: map_company header not found")
-        idx_name = headers.index(map_contact_name) if map_contact_name in headers else None
-        idx_email = headers.index(map_contact_email) if map_contact_email in headers else None
-        count = 0
-        for r in range(2, ws.max_row+1):
-            company = str(ws.cell(row=r, column=(idx_company+1)).value or "").strip()
-            name = str(ws.cell(row=r, column=(idx_name+1)).value or "").strip() if idx_name is not None else ""
-            email = str(ws.cell(row=r, column=(idx_email+1)).value or "").strip() if idx_email is not None else ""
-            ok = _upsert(db, company, name, email)
-            if ok: count += 1
-        db.commit()
-        return {"ok": True, "imported": count}
-    finally:
-        db.close()
+    mapping = (map_company, map_contact_name, map_contact_email)
+    return _import_response(_xlsx_rows, file, mapping, chunk_size, progress)
 
 @router.get("/")
 def list_leads(limit: int = 50):
@@ -97,6 +165,111 @@ def list_leads(limit: int = 50):
     finally:
         db.close()
 
+EXPORT_FIELDS = ["id", "company", "contact_name", "contact_email", "status", "notes", "created_at"]
+EXPORT_MEDIA = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+EXPORT_BATCH_SIZE = 1000
+_XLSX_CHUNK = 64 * 1024
+
+def _parse_ts(value: Optional[str], name: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(400, f"{name} must be ISO date/datetime")
+
+def _export_query(db, status: Optional[str], q: Optional[str], since: Optional[datetime],
+                  until: Optional[datetime], has_email: Optional[bool]):
+    # Filter laufen komplett in SQL; sortiert nach id, damit der Cursor stabil durchläuft
+    query = db.query(*[getattr(Lead, f) for f in EXPORT_FIELDS])
+    if status:
+        query = query.filter(Lead.status.in_([x.strip() for x in status.split(",") if x.strip()]))
+    if q:
+        query = query.filter(Lead.company.ilike(f"%{q.strip()}%"))
+    if since:
+        query = query.filter(Lead.created_at >= since)
+    if until:
+        query = query.filter(Lead.created_at < until)
+    if has_email is True:
+        query = query.filter(Lead.contact_email.isnot(None), Lead.contact_email != "")
+    elif has_email is False:
+        query = query.filter((Lead.contact_email.is_(None)) | (Lead.contact_email == ""))
+    return query.order_by(Lead.id)
+
+def _iter_leads(filters: dict, batch_size: int):
+    """Liest die lead-Tabelle batchweise per Cursor (yield_per) – Speicherbedarf unabhängig von der Tabellengröße"""
+    db = SessionLocal()
+    try:
+        for row in _export_query(db, **filters).yield_per(batch_size):
+            yield tuple(row)
+    finally:
+        db.close()
+
+def _cell(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _stream_csv(rows, batch_size: int):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+    for n, row in enumerate(rows, 1):
+        writer.writerow([_cell(v) for v in row])
+        if n % batch_size == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+def _stream_ndjson(rows, batch_size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(dict(zip(EXPORT_FIELDS, map(_cell, row))), ensure_ascii=False))
+        if len(chunk) >= batch_size:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+def _stream_xlsx(rows, batch_size: int):
+    # write-only-Workbook schreibt Zeilen direkt weg; das fertige ZIP wird aus einer Temp-Datei gestreamt
+    wb = new_workbook()
+    write_sheet(wb, "leads", EXPORT_FIELDS, rows)
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            data = tmp.read(_XLSX_CHUNK)
+            if not data:
+                break
+            yield data
+
+_EXPORT_WRITERS = {"csv": _stream_csv, "ndjson": _stream_ndjson, "xlsx": _stream_xlsx}
+
+@router.get("/export")
+def export_leads(format: str = "csv", status: Optional[str] = None, q: Optional[str] = None,
+                 since: Optional[str] = None, until: Optional[str] = None,
+                 has_email: Optional[bool] = None, batch_size: int = EXPORT_BATCH_SIZE):
+    """Streamt die komplette (gefilterte) lead-Tabelle als CSV, NDJSON oder XLSX."""
+    fmt = (format or "").lower()
+    if fmt not in _EXPORT_WRITERS:
+        raise HTTPException(400, "format must be csv|ndjson|xlsx")
+    filters = {
+        "status": status,
+        "q": q,
+        "since": _parse_ts(since, "since"),
+        "until": _parse_ts(until, "until"),
+        "has_email": has_email,
+    }
+    batch_size = max(1, min(batch_size, 10000))
+    body = _EXPORT_WRITERS[fmt](_iter_leads(filters, batch_size), batch_size)
+    filename = f"leads_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return StreamingResponse(body, media_type=EXPORT_MEDIA[fmt],
+                             headers={"Content-Disposition": f"attachment; filename={filename}"})
+
 class LeadCreate(BaseModel):
     company: str
     contact_name: str = ""
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Boolean, Text, JSON, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from .db import Base
 
@@ -23,6 +23,7 @@ class Contact(Base):
 
 class Lead(Base):
     __tablename__ = "lead"
+    __table_args__ = (Index("ix_lead_company_contact_email", "company", "contact_email"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     company: Mapped[str] = mapped_column(String(200))
     contact_name: Mapped[str] = mapped_column(String(200), nullable=True)
@@ -50,6 +51,7 @@ class OfferItem(Base):
 
 class FollowUp(Base):
     __tablename__ = "followup"
+    __table_args__ = (Index("ix_followup_done_due_at", "done", "due_at"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     entity_type: Mapped[str] = mapped_column(String(50))   # lead|offer
     entity_id: Mapped[int] = mapped_column(Integer)
@@ -107,6 +109,7 @@ class Interaction(Base):
 
 class Suggestion(Base):
     __tablename__ = "suggestion"
+    __table_args__ = (Index("ix_suggestion_consumed_score", "consumed", "score"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     kind: Mapped[str] = mapped_column(String(30))  # discount|followup|lead|tip
     title: Mapped[str] = mapped_column(String(300))
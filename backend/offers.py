@@ -1,14 +1,18 @@
-import os
+import asyncio, glob, hashlib, json, os, tempfile, weakref, zipfile
 from datetime import datetime, timedelta
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, Body
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from typing import Any, Dict
+from starlette.background import BackgroundTask
+from typing import Any, Dict, List, Optional
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.colors import black, HexColor
 from reportlab.lib.utils import ImageReader
 from .db import SessionLocal
 from .models import Offer, OfferItem, FollowUp
+from .app.services import render_farm
 
 router = APIRouter(prefix="/api/offers", tags=["offers"])
 
@@ -65,58 +69,152 @@ def draft_offer(payload: Dict[str, Any] = Body(...)):
     finally:
         db.close()
 
+EXPORTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "exports"))
+LOGO_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets", "logo.png"))
+BULK_MAX_OFFERS = int(os.getenv("OFFER_BULK_MAX", "500"))
+
+@lru_cache(maxsize=1)
+def _logo() -> Optional[ImageReader]:
+    # Logo einmal pro Prozess laden (Render-Worker behalten es für alle Angebote)
+    try:
+        if os.path.exists(LOGO_PATH):
+            return ImageReader(LOGO_PATH)
+    except Exception:
+        pass
+    return None
+
 def _draw_header(c: canvas.Canvas, w, h):
     c.setFillColor(BLACK); c.setFont("Helvetica-Bold", 18)
     c.drawString(50, h-60, "Angebot")
     # Logo falls vorhanden
-    try:
-        here = os.path.dirname(__file__)
-        logo = os.path.abspath(os.path.join(here, "..", "assets", "logo.png"))
-        if os.path.exists(logo):
-            img = ImageReader(logo)
+    img = _logo()
+    if img is not None:
+        try:
             c.drawImage(img, w-210, h-100, width=160, height=48, mask='auto')
-    except Exception:
-        pass
+        except Exception:
+            pass
     c.setStrokeColor(ORANGE)
     c.setLineWidth(2)
     c.line(50, h-105, w-50, h-105)
 
-@router.get("/{offer_id}/pdf")
-def offer_pdf(offer_id: int):
+def _offer_data(offer: Offer, items: List[OfferItem]) -> Dict[str, Any]:
+    """Alles, was im PDF landet – Grundlage für den Revisions-Hash"""
+    return {
+        "id": offer.id,
+        "customer": offer.customer,
+        "total_net": offer.total_net,
+        "total_gross": offer.total_gross,
+        "items": [{"name": it.name, "qty": it.qty, "unit_price": it.unit_price} for it in items],
+    }
+
+def offer_revision(data: Dict[str, Any]) -> str:
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+def _offer_path(data: Dict[str, Any]) -> str:
+    return os.path.join(EXPORTS_DIR, f"angebot_{data['id']}_{offer_revision(data)}.pdf")
+
+# Rendern und Aufräumen je Angebot nacheinander, sonst löscht eine Revision die frisch gelieferte Datei der anderen
+# (schwache Referenzen: der Eintrag verschwindet, sobald niemand mehr rendert oder wartet)
+_offer_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _offer_lock(offer_id: int) -> asyncio.Lock:
+    lock = _offer_locks.get(offer_id)
+    if lock is None:
+        lock = _offer_locks[offer_id] = asyncio.Lock()
+    return lock
+
+def _drop_old_revisions(offer_id: int, keep: str) -> None:
+    for old in glob.glob(os.path.join(EXPORTS_DIR, f"angebot_{offer_id}_*.pdf")):
+        if os.path.abspath(old) != keep:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+def _load_offers(offer_ids: List[int]) -> List[Dict[str, Any]]:
+    """Angebote samt Positionen mit zwei Queries laden (Reihenfolge wie angefragt)"""
     db = SessionLocal()
     try:
-        offer = db.get(Offer, offer_id)
-        if not offer:
-            raise HTTPException(404, "Offer not found")
-        items = db.query(OfferItem).filter(OfferItem.offer_id==offer_id).all()
-        exports = os.path.join(os.path.dirname(__file__), "..", "exports")
-        os.makedirs(exports, exist_ok=True)
-        out_path = os.path.abspath(os.path.join(exports, f"angebot_{offer_id}.pdf"))
-
-        c = canvas.Canvas(out_path, pagesize=A4)
-        w, h = A4
-        _draw_header(c, w, h)
-        y = h-140
-        c.setFont("Helvetica", 11)
-        c.setFillColor(ORANGE)
-        c.drawString(50, y, f"Kunde: {offer.customer}")
-        c.setFillColor(BLACK); y -= 20
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(50, y, "Pos"); c.drawString(85, y, "Artikel"); c.drawString(415, y, "Menge"); c.drawString(485, y, "Einzelpreis")
-        y -= 14; c.setFont("Helvetica", 11)
-        pos = 1
-        for it in items:
-            c.drawString(50, y, str(pos)); c.drawString(85, y, it.name[:56])
-            c.drawRightString(455, y, f"{it.qty:g}")
-            c.drawRightString(560, y, f"{it.unit_price:,.2f} €")
-            y -= 16; pos += 1
-            if y < 120:
-                c.showPage(); _draw_header(c, w, h); y = h-140; c.setFont("Helvetica", 11)
-        y -= 10
-        c.setFont("Helvetica-Bold", 12); c.setFillColor(ORANGE)
-        c.drawRightString(560, y, f"Netto: {offer.total_net:,.2f} €"); y -= 16
-        c.drawRightString(560, y, f"Brutto (19%): {offer.total_gross:,.2f} €")
-        c.save()
-        return {"ok": True, "pdf": out_path}
+        offers = {o.id: o for o in db.query(Offer).filter(Offer.id.in_(offer_ids)).all()}
+        items: Dict[int, List[OfferItem]] = {}
+        for it in db.query(OfferItem).filter(OfferItem.offer_id.in_(list(offers))).order_by(OfferItem.id):
+            items.setdefault(it.offer_id, []).append(it)
+        return [_offer_data(offers[i], items.get(i, [])) for i in offer_ids if i in offers]
     finally:
         db.close()
+
+def render_offer_pdf(data: Dict[str, Any], out_path: str) -> None:
+    """Zeichnet ein Angebot nach `out_path`; läuft im Render-Worker"""
+    c = canvas.Canvas(out_path, pagesize=A4)
+    w, h = A4
+    _draw_header(c, w, h)
+    y = h-140
+    c.setFont("Helvetica", 11)
+    c.setFillColor(ORANGE)
+    c.drawString(50, y, f"Kunde: {data['customer']}")
+    c.setFillColor(BLACK); y -= 20
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Pos"); c.drawString(85, y, "Artikel"); c.drawString(415, y, "Menge"); c.drawString(485, y, "Einzelpreis")
+    y -= 14; c.setFont("Helvetica", 11)
+    pos = 1
+    for it in data["items"]:
+        c.drawString(50, y, str(pos)); c.drawString(85, y, it["name"][:56])
+        c.drawRightString(455, y, f"{it['qty']:g}")
+        c.drawRightString(560, y, f"{it['unit_price']:,.2f} €")
+        y -= 16; pos += 1
+        if y < 120:
+            c.showPage(); _draw_header(c, w, h); y = h-140; c.setFont("Helvetica", 11)
+    y -= 10
+    c.setFont("Helvetica-Bold", 12); c.setFillColor(ORANGE)
+    c.drawRightString(560, y, f"Netto: {data['total_net']:,.2f} €"); y -= 16
+    c.drawRightString(560, y, f"Brutto (19%): {data['total_gross']:,.2f} €")
+    c.save()
+
+async def _render_offer(data: Dict[str, Any]) -> str:
+    # Unveränderte Angebote (gleicher Revisions-Hash) liefern die vorhandene Datei
+    path = _offer_path(data)
+    async with _offer_lock(data["id"]):
+        os.makedirs(EXPORTS_DIR, exist_ok=True)
+        job = render_farm.get_farm().submit("offer", data, path)
+        await render_farm.wait_for(job)
+        if not job.cached:
+            _drop_old_revisions(data["id"], path)
+    return path
+
+@router.get("/{offer_id}/pdf")
+async def offer_pdf(offer_id: int):
+    found = await asyncio.to_thread(_load_offers, [offer_id])
+    if not found:
+        raise HTTPException(404, "Offer not found")
+    out_path = await _render_offer(found[0])
+    return {"ok": True, "pdf": out_path, "revision": offer_revision(found[0])}
+
+class BulkPdfIn(BaseModel):
+    ids: List[int]
+
+def _write_zip(paths: List[str]) -> str:
+    fd, zip_path = tempfile.mkstemp(suffix=".zip")
+    with os.fdopen(fd, "wb") as handle, zipfile.ZipFile(handle, "w", zipfile.ZIP_DEFLATED) as zf:
+        for path in paths:
+            # Im Archiv ohne Revisions-Suffix: angebot_<id>.pdf
+            zf.write(path, arcname=os.path.basename(path).rsplit("_", 1)[0] + ".pdf")
+    return zip_path
+
+@router.post("/pdf/bulk")
+async def offers_pdf_bulk(inp: BulkPdfIn):
+    """Rendert mehrere Angebote parallel im Render-Pool und liefert sie als ZIP."""
+    ids = list(dict.fromkeys(inp.ids))
+    if not ids:
+        raise HTTPException(400, "ids must not be empty")
+    if len(ids) > BULK_MAX_OFFERS:
+        raise HTTPException(400, f"at most {BULK_MAX_OFFERS} offers per request")
+    found = await asyncio.to_thread(_load_offers, ids)
+    if not found:
+        raise HTTPException(404, "Offer not found")
+    paths = await asyncio.gather(*[_render_offer(data) for data in found])
+    zip_path = await asyncio.to_thread(_write_zip, list(paths))
+    missing = sorted(set(ids) - {data["id"] for data in found})
+    headers = {"X-Missing-Offers": ",".join(map(str, missing))} if missing else None
+    return FileResponse(zip_path, media_type="application/zip", filename="angebote.zip",
+                        headers=headers, background=BackgroundTask(os.remove, zip_path))
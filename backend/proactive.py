@@ -8,10 +8,18 @@ from dataclasses import dataclass, asdict
 
 
 
-from sqlalchemy import Column, String, Float, Text, create_engine, select
+from sqlalchemy import Column, String, Float, Text, select
 
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+try:
+
+    from backend.app.core.db import engine_for
+
+except ImportError:
+
+    from app.core.db import engine_for
+
 
 
 DATA_DIR = os.environ.get("FREIRAUM_DATA_DIR") or os.path.join(os.getcwd(), "data")
@@ -24,7 +32,7 @@ DB_PATH = os.path.join(DATA_DIR, "proactive.db")
 
 Base = declarative_base()
 
-engine = create_engine(f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False})
+engine = engine_for(f"sqlite:///{DB_PATH}")
 
 SessionLocal = sessionmaker(bind=engine)
 
@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
 from .db import SessionLocal
 from .models import Lead, Offer, Interaction
-import io, csv
+from .app.services import render_farm
+import asyncio, io, csv
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
@@ -93,8 +94,7 @@ def export_csv():
         "Content-Disposition": "attachment; filename=freiraum_reports.csv"
     })
 
-@router.get("/export.pdf")
-def export_pdf():
+def kpi_counts():
     db = SessionLocal()
     try:
         leads = db.query(Lead).count()
@@ -102,14 +102,17 @@ def export_pdf():
         won = db.query(Offer).filter(Offer.status=="won").count()
     finally:
         db.close()
-    buf = io.BytesIO()
-    c = canvas.Canvas(buf, pagesize=A4)
+    return {"leads": leads, "offers": offers, "won_offers": won}
+
+def render_kpi_pdf(kpis, target, created=None):
+    """Zeichnet den KPI-Report nach `target` (Pfad oder Buffer); läuft auch im Render-Worker"""
+    c = canvas.Canvas(target, pagesize=A4)
     w, h = A4
     c.setFillColorRGB(0,0,0)
     c.setFont("Helvetica-Bold", 18)
     c.drawString(2*cm, h-2*cm, "Freiraum Mitarbeiter – KPI Report")
     c.setFont("Helvetica", 11)
-    c.drawString(2*cm, h-3*cm, f"Erstellt: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
+    c.drawString(2*cm, h-3*cm, f"Erstellt: {created or datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
     # Linie
     c.setStrokeColorRGB(1, .45, 0)  # Orange
     c.setLineWidth(2)
@@ -121,11 +124,15 @@ def export_pdf():
         c.setFont("Helvetica-Bold", 13); c.drawString(2*cm, y, label)
         c.setFont("Helvetica", 13); c.drawRightString(w-2*cm, y, str(value))
         y -= 1.0*cm
-    row("Leads", leads)
-    row("Angebote", offers)
-    row("Gewonnen", won)
+    row("Leads", kpis.get("leads", 0))
+    row("Angebote", kpis.get("offers", 0))
+    row("Gewonnen", kpis.get("won_offers", 0))
     c.showPage(); c.save()
-    buf.seek(0)
-    return StreamingResponse(buf, media_type="application/pdf", headers={
-        "Content-Disposition": "attachment; filename=freiraum_reports.pdf"
-    })
+
+@router.get("/export.pdf")
+async def export_pdf():
+    kpis = await asyncio.to_thread(kpi_counts)
+    # Zeitstempel minutengenau im Payload: gleiche Zahlen in derselben Minute → gecachte Datei
+    payload = {**kpis, "created": datetime.now().strftime("%d.%m.%Y %H:%M")}
+    path = await render_farm.render("kpi_report", payload)
+    return FileResponse(path, media_type="application/pdf", filename="freiraum_reports.pdf")
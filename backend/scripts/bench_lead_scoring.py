@@ -0,0 +1,62 @@
+"""Benchmark: zeilenweises vs. vektorisiertes Lead-Scoring auf synthetischen Leads.
+
+Aufruf (aus backend/): python scripts/bench_lead_scoring.py [anzahl]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.lead_radar import LeadFeatures, score_batch, score_one  # noqa: E402
+
+CATEGORIES = ["shk", "elektro", "maler", "dachdecker", "sanitaer", "tischler", "galabau", "makler"]
+
+
+def synthetic_leads(n: int, seed: int = 42):
+    rnd = random.Random(seed)
+    leads = []
+    for i in range(n):
+        lead = {"company": f"Betrieb {i}", "category": rnd.choice(CATEGORIES), "source": "osm"}
+        if rnd.random() < 0.6:
+            lead["email"] = f"info@betrieb{i}.de"
+        if rnd.random() < 0.7:
+            lead["phone"] = "02931 12345"
+        if rnd.random() < 0.5:
+            lead["website"] = f"https://betrieb{i}.de"
+        if rnd.random() < 0.9:
+            lead["city"] = "Arnsberg"
+        leads.append(lead)
+    return leads
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    leads = synthetic_leads(n)
+
+    start = time.perf_counter()
+    scores = score_batch(leads)
+    batch = time.perf_counter() - start
+    print(f"score_batch:  {n:>9} Leads in {batch:6.2f}s  ({n / batch:,.0f} Leads/s)")
+
+    start = time.perf_counter()
+    features = LeadFeatures(leads)
+    print(f"LeadFeatures: {n:>9} Leads in {time.perf_counter() - start:6.2f}s  (einmalig)")
+    for profile in ("default", "outreach", "phone"):
+        start = time.perf_counter()
+        features.score(profile)
+        elapsed = time.perf_counter() - start
+        print(f"  Re-Score {profile:<9} {elapsed * 1000:8.1f}ms  ({n / elapsed:,.0f} Leads/s)")
+
+    start = time.perf_counter()
+    rowwise = [score_one(r)["score"] for r in leads]
+    single = time.perf_counter() - start
+    print(f"score_one:    {n:>9} Leads in {single:6.2f}s  ({n / single:,.0f} Leads/s)")
+
+    assert list(scores) == rowwise, "Batch- und Einzel-Scores weichen ab"
+    print(f"Speedup: {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 import os
+from ..app.core.db import engine_for
 from .models import Base, Sequence, SequenceRun
 from .schemas import SequenceCreate, SequenceOut, RunCreate, RunOut
 from .service import execute_sequence_run
 
 DATA_DIR = os.getenv("FREIRAUM_DATA_DIR", os.path.abspath(os.path.join(os.getcwd(), "data")))
 DB_URL = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'freiraum.db')}")
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False} if DB_URL.startswith("sqlite") else {})
+engine = engine_for(DB_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base.metadata.create_all(bind=engine)
 
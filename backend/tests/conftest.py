@@ -0,0 +1,14 @@
+import os
+import tempfile
+
+# Module mit Import-Seiteneffekten (lead_tasks, proactive, character) legen ihre DBs unter FREIRAUM_DATA_DIR an;
+# die Tests sollen nie in das echte data/-Verzeichnis schreiben
+_data_dir = tempfile.mkdtemp(prefix="freiraum-tests-")
+os.environ.setdefault("FREIRAUM_DATA_DIR", _data_dir)
+# Export-Katalog und Caches ebenso, sonst landen sie im Backend-Root
+os.environ.setdefault("EXPORT_CATALOG_DB", os.path.join(_data_dir, "export_catalog.db"))
+os.environ.setdefault("RENDER_CACHE_DIR", os.path.join(_data_dir, "cache", "render"))
+os.environ.setdefault("PAGE_CACHE_DIR", os.path.join(_data_dir, "cache", "pages"))
+os.environ.setdefault("GEOCODE_DB", os.path.join(_data_dir, "cache", "geocode.db"))
+os.environ.setdefault("TIERED_CACHE_DB", os.path.join(_data_dir, "cache", "cache.db"))
+os.environ.setdefault("SPATIAL_DB", os.path.join(_data_dir, "cache", "spatial.db"))
@@ -0,0 +1,76 @@
+import sys, pathlib
+from datetime import datetime
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.services import columnar_export
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+
+from backend.audit_logger import AuditLogger
+from backend.db import Base
+from backend.models import Interaction, Lead, Offer, OfferItem
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    tables = [m.__table__ for m in (Lead, Interaction, Offer, OfferItem)]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    db = sessionmaker(bind=engine)()
+    for i in range(7):
+        db.add(Lead(company=f"Betrieb {i}", contact_email=f"info{i}@example.de", created_at=datetime(2025, 3, 1 + i)))
+    db.add(Interaction(contact_email="info1@example.de", channel="call", sentiment=1, meta={"dauer": 5}))
+    db.add(Offer(customer="Betrieb 1", total_net=100.0, total_gross=119.0))
+    db.commit()
+    db.add(OfferItem(offer_id=1, name="Wartung", qty=2.0, unit_price=50.0))
+    db.commit()
+    db.close()
+    return engine
+
+
+def test_parquet_export_is_typed_and_batched(engine, tmp_path):
+    """Test typed Parquet output written in several row groups"""
+    audit_db = str(tmp_path / "audit" / "audit_log.db")
+    AuditLogger(audit_db).log(action="lead.create", entity_id=3, status=200, payload={"a": 1})
+
+    files = columnar_export.export_all(str(tmp_path / "out"), engine=engine, audit_db=audit_db, batch_size=3)
+    by_table = {f["table"]: f for f in files}
+    assert set(by_table) == set(columnar_export.TABLES)
+    assert by_table["lead"]["rows"] == 7
+
+    lead_file = pq.ParquetFile(by_table["lead"]["path"])
+    assert lead_file.num_row_groups == 3
+    leads = lead_file.read()
+    assert leads.schema.field("id").type == pa.int64()
+    assert leads.schema.field("created_at").type == pa.timestamp("us")
+    assert leads.column("company").to_pylist()[-1] == "Betrieb 6"
+
+    interactions = pq.read_table(by_table["interaction"]["path"])
+    assert interactions.column("meta").to_pylist() == ['{"dauer": 5}']
+    items = pq.read_table(by_table["offer_item"]["path"])
+    assert items.column("unit_price").to_pylist() == [50.0]
+
+    audit = pq.read_table(by_table["audit"]["path"])
+    assert audit.schema.field("ts").type == pa.timestamp("ms", tz="UTC")
+    assert audit.column("status").to_pylist() == [200]
+
+
+def test_arrow_ipc_export(engine, tmp_path):
+    """Test Arrow IPC file output and table validation"""
+    files = columnar_export.export_all(str(tmp_path / "out"), ["offer"], "arrow", engine=engine)
+    assert files[0]["name"].endswith(".arrow")
+    with pa_ipc.open_file(files[0]["path"]) as reader:
+        table = reader.read_all()
+    assert table.column("total_gross").to_pylist() == [119.0]
+
+    with pytest.raises(ValueError):
+        columnar_export.export_all(str(tmp_path / "out"), ["secrets"], engine=engine)
@@ -0,0 +1,42 @@
+import sys, pathlib
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy import text
+
+from app.core import db as core_db
+
+
+def test_one_engine_per_file(tmp_path, monkeypatch):
+    """Test that different spellings of one database path share an engine"""
+    monkeypatch.chdir(tmp_path)
+    first = core_db.engine_for(f"sqlite:///{tmp_path / 'shared.db'}")
+    second = core_db.engine_for("sqlite:///./shared.db")
+    assert first is second
+    assert core_db.engine_for(f"sqlite:///{tmp_path / 'other.db'}") is not first
+
+
+def test_tuned_pragmas_on_every_connection(tmp_path):
+    """Test WAL, synchronous, cache, mmap and temp_store on pooled connections"""
+    engine = core_db.engine_for(f"sqlite:///{tmp_path / 'tuned.db'}")
+    assert engine.pool.size() == core_db.settings.sqlite_pool_size
+    with engine.connect() as a, engine.connect() as b:
+        for conn in (a, b):
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -core_db.settings.sqlite_cache_size_kb
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == core_db.settings.sqlite_busy_timeout_ms
+
+
+def test_modules_share_the_registry():
+    """Test that app.core.db and backend.app.core.db hand out the same engines"""
+    from backend.app.core import db as twin
+    from backend import db as main_db
+
+    assert twin._engines is core_db._engines
+    key = core_db._registry_key(main_db.DB_URL)
+    assert core_db._engines[key] is main_db.engine
+    assert twin.engine_for(main_db.DB_URL) is main_db.engine
@@ -0,0 +1,92 @@
+import gzip
+import os
+import time
+
+import pytest
+
+from app.services import export_catalog
+
+DAY = 86400
+
+
+@pytest.fixture(autouse=True)
+def catalog_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_catalog, "EXPORT_CATALOG_DB", tmp_path / "catalog.db")
+    monkeypatch.setattr(export_catalog, "_synced", set())
+
+
+def _write(directory, name, content="x" * 100, age_days=0.0, **meta):
+    path = directory / name
+    path.write_text(content, encoding="utf-8")
+    created = time.time() - age_days * DAY
+    os.utime(path, (created, created))
+    export_catalog.register(str(path), created_at=created, **meta)
+    return path
+
+
+def test_cursor_pagination_and_filters(tmp_path):
+    """Test keyset pagination newest-first and kind/category/city filters"""
+    for i in range(7):
+        _write(tmp_path, f"leads_{i}.csv", age_days=7 - i, category="shk", city="Arnsberg" if i % 2 else "Sundern")
+    _write(tmp_path, "report.pdf", category="elektro")
+
+    page, cursor = export_catalog.list_page(limit=3)
+    assert [e["name"] for e in page] == ["report.pdf", "leads_6.csv", "leads_5.csv"]
+    names = [e["name"] for e in page]
+    while cursor:
+        page, cursor = export_catalog.list_page(limit=3, cursor=cursor)
+        names += [e["name"] for e in page]
+    assert len(names) == 8 and len(set(names)) == 8
+
+    page, _ = export_catalog.list_page(limit=10, kind="csv", city="Arnsberg")
+    assert [e["name"] for e in page] == ["leads_5.csv", "leads_3.csv", "leads_1.csv"]
+    page, _ = export_catalog.list_page(category="elektro")
+    assert [e["kind"] for e in page] == ["pdf"]
+
+    with pytest.raises(ValueError):
+        export_catalog.list_page(cursor="kaputt")
+
+
+def test_retention_gzips_expires_and_enforces_budget(tmp_path):
+    """Test gzip of old text exports, expiry and size-budget eviction"""
+    _write(tmp_path, "fresh.csv", age_days=1)
+    old_csv = _write(tmp_path, "old.csv", content="a;b\n" * 500, age_days=10, category="shk")
+    _write(tmp_path, "old.xlsx", age_days=10)
+    _write(tmp_path, "ancient.json", age_days=200)
+    (tmp_path / "untracked.md").write_text("# alt", encoding="utf-8")
+
+    stats = export_catalog.apply_retention(tmp_path, gzip_after_days=7, max_age_days=90, max_bytes=10 ** 9)
+    assert stats["gzipped"] == 1 and stats["expired"] == 1 and stats["evicted"] == 0
+    assert not old_csv.exists() and not (tmp_path / "ancient.json").exists()
+    with gzip.open(tmp_path / "old.csv.gz", "rt") as handle:
+        assert handle.read() == "a;b\n" * 500
+    entry = export_catalog.lookup("old.csv.gz")
+    assert entry["compressed"] and entry["category"] == "shk" and entry["kind"] == "csv"
+    assert export_catalog.lookup("old.csv") is None
+    assert export_catalog.lookup("untracked.md") is not None
+
+    stats = export_catalog.apply_retention(tmp_path, gzip_after_days=0, max_age_days=0, max_bytes=150)
+    assert stats["evicted"] >= 2
+    page, _ = export_catalog.list_page(limit=50)
+    assert sum(e["size"] for e in page) <= 150
+    assert "fresh.csv" in [e["name"] for e in page]
+
+
+def test_exports_router_lists_catalog_and_serves_gzip(tmp_path, monkeypatch):
+    """Test /api/exports/list paging and download of a gzipped export"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path))
+    (tmp_path / "legacy.csv").write_text("company\nAlt GmbH\n", encoding="utf-8")
+    _write(tmp_path, "leads_a.json", content='[{"company": "A"}]', age_days=30, city="Meschede")
+    export_catalog.apply_retention(tmp_path, gzip_after_days=7, max_age_days=0, max_bytes=10 ** 9)
+    client = TestClient(app)
+
+    body = client.get("/api/exports/list", params={"limit": 1}).json()
+    assert body["count"] == 1 and body["files"][0]["name"] == "legacy.csv"
+    body = client.get("/api/exports/list", params={"limit": 1, "cursor": body["next_cursor"]}).json()
+    assert body["files"][0]["name"] == "leads_a.json.gz" and body["next_cursor"] is None
+    assert client.get("/api/exports/list", params={"city": "Meschede"}).json()["count"] == 1
+
+    assert client.get("/api/exports/leads_a.json").json() == [{"company": "A"}]
@@ -0,0 +1,43 @@
+import time
+
+from app.services.fetch_pool import DomainLimiter, TokenBucket, fetch_pool
+
+
+def test_token_bucket_spacing():
+    """Test that a bucket allows the burst immediately and then paces requests"""
+    bucket = TokenBucket(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    assert 0.09 <= time.monotonic() - start < 0.5
+
+
+def test_fetch_pool_completion_order_and_want():
+    """Test results arrive in completion order and remaining fetches are dropped after `want` hits"""
+    delays = {"https://slow.de/": 0.3, "https://a.de/": 0.0, "https://b.de/": 0.05, "https://c.de/": 0.1}
+    fetched = []
+
+    def fetch(url):
+        time.sleep(delays.get(url, 0.5))
+        fetched.append(url)
+        return None if url == "https://a.de/" else {"url": url}
+
+    urls = list(delays) + [f"https://rest{i}.de/" for i in range(20)]
+    out = [url for url, _ in fetch_pool(urls, fetch, want=2, max_workers=4)]
+    assert out == ["https://b.de/", "https://c.de/"]
+    assert len(fetched) < len(urls)
+
+
+def test_fetch_pool_per_domain_politeness():
+    """Test requests to one domain are rate limited while other domains proceed"""
+    stamps = {}
+
+    def fetch(url):
+        stamps.setdefault(url.split("/")[2], []).append(time.monotonic())
+        return url
+
+    urls = [f"https://same.de/{i}" for i in range(3)] + ["https://other.de/", "https://third.de/"]
+    results = list(fetch_pool(urls, fetch, max_workers=5, limiter=DomainLimiter(rate=10, burst=1)))
+    assert len(results) == 5
+    same = stamps["same.de"]
+    assert same[-1] - same[0] >= 0.18
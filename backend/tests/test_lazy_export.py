@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from app.services import export_catalog, lazy_export
+from app.services.lead_pipeline import export_rows
+
+
+ROWS = [
+    {"company": "Müller Haustechnik", "city": "Arnsberg", "email": "info@mueller.de"},
+    {"company": "Elektro Schmidt", "city": "Sundern", "phone": "02933 1"},
+]
+
+
+@pytest.fixture(autouse=True)
+def catalog_db(tmp_path_factory, monkeypatch):
+    monkeypatch.setattr(export_catalog, "EXPORT_CATALOG_DB", tmp_path_factory.mktemp("catalog") / "catalog.db")
+
+
+def test_export_rows_writes_only_canonical_and_reuses_hash(tmp_path):
+    """Test that a run writes one compact JSON and identical reruns reuse it"""
+    first = export_rows(ROWS, str(tmp_path), "leads_real_csv")
+    assert set(first) == {"json", "csv", "xlsx", "md"}
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(first["json"])]
+    with open(first["json"], encoding="utf-8") as handle:
+        assert "\n" not in handle.read()
+
+    mtime = os.path.getmtime(first["json"])
+    second = export_rows([dict(row) for row in ROWS], str(tmp_path), "leads_real_csv")
+    assert second == first
+    assert os.path.getmtime(first["json"]) == mtime
+
+    third = export_rows(ROWS[:1], str(tmp_path), "leads_real_csv")
+    assert third["json"] != first["json"]
+
+
+def test_render_on_demand(tmp_path):
+    """Test lazy CSV/XLSX rendering from the canonical artifact"""
+    paths = export_rows(ROWS, str(tmp_path), "leads_real_csv")
+    assert not os.path.exists(paths["csv"])
+
+    assert lazy_export.render(paths["csv"]) == paths["csv"]
+    with open(paths["csv"], encoding="utf-8") as handle:
+        lines = handle.read().splitlines()
+    assert lines[0] == "city,company,email,phone"
+    assert lines[1] == "Arnsberg,Müller Haustechnik,info@mueller.de,"
+
+    assert lazy_export.render(paths["xlsx"]) == paths["xlsx"]
+    assert lazy_export.render(str(tmp_path / "missing.csv")) is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_exports_router_renders_missing_format(tmp_path, monkeypatch):
+    """Test /api/exports/{fname} renders a derived format on first request"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path))
+    paths = export_rows(ROWS, str(tmp_path), "leads_real_csv")
+    client = TestClient(app)
+
+    r = client.get(f"/api/exports/{os.path.basename(paths['md'])}")
+    assert r.status_code == 200
+    assert "- Rows: 2" in r.text
+
+    r = client.get(f"/api/exports/{os.path.basename(paths['json'])}")
+    assert r.json() == ROWS
+
+    assert client.get("/api/exports/unknown_0.csv").status_code == 404
@@ -0,0 +1,53 @@
+from app.services.lead_dedupe import DedupeIndex, dedupe_leads, filter_new, normalize_company, normalize_phone
+
+
+def test_normalize_company():
+    """Test umlaut and legal-form normalization"""
+    assert normalize_company("Müller Haustechnik GmbH & Co. KG") == "mueller haustechnik"
+    assert normalize_company("Mueller Haustechnik") == "mueller haustechnik"
+    assert normalize_company("Elektro Schulz e.K.") == "elektro schulz"
+    assert normalize_phone("+49 2931 12345") == normalize_phone("02931/12345")
+
+
+def test_fuzzy_dedupe_merges_fields():
+    """Test near-duplicate names in the same city are merged and fields are filled"""
+    leads = [
+        {"company": "Müller Haustechnik GmbH", "city": "Arnsberg", "source": "osm", "phone": "02931 12345"},
+        {"company": "Mueller Haustechnik", "city": "Arnsberg", "source": "osm/enriched", "email": "info@mueller-ht.de"},
+        {"company": "Müller Haustechnik GmbH", "city": "Meschede", "source": "osm"},
+        {"company": "Elektro Schulz", "city": "Arnsberg", "website": "https://www.schulz.de"},
+        {"company": "Schulz Elektrotechnik", "city": "Arnsberg", "website": "https://schulz.de/kontakt"},
+    ]
+    out = dedupe_leads(leads)
+    assert len(out) == 3
+    merged = out[0]
+    assert merged["source"] == "osm/enriched"
+    assert merged["phone"] == "02931 12345"
+    assert out[1]["city"] == "Meschede"
+    assert out[2]["company"] == "Elektro Schulz"
+
+
+def test_incremental_filter_against_index():
+    """Test new leads are checked against already known ones"""
+    index = DedupeIndex()
+    index.add(1, {"company": "Heizung Meier GmbH", "email": "kontakt@heizung-meier.de"})
+    fresh = filter_new([
+        {"company": "Heizungsbau Meier", "email": "info@heizung-meier.de"},
+        {"company": "Heizung Meier", "city": "Arnsberg"},
+        {"company": "Sanitär Becker", "email": "becker@gmail.com"},
+        {"company": "Dachdecker Becker", "email": "dach@gmail.com"},
+    ], index)
+    assert [l["company"] for l in fresh] == ["Sanitär Becker", "Dachdecker Becker"]
+
+
+def test_chain_branches_with_shared_domain_stay_separate():
+    """Test that a shared website or hotline does not merge branches in different cities"""
+    leads = [
+        {"company": "Bad & Heizung Filiale", "city": "Arnsberg", "postcode": "59755", "website": "https://kette.de"},
+        {"company": "Bad und Heizung", "city": "Meschede", "postcode": "59872", "website": "https://www.kette.de/meschede"},
+        {"company": "Bad & Heizung", "city": "Arnsberg", "postcode": "59755", "phone": "0800 123456", "website": "kette.de"},
+        {"company": "Bad & Heizung Zentrale", "phone": "+49 800 123456"},
+    ]
+    out = dedupe_leads(leads)
+    assert [lead["city"] for lead in out] == ["Arnsberg", "Meschede"]
+    assert out[0]["phone"] == "0800 123456"
@@ -0,0 +1,51 @@
+import sys, time, pathlib
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import pytest
+
+from backend import audit_logger
+from backend.lead_hunter import router as hunter
+
+
+class _Log:
+    def log(self, **kwargs):
+        pass
+
+
+@pytest.fixture()
+def hunt(monkeypatch):
+    searches = []
+
+    def ddg(q):
+        searches.append(("ddg", q))
+        time.sleep(0.02)
+        n = len(searches)
+        return [f"https://betrieb{n}-{i}.de/kontakt" for i in range(20)]
+
+    def bing(q):
+        searches.append(("bing", q))
+        return ["https://bing-only.de/"]
+
+    def scrape(url):
+        host = url.split("/")[2]
+        return {"company": f"Firma {host}", "email": f"info@{host}", "phone": ""}
+
+    monkeypatch.setattr(hunter, "ddg_links", ddg)
+    monkeypatch.setattr(hunter, "bing_links", bing)
+    monkeypatch.setattr(hunter, "scrape_contact", scrape)
+    monkeypatch.setattr(hunter, "export_leads_xlsx", lambda leads, outdir: None)
+    monkeypatch.setattr(audit_logger, "get_logger", lambda: _Log())
+    monkeypatch.setenv("PIPELINE_WORKERS_SEARCH", "1")
+    return searches
+
+
+def test_hunt_stops_searching_once_enough_links(hunt, monkeypatch):
+    """Test that later searches (Bing) are skipped once max_links domains were seen"""
+    result = hunter.api_hunt(hunter.HuntIn(category="shk", location="Arnsberg", count=5, save_to_db=False, export_excel=False))
+    assert result["found"] == 5
+    assert all(engine == "ddg" for engine, _ in hunt)
+    # 40 Domains (max_links) sind nach zwei der 21 DDG-Suchen beisammen; danach startet kaum noch eine
+    assert len(hunt) < 10
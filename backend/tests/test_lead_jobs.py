@@ -0,0 +1,145 @@
+import os, sys, time, pathlib, threading
+
+BACKEND_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import lead_tasks
+from lead_tasks import LeadJobEngine, LeadTask, get_task
+
+
+@pytest.fixture(autouse=True)
+def tasks_db(tmp_path, monkeypatch):
+    # eigene DB pro Test statt data/lead_tasks.db
+    engine = create_engine(f"sqlite:///{tmp_path / 'lead_tasks.db'}", connect_args={"check_same_thread": False})
+    lead_tasks.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(lead_tasks, "SessionLocal", Session)
+    return Session
+
+
+def _wait_for(task_id, states, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        t = get_task(task_id)
+        if t and t.status in states:
+            return t
+        time.sleep(0.02)
+    return get_task(task_id)
+
+
+def test_job_runs_to_done():
+    """Test a submitted job runs on the worker pool and stores its result"""
+    engine = LeadJobEngine(workers=1)
+    engine.register("echo", lambda task_id, params, token, progress: {"echo": params["value"]})
+    engine.start()
+    task_id = engine.submit("echo", {"value": 42})
+    t = _wait_for(task_id, {"done", "error"})
+    assert t.status == "done"
+    assert t.progress == 100.0
+    assert '"echo": 42' in t.result
+
+
+def test_cooperative_cancel():
+    """Test that cancel() reaches the token checked inside a running loop"""
+    engine = LeadJobEngine(workers=1)
+
+    def slow(task_id, params, token, progress):
+        for i in range(500):
+            token.raise_if_cancelled()
+            progress.update(progress=float(i) / 5)
+            time.sleep(0.01)
+        return {}
+
+    engine.register("slow", slow)
+    engine.start()
+    task_id = engine.submit("slow", {})
+    _wait_for(task_id, {"running"})
+    assert engine.cancel(task_id)
+    t = _wait_for(task_id, {"canceled", "done", "error"})
+    assert t.status == "canceled"
+
+
+def test_resume_takes_only_orphans_and_runs_them_once(tasks_db):
+    """Test that resume skips tasks of live engines and a task is claimed by one worker only"""
+    runs = []
+    lock = threading.Lock()
+
+    def count(task_id, params, token, progress):
+        with lock:
+            runs.append(task_id)
+        return {}
+
+    db = tasks_db()
+    db.add_all([
+        LeadTask(id="orphan-queued", kind="count", status="queued", owner="1:tot", params="{}"),
+        LeadTask(id="orphan-running", kind="count", status="running", owner=None, attempts=0, params="{}"),
+        LeadTask(id="canceled", kind="count", status="queued", owner="1:tot", cancel_requested=True, params="{}"),
+    ])
+    db.commit()
+    db.close()
+
+    first, second = LeadJobEngine(workers=2), LeadJobEngine(workers=2)
+    for engine in (first, second):
+        engine.register("count", count)
+    busy = LeadJobEngine(workers=1)
+    busy.register("count", count)
+    busy.start()
+    own = busy.submit("count", {})
+
+    first.start()
+    # zweite Engine sieht dieselben Tasks: bereits übernommen bzw. erledigt
+    second.start()
+    second.resume_pending()
+    for engine in (first, second):
+        engine._enqueue("orphan-queued", 5)
+    assert _wait_for("orphan-queued", {"done"}).status == "done"
+    assert _wait_for("orphan-running", {"done"}).attempts == 1
+    assert _wait_for(own, {"done"}).owner == busy.owner
+    assert get_task("canceled").status == "canceled"
+    time.sleep(0.1)
+    assert sorted(runs) == sorted(["orphan-queued", "orphan-running", own])
+
+
+def test_resume_respects_heartbeat_of_other_workers(tasks_db):
+    """Test that running tasks of a worker with a fresh heartbeat are left alone until it expires"""
+    db = tasks_db()
+    db.add_all([
+        lead_tasks.LeadJobOwner(owner="2:lebt", heartbeat=time.time()),
+        LeadTask(id="fremd", kind="noop", status="running", owner="2:lebt", attempts=0, params="{}"),
+    ])
+    db.commit()
+    db.close()
+
+    engine = LeadJobEngine(workers=1)
+    engine.register("noop", lambda task_id, params, token, progress: {})
+    engine.start()
+    time.sleep(0.1)
+    t = get_task("fremd")
+    assert t.status == "running" and t.owner == "2:lebt" and t.attempts == 0
+
+    db = tasks_db()
+    db.get(lead_tasks.LeadJobOwner, "2:lebt").heartbeat = time.time() - lead_tasks.LEAD_JOB_OWNER_TIMEOUT - 1
+    db.commit()
+    db.close()
+    assert engine.resume_pending() == 1
+    t = _wait_for("fremd", {"done"})
+    assert t.status == "done" and t.owner == engine.owner and t.attempts == 1
+
+
+def test_cancel_token_ends_rate_limit_wait():
+    """Test that a fetch waiting on its domain bucket returns as soon as the job is cancelled"""
+    from app.services.fetch_pool import DomainLimiter
+    from lead_providers import fetch_contact
+
+    limiter = DomainLimiter(rate=0.1, burst=1)
+    limiter.bucket("https://langsam.de/").acquire()
+    token = lead_tasks.CancelToken("t")
+    threading.Timer(0.1, token.cancel).start()
+    started = time.monotonic()
+    assert fetch_contact("https://langsam.de/kontakt", limiter=limiter, stop=token.event) is None
+    assert time.monotonic() - started < 2
@@ -0,0 +1,29 @@
+import pytest
+
+from app.services import lead_radar
+
+
+ROWS = [
+    {"company": "Heizung Meier", "category": "shk", "email": "info@meier.de", "phone": "02931 1", "city": "Arnsberg", "source": "osm"},
+    {"company": "Maler Koch", "category": "maler", "email": "  ", "website": "https://koch.de"},
+    {"company": "Elektro Schulz", "category": "elektro", "email": "a@b.de", "phone": "1", "website": "x", "city": "y", "source": "osm"},
+    {},
+]
+
+
+def test_batch_matches_score_one():
+    """Test vectorized scores equal the row-wise reference"""
+    expected = [lead_radar.score_one(r)["score"] for r in ROWS]
+    assert list(lead_radar.score_batch(ROWS)) == expected
+    assert [r["score"] for r in lead_radar.score_list(ROWS)] == expected
+    assert "score" not in ROWS[0]
+    assert expected == [80, 25, 95, 0]
+
+
+def test_rescore_with_profiles():
+    """Test re-scoring precomputed features with different weight profiles"""
+    pytest.importorskip("numpy")
+    features = lead_radar.LeadFeatures(ROWS)
+    assert list(features.score("default")) == list(lead_radar.score_batch(ROWS))
+    assert list(features.score("outreach")) == list(lead_radar.score_batch(ROWS, "outreach"))
+    assert list(features.score({"website": 50})) == [10, 50, 60, 0]
@@ -0,0 +1,65 @@
+import io, json, sys, pathlib
+from datetime import datetime
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import leads
+from backend.db import Base
+from backend.models import Lead
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'leads.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__])
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    for i in range(25):
+        db.add(Lead(
+            company=f"Betrieb {i}",
+            contact_email=f"info{i}@example.de" if i % 2 else "",
+            status="won" if i % 5 == 0 else "new",
+            created_at=datetime(2025, 1, 1 + i),
+        ))
+    db.commit()
+    db.close()
+    monkeypatch.setattr(leads, "SessionLocal", Session)
+    app = FastAPI()
+    app.include_router(leads.router)
+    return TestClient(app)
+
+
+def test_export_csv_batches_and_filters(client):
+    """Test CSV export across several batches with SQL-side filters"""
+    r = client.get("/api/leads/export", params={"format": "csv", "batch_size": 4})
+    assert r.status_code == 200
+    lines = r.text.strip().splitlines()
+    assert lines[0] == ",".join(leads.EXPORT_FIELDS)
+    assert len(lines) == 26
+
+    r = client.get("/api/leads/export", params={"format": "csv", "status": "won", "has_email": "false"})
+    companies = [line.split(",")[1] for line in r.text.strip().splitlines()[1:]]
+    assert companies == ["Betrieb 0", "Betrieb 10", "Betrieb 20"]
+
+
+def test_export_ndjson_and_xlsx(client):
+    """Test NDJSON and XLSX streaming with date filters"""
+    r = client.get("/api/leads/export", params={"format": "ndjson", "since": "2025-01-20", "batch_size": 2})
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["company"] for row in rows] == [f"Betrieb {i}" for i in range(19, 25)]
+    assert rows[0]["created_at"] == "2025-01-20T00:00:00"
+
+    r = client.get("/api/leads/export", params={"format": "xlsx", "q": "betrieb 1"})
+    ws = load_workbook(io.BytesIO(r.content), read_only=True)["leads"]
+    assert len(list(ws.values)) == 1 + 11
+
+    assert client.get("/api/leads/export", params={"format": "pdf"}).status_code == 400
@@ -0,0 +1,95 @@
+import io, json, sys, pathlib
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import leads
+from backend.db import Base
+from backend.models import Lead
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'leads.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__])
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(Lead(company="Müller Haustechnik", contact_email="info@mueller.de", status="won"))
+    db.add(Lead(company="Elektro Schmidt", contact_email="", status="new"))
+    db.commit()
+    db.close()
+    monkeypatch.setattr(leads, "SessionLocal", Session)
+    monkeypatch.setattr(leads, "has_feature", lambda feature: True)
+    app = FastAPI()
+    app.include_router(leads.router)
+    return TestClient(app), Session
+
+
+def _csv(rows):
+    # mit BOM, wie Excel CSV speichert
+    lines = ["firma,name,mail"] + [",".join(r) for r in rows]
+    return ("\ufeff" + "\n".join(lines) + "\n").encode("utf-8")
+
+
+MAPPING = {"map_company": "firma", "map_contact_name": "name", "map_contact_email": "mail"}
+
+
+def test_csv_import_dedupes_in_chunks(client):
+    """Test chunked CSV import with dedupe against the table and within the file"""
+    http, Session = client
+    rows = [(f"Betrieb {i}", f"Name {i}", f"kontakt{i}@example.de") for i in range(25)]
+    rows += [
+        ("Müller Haustechnik", "", "info@mueller.de"),   # vorhanden
+        ("Müller Haustechnik", "", "neu@mueller.de"),    # neues Paar
+        ("Elektro Schmidt", "", ""),                     # Firma ohne Mail vorhanden
+        ("Betrieb 3", "", "kontakt3@example.de"),        # Duplikat in der Datei
+        ("  ", "Niemand", "x@example.de"),               # ohne Firma
+        ("Dach Weber", "Weber", "kaputt"),               # ungültige Mail -> leer
+    ]
+    r = http.post("/api/leads/import/csv", files={"file": ("leads.csv", _csv(rows), "text/csv")},
+                  data={**MAPPING, "chunk_size": "10"})
+    assert r.json() == {"ok": True, "imported": 27, "skipped": 4, "rows": 31, "chunks": 4}
+
+    db = Session()
+    assert db.query(Lead).count() == 29
+    weber = db.query(Lead).filter_by(company="Dach Weber").one()
+    assert weber.contact_email == "" and weber.status == "new" and weber.created_at is not None
+    db.close()
+
+    again = http.post("/api/leads/import/csv", files={"file": ("leads.csv", _csv(rows), "text/csv")},
+                      data=MAPPING).json()
+    assert again["imported"] == 0 and again["skipped"] == 31
+
+
+def test_xlsx_import_streams_progress(client):
+    """Test read-only XLSX import with NDJSON progress per chunk"""
+    http, Session = client
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["company", "contact_email", "contact_name"])
+    for i in range(12):
+        ws.append([f"Firma {i}", f"info{i}@firma.de" if i % 3 else None, None])
+    ws.append(["Elektro Schmidt", None])
+    buf = io.BytesIO()
+    wb.save(buf)
+
+    r = http.post("/api/leads/import/xlsx", data={"chunk_size": "5", "progress": "true"},
+                  files={"file": ("leads.xlsx", buf.getvalue(), "application/octet-stream")})
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [(x["chunk"], x["rows"], x["imported"]) for x in lines[:-1]] == [(1, 5, 5), (2, 10, 10), (3, 13, 12)]
+    assert lines[-1] == {"ok": True, "done": True, "chunk": 3, "rows": 13, "imported": 12, "skipped": 1}
+    db = Session()
+    assert db.query(Lead).count() == 14
+    db.close()
+
+    missing = http.post("/api/leads/import/xlsx", data={"map_company": "firma"},
+                        files={"file": ("leads.xlsx", buf.getvalue(), "application/octet-stream")})
+    assert missing.status_code == 400
@@ -0,0 +1,93 @@
+import io, os, sys, pathlib, zipfile
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import offers
+from backend.app.services import render_farm
+from backend.db import Base
+from backend.models import Offer, OfferItem
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'offers.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Offer.__table__, OfferItem.__table__])
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    for n in range(3):
+        offer = Offer(customer=f"Kunde {n}", total_net=100.0 * (n + 1), total_gross=119.0 * (n + 1))
+        db.add(offer); db.flush()
+        db.add(OfferItem(offer_id=offer.id, name="Wartung Heizung", qty=n + 1, unit_price=100.0))
+    db.commit()
+    db.close()
+    monkeypatch.setattr(offers, "SessionLocal", Session)
+    monkeypatch.setattr(offers, "EXPORTS_DIR", str(tmp_path / "exports"))
+    farm = render_farm.RenderFarm(workers=2, cache_dir=str(tmp_path / "render"))
+    monkeypatch.setattr(render_farm, "_farm", farm)
+    app = FastAPI()
+    app.include_router(offers.router)
+    yield TestClient(app), Session
+    farm.shutdown()
+
+
+def test_offer_pdf_reuses_unchanged_revision(client):
+    """Test that an unchanged offer keeps its file and a changed one replaces it"""
+    http, Session = client
+    first = http.get("/api/offers/1/pdf").json()
+    assert first["ok"] and first["pdf"].endswith(f"angebot_1_{first['revision']}.pdf")
+    mtime = os.path.getmtime(first["pdf"])
+
+    again = http.get("/api/offers/1/pdf").json()
+    assert again["pdf"] == first["pdf"] and os.path.getmtime(first["pdf"]) == mtime
+
+    db = Session()
+    db.get(Offer, 1).customer = "Kunde 0 GmbH"
+    db.commit()
+    db.close()
+    changed = http.get("/api/offers/1/pdf").json()
+    assert changed["revision"] != first["revision"]
+    assert os.path.exists(changed["pdf"]) and not os.path.exists(first["pdf"])
+
+    assert http.get("/api/offers/99/pdf").status_code == 404
+
+
+def test_bulk_zip(client):
+    """Test bulk rendering into a zip with missing ids reported"""
+    http, _ = client
+    r = http.post("/api/offers/pdf/bulk", json={"ids": [3, 1, 2, 3, 42]})
+    assert r.status_code == 200
+    assert r.headers["x-missing-offers"] == "42"
+    with zipfile.ZipFile(io.BytesIO(r.content)) as zf:
+        assert zf.namelist() == ["angebot_3.pdf", "angebot_1.pdf", "angebot_2.pdf"]
+        assert zf.read("angebot_1.pdf")[:4] == b"%PDF"
+
+    assert http.post("/api/offers/pdf/bulk", json={"ids": []}).status_code == 400
+
+
+def test_concurrent_revisions_keep_latest_file(client, tmp_path):
+    """Test that concurrent renders of two revisions leave exactly one of them on disk"""
+    import asyncio
+
+    data = offers._load_offers([1])[0]
+    changed = {**data, "customer": "Kunde 0 GmbH"}
+
+    async def both():
+        # ein abgebrochener Wartender darf die Sperre nicht blockiert zurücklassen
+        waiting = asyncio.ensure_future(asyncio.gather(offers._render_offer(data), offers._render_offer(data)))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        return await asyncio.gather(offers._render_offer(data), offers._render_offer(changed))
+
+    paths = asyncio.run(both())
+    assert 1 not in offers._offer_locks
+    assert paths[0] != paths[1]
+    remaining = os.listdir(tmp_path / "exports")
+    assert len(remaining) == 1 and remaining[0] in {os.path.basename(p) for p in paths}
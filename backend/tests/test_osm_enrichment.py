@@ -63,3 +63,78 @@ def test_extract_contacts_from_page():
     pass
 
 
+
+
+def test_enrich_leads_async_mocked(tmp_path, monkeypatch):
+    """Test async enrichment engine against a mocked transport"""
+    import asyncio
+    import httpx
+    from app.services import page_cache
+    from app.services.enrichment import enrich_leads_async
+
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_DIR", tmp_path)
+
+    pages = {
+        "https://shk-a.de": '<a href="/impressum">Impressum</a>',
+        "https://shk-a.de/impressum": "<p>Tel. 02931 123456</p><a href='mailto:info@shk-a.de'>Mail</a>",
+        "https://elektro-b.de/": "<p>Kontakt: info@elektro-b.de</p>",
+    }
+
+    def handler(request):
+        body = pages.get(str(request.url))
+        if body is None:
+            return httpx.Response(404)
+        return httpx.Response(200, text=body)
+
+    leads = [
+        {"company": "SHK A", "website": "shk-a.de", "source": "osm"},
+        {"company": "Elektro B", "website": "https://elektro-b.de/", "source": "osm"},
+        {"company": "Ohne Web", "source": "osm"},
+    ]
+    result = asyncio.run(enrich_leads_async(leads, transport=httpx.MockTransport(handler)))
+
+    assert [r["company"] for r in result] == ["SHK A", "Elektro B", "Ohne Web"]
+    assert result[0]["proof_impressum_url"] == "https://shk-a.de/impressum"
+    assert result[0]["phone"] == "+492931123456"
+    assert result[0]["email"] == "info@shk-a.de"
+    assert result[1]["email"] == "info@elektro-b.de"
+    assert result[1]["proof_contact_url"] == "https://elektro-b.de/"
+    assert result[2]["source"] == "osm/enriched"
+    assert result[2]["lat"] is None
+
+
+def test_iter_enriched_completion_order(tmp_path, monkeypatch):
+    """Test iter_enriched yields every lead once with its original index"""
+    import asyncio
+    import httpx
+    from app.services import page_cache
+    from app.services.enrichment import iter_enriched
+
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_DIR", tmp_path)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text="<p>info@firma.de</p>"))
+    leads = [{"company": f"Firma {i}", "website": f"https://firma{i}.de"} for i in range(5)]
+
+    async def _collect():
+        return [item async for item in iter_enriched(leads, transport=transport)]
+
+    result = asyncio.run(_collect())
+    assert sorted(i for i, _ in result) == [0, 1, 2, 3, 4]
+    assert all(lead["company"] == f"Firma {i}" for i, lead in result)
+    assert all(lead["email"] == "info@firma.de" for _, lead in result)
+
+
+def test_enrich_staged_keeps_order_across_batches(tmp_path, monkeypatch):
+    """Test the enrichment stage runs batches over one shared client and keeps lead order"""
+    import httpx
+    from app.services import page_cache, stage_pipeline
+    from app.services.enrichment import enrich_staged
+
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_DIR", tmp_path)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text="<p>info@firma.de</p>"))
+    leads = [{"company": f"Firma {i}", "website": f"https://firma{i}.de"} for i in range(7)]
+
+    result = enrich_staged(leads, batch_size=3, transport=transport)
+    assert [lead["company"] for lead in result] == [f"Firma {i}" for i in range(7)]
+    assert all(lead["email"] == "info@firma.de" for lead in result)
+    stage = next(run for run in stage_pipeline.recent_metrics() if run["name"] == "enrich")["stages"][0]
+    assert stage["received"] == 3 and stage["errors"] == 0
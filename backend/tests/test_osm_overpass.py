@@ -0,0 +1,138 @@
+import pytest
+
+from app.services import geocode_cache, osm_overpass
+
+
+@pytest.fixture(autouse=True)
+def isolated_geocode_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(geocode_cache, "GEOCODE_DB", tmp_path / "geocode.db")
+
+
+def test_normalize_location():
+    """Test geocode cache key normalization"""
+    assert geocode_cache.normalize_location("  Neheim,  Deutschland ") == "neheim"
+    assert geocode_cache.normalize_location("Bad  Berleburg") == "bad berleburg"
+
+
+def test_resolve_area_id_uses_cache(monkeypatch):
+    """Test that Nominatim is only asked once per location, including negative results"""
+    calls = []
+
+    def fake_nominatim(location):
+        calls.append(location)
+        if location == "Nirgendwo":
+            return None, None
+        return 3600000000 + 123, {"osm_id": 123, "osm_type": "relation", "display_name": location}
+
+    monkeypatch.setattr(osm_overpass, "_nominatim_area", fake_nominatim)
+
+    assert osm_overpass.resolve_area_id("Arnsberg") == 3600000123
+    assert osm_overpass.resolve_area_id("arnsberg ") == 3600000123
+    assert osm_overpass.resolve_area_id("Nirgendwo") is None
+    assert osm_overpass.resolve_area_id("Nirgendwo") is None
+    assert calls == ["Arnsberg", "Nirgendwo"]
+    assert geocode_cache.stats() == {"positive": 1, "negative": 1}
+
+
+def test_build_multi_query_single_request():
+    """Test that several categories collapse into one nwr statement per tag key"""
+    q = osm_overpass.build_multi_query(["shk", "elektro", "galabau"], 3600000123)
+    assert q.count("nwr(") == 2
+    assert '["craft"~"^(electrician|gardener|hvac|plumber)$"]' in q
+    assert "node(" not in q
+
+
+def test_split_elements_reverse_index():
+    """Test splitting a combined Overpass result back into categories"""
+    elements = [
+        {"type": "node", "lat": 51.4, "lon": 8.0, "tags": {"name": "Heizung Meier", "craft": "hvac"}},
+        {"type": "way", "center": {"lat": 51.3, "lon": 8.1}, "tags": {"name": "Elektro Schulz", "craft": "electrician"}},
+        {"type": "node", "tags": {"name": "Gartencenter", "shop": "garden_centre"}},
+        {"type": "node", "tags": {"name": "Bäcker", "shop": "bakery"}},
+    ]
+    split = osm_overpass.split_elements(elements, ["shk", "elektro", "galabau"], "Arnsberg")
+    assert [r["company"] for r in split["shk"]] == ["Heizung Meier"]
+    assert [r["company"] for r in split["elektro"]] == ["Elektro Schulz"]
+    assert split["elektro"][0]["lat"] == 51.3
+    assert [r["company"] for r in split["galabau"]] == ["Gartencenter"]
+    assert split["galabau"][0]["city"] == "Arnsberg"
+
+
+def test_hunt_stream_ndjson(monkeypatch):
+    """Test streaming hunt emits leads first, then enrichment patches"""
+    import json
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.routers import lead_hunter_osm
+
+    async def fake_iter(leads):
+        for i, lead in reversed(list(enumerate(leads))):
+            yield i, {**lead, "email": f"info{i}@example.org", "source": "osm/enriched"}
+
+    monkeypatch.setattr(lead_hunter_osm, "fetch_pois", lambda c, l: [{"company": "A", "source": "osm"}, {"company": "B", "source": "osm"}])
+    monkeypatch.setattr(lead_hunter_osm, "iter_enriched", fake_iter)
+
+    app = FastAPI()
+    app.include_router(lead_hunter_osm.router)
+    r = TestClient(app).post("/lead_hunter/osm/hunt_stream", json={"category": "shk", "location": "Arnsberg"})
+    events = [json.loads(line) for line in r.text.splitlines()]
+
+    assert [e["type"] for e in events] == ["start", "lead", "lead", "patch", "patch", "done"]
+    assert events[1]["lead"]["company"] == "A"
+    assert events[3] == {"type": "patch", "index": 1, "patch": {"email": "info1@example.org", "source": "osm/enriched"}}
+
+
+def test_resolve_point_cached(monkeypatch):
+    """Test that location centers are cached alongside the area id"""
+    calls = []
+
+    def fake_nominatim(location):
+        calls.append(location)
+        return 3600000000 + 7, {"osm_id": 7, "osm_type": "relation", "lat": "51.4497", "lon": "7.9631"}
+
+    monkeypatch.setattr(osm_overpass, "_nominatim_area", fake_nominatim)
+
+    assert osm_overpass.resolve_point("Neheim") == (51.4497, 7.9631)
+    assert osm_overpass.resolve_point("neheim") == (51.4497, 7.9631)
+    assert osm_overpass.resolve_area_id("Neheim") == 3600000007
+    assert calls == ["Neheim"]
+
+
+def test_incremental_refresh_merges_diff(tmp_path, monkeypatch):
+    """Test that an expired cache is refreshed with a newer: diff instead of a full download"""
+    from app.services import cache_dedupe, spatial_index, tiered_cache
+
+    monkeypatch.setattr(tiered_cache, "_cache", tiered_cache.TieredCache(tmp_path / "cache.db"))
+    monkeypatch.setattr(spatial_index, "_index", spatial_index.SpatialIndex(tmp_path / "spatial.db"))
+    monkeypatch.setattr(osm_overpass, "resolve_area_id", lambda location: 3600000123)
+
+    def node(i, name, **tags):
+        return {"type": "node", "id": i, "lat": 51.4 + i / 1000, "lon": 8.0, "tags": {"craft": "plumber", "name": name, **tags}}
+
+    queries = []
+    responses = [
+        {"osm3s": {"timestamp_osm_base": "2026-10-01T00:00:00Z"},
+         "elements": [node(1, "Heizung Meier"), node(2, "Sanitär Becker"), node(3, "Bad Schulz")]},
+        {"osm3s": {"timestamp_osm_base": "2026-10-02T00:00:00Z"},
+         "elements": [node(1, "Heizung Meier", phone="02931 1"), node(4, "Neu Installateur"),
+                      {"type": "node", "id": 1}, {"type": "node", "id": 3}, {"type": "node", "id": 4}]},
+    ]
+
+    def fake_overpass(q):
+        queries.append(q)
+        return responses[len(queries) - 1]
+
+    monkeypatch.setattr(osm_overpass, "_overpass", fake_overpass)
+
+    first = osm_overpass.fetch_pois("shk", "Arnsberg")
+    assert sorted(r["company"] for r in first) == ["Bad Schulz", "Heizung Meier", "Sanitär Becker"]
+
+    tiered_cache.get_cache().delete(cache_dedupe.CACHE_NAMESPACE, cache_dedupe.make_key("shk", "Arnsberg"))
+    second = osm_overpass.fetch_pois("shk", "Arnsberg")
+
+    assert '(newer:"2026-10-01T00:00:00Z")' in queries[1] and "out ids;" in queries[1]
+    assert sorted(r["company"] for r in second) == ["Bad Schulz", "Heizung Meier", "Neu Installateur"]
+    assert next(r for r in second if r["osm_id"] == 1)["phone"] == "02931 1"
+    state = cache_dedupe.load_state(cache_dedupe.make_key("shk", "Arnsberg"))
+    assert state["since"] == "2026-10-02T00:00:00Z"
+    assert spatial_index.get_index().stats()["pois"] == 3
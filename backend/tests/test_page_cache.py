@@ -0,0 +1,48 @@
+import httpx
+import pytest
+
+from app.services import page_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_DIR", tmp_path)
+    return tmp_path
+
+
+def test_normalize_url():
+    """Test URL normalization for cache keys"""
+    assert page_cache.normalize_url("HTTPS://Example.DE:443/a?b=2&a=1#top") == "https://example.de/a?a=1&b=2"
+    assert page_cache.normalize_url("http://example.de") == "http://example.de/"
+
+
+def test_conditional_revalidation(monkeypatch):
+    """Test 200 → store, fresh hit without network, stale → 304 revalidation"""
+    calls = []
+
+    def handler(request):
+        calls.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="<p>Impressum</p>", headers={"ETag": '"v1"'})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        first = page_cache.get(client, "https://shk.de/impressum")
+        assert first.status_code == 200 and not first.from_cache
+
+        second = page_cache.get(client, "https://shk.de/impressum")
+        assert second.from_cache and len(calls) == 1
+
+        monkeypatch.setattr(page_cache, "PAGE_CACHE_FRESH_SECONDS", 0)
+        third = page_cache.get(client, "https://shk.de/impressum")
+        assert third.revalidated and third.text == "<p>Impressum</p>"
+        assert calls[-1]["if-none-match"] == '"v1"'
+
+
+def test_evict_by_size():
+    """Test size-based eviction keeps the most recently validated entries"""
+    page_cache.store("https://a.de/", 200, {}, b"a" * 100, "utf-8")
+    page_cache.store("https://b.de/", 200, {}, b"b" * 100, "utf-8")
+    stats = page_cache.evict(max_bytes=150)
+    assert stats["bytes"] <= 150
+    assert page_cache.lookup("https://b.de/") is not None
@@ -0,0 +1,91 @@
+import importlib.util, sys, pathlib
+from datetime import datetime
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, desc, select
+from sqlalchemy.pool import NullPool
+
+from backend.db import Base
+from backend.models import FollowUp, Lead, Suggestion
+from backend.automation.models import ActionQueue
+from backend.character.models import Base as CharacterBase, ConversationEvent
+
+MIGRATION = pathlib.Path(__file__).resolve().parents[1] / "alembic" / "versions" / "b7e4c91d2f05_hot_path_indexes.py"
+
+# Die Abfragen, wie sie Scheduler, Follow-ups, Lead-Import, Insights, Automation und Character absetzen
+HOT_QUERIES = {
+    "due_followups": select(FollowUp).where(FollowUp.done == False, FollowUp.due_at <= datetime(2026, 1, 1)).order_by(FollowUp.due_at.asc()),  # noqa: E712
+    "lead_exists": select(Lead).where(Lead.company == "Müller Haustechnik", Lead.contact_email == "info@mueller.de").limit(1),
+    "lead_exists_company": select(Lead).where(Lead.company == "Müller Haustechnik").limit(1),
+    "open_suggestions": select(Suggestion).where(Suggestion.consumed == False).order_by(Suggestion.score.desc()),  # noqa: E712
+    "action_queue": select(ActionQueue).where(ActionQueue.user_id == "denis", ActionQueue.status == "approved").order_by(desc(ActionQueue.created_at)).limit(50),
+    "conversation_tail": select(ConversationEvent).where(ConversationEvent.user_id == "denis").order_by(ConversationEvent.id.desc()).limit(6),
+}
+
+
+def _plan(conn, stmt):
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    return [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params)]
+
+
+def _regressions(conn):
+    bad = {}
+    for name, stmt in HOT_QUERIES.items():
+        steps = _plan(conn, stmt)
+        if any((s.startswith("SCAN ") and "INDEX" not in s) or "TEMP B-TREE" in s for s in steps):
+            bad[name] = steps
+    return bad
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    # Frische Verbindung pro Prüfung: der sqlite3-Statement-Cache würde sonst alte Pläne liefern
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}", poolclass=NullPool)
+    Base.metadata.create_all(engine, tables=[FollowUp.__table__, Lead.__table__, Suggestion.__table__, ActionQueue.__table__])
+    CharacterBase.metadata.create_all(engine, tables=[ConversationEvent.__table__])
+    return engine
+
+
+def _migration():
+    spec = importlib.util.spec_from_file_location("hot_path_indexes", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run(engine, step):
+    with engine.begin() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            step()
+
+
+def test_hot_queries_use_indexes(engine):
+    """Test that no hot query falls back to a full scan or a sort"""
+    with engine.connect() as conn:
+        assert _regressions(conn) == {}
+
+
+def test_migration_adds_indexes_to_existing_database(engine):
+    """Test that the migration fixes a pre-index schema and downgrades cleanly"""
+    migration = _migration()
+    with engine.begin() as conn:
+        for name, table, _ in migration.INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+    with engine.connect() as conn:
+        assert set(_regressions(conn)) == {"due_followups", "lead_exists", "lead_exists_company", "open_suggestions", "action_queue"}
+
+    _run(engine, migration.upgrade)
+    _run(engine, migration.upgrade)
+    with engine.connect() as conn:
+        assert _regressions(conn) == {}
+
+    _run(engine, migration.downgrade)
+    with engine.connect() as conn:
+        assert "due_followups" in _regressions(conn)
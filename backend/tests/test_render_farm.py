@@ -0,0 +1,101 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.services import export_catalog, render_farm
+from app.services.render_farm import RenderFarm, input_key, wait_for
+
+LEADS = [
+    {"company": f"Betrieb {i}", "city": "Arnsberg" if i % 2 else "Sundern", "score": i * 10, "phone": "02931 1"}
+    for i in range(6)
+]
+
+
+@pytest.fixture()
+def farm(tmp_path):
+    farm = RenderFarm(workers=1, cache_dir=str(tmp_path / "render"))
+    yield farm
+    farm.shutdown()
+
+
+def test_render_jobs_and_input_hash_cache(farm):
+    """Test pool rendering, in-flight sharing and cache hits by input hash"""
+    payload = {"leads": LEADS, "category": "shk", "city": "Arnsberg"}
+    job = farm.submit("osm_report", payload)
+    assert farm.submit("osm_report", dict(payload)) is job
+    path = asyncio.run(wait_for(job))
+    assert job.status == "done" and not job.cached
+    with open(path, "rb") as handle:
+        assert handle.read(4) == b"%PDF"
+
+    again = farm.submit("osm_report", payload)
+    assert again.cached and again.status == "done" and again.path == path
+    assert again.id != job.id and farm.get(again.id) is again
+
+    other = farm.submit("osm_report", {**payload, "city": "Sundern"})
+    assert other.key != job.key
+    assert input_key("osm_report", payload) == job.key
+
+
+def test_render_xlsx_and_errors(farm):
+    """Test XLSX rendering, failing jobs and unknown kinds"""
+    job = farm.submit("osm_excel", {"leads": LEADS})
+    assert asyncio.run(wait_for(job)).endswith(".xlsx")
+
+    bad = farm.submit("osm_excel", {"leads": [["kein", "dict"]]})
+    with pytest.raises(RuntimeError):
+        asyncio.run(wait_for(bad))
+    assert bad.status == "error" and bad.error
+
+    with pytest.raises(ValueError):
+        farm.submit("unbekannt", {})
+
+
+def test_evict_expires_then_trims_to_budget(farm, tmp_path):
+    """Test cache eviction by age and size, sparing recently served files"""
+    cache = tmp_path / "render"
+    cache.mkdir()
+    now = time.time()
+    for name, age in [("alt.pdf", 10 * 86400), ("a.pdf", 3600), ("b.pdf", 1800), ("frisch.pdf", 0)]:
+        (cache / name).write_bytes(b"x" * 100)
+        os.utime(cache / name, (now - age, now - age))
+
+    stats = farm.evict(max_bytes=150, ttl_seconds=86400)
+    assert stats["removed"] == 2
+    assert sorted(os.listdir(cache)) == ["b.pdf", "frisch.pdf"]
+
+
+def test_render_export_lands_in_catalog(tmp_path, monkeypatch):
+    """Test exports render into EXPORT_DIR, stay inside it and appear in the export catalog"""
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path / "exports"))
+    monkeypatch.setattr(export_catalog, "EXPORT_CATALOG_DB", tmp_path / "catalog.db")
+    monkeypatch.setattr(export_catalog, "_synced", set())
+    farm = RenderFarm(workers=1, cache_dir=str(tmp_path / "render"))
+    monkeypatch.setattr(render_farm, "_farm", farm)
+    payload = {"leads": LEADS, "category": "shk", "city": "Arnsberg"}
+    try:
+        path = asyncio.run(render_farm.render_export(
+            "osm_excel", {"leads": LEADS}, ("osm_leads", "shk", "Arnsberg"),
+            source="osm_leads", category="shk", city="Arnsberg", rows=len(LEADS),
+        ))
+        escaped = asyncio.run(render_farm.render_export(
+            "osm_excel", {"leads": LEADS[:2]}, ("osm_leads", "", "../../x/y"), source="osm_leads",
+        ))
+        report = asyncio.run(render_farm.render_export(
+            "osm_report", payload, ("osm_report", "shk", "Arnsberg"), stamp={"created": "01.01.2030 10:00"},
+        ))
+        again = asyncio.run(render_farm.render_export(
+            "osm_report", payload, ("osm_report", "shk", "Arnsberg"), stamp={"created": "02.01.2030 11:00"},
+        ))
+    finally:
+        farm.shutdown()
+
+    assert os.path.dirname(path) == str(tmp_path / "exports")
+    assert not os.path.exists(tmp_path / "render")
+    assert os.path.basename(escaped).startswith("osm_leads_all_______x_y_")
+    assert sorted(os.listdir(tmp_path)) == ["catalog.db", "exports"]
+    assert again == report and len(os.listdir(tmp_path / "exports")) == 3
+    entry = export_catalog.lookup(os.path.basename(path))
+    assert entry["category"] == "shk" and entry["kind"] == "xlsx" and entry["rows"] == len(LEADS)
@@ -0,0 +1,36 @@
+import time
+
+from app.services.search_fanout import fan_out
+
+
+def test_fan_out_dedupes_by_domain_and_stops_early():
+    """Test merging by domain, skip filter and early stop before slow tasks finish"""
+    calls = []
+
+    def task(name, links, delay=0.0):
+        def run():
+            calls.append(name)
+            time.sleep(delay)
+            return links
+        return run
+
+    tasks = [
+        task("a", ["https://www.meier.de/kontakt", "https://facebook.com/meier", "https://becker.de/"]),
+        task("b", ["https://meier.de/impressum", "https://schulz.de/"], delay=0.05),
+        task("slow", ["https://late.de/"], delay=2.0),
+    ] + [task(f"queued{i}", [f"https://q{i}.de/"], delay=2.0) for i in range(4)]
+
+    start = time.monotonic()
+    links = fan_out(tasks, want=3, max_concurrency=3, skip=lambda u: "facebook.com" in u)
+    assert time.monotonic() - start < 1.0
+    assert links == ["https://www.meier.de/kontakt", "https://becker.de/", "https://schulz.de/"]
+    # Nur freigewordene Worker haben noch Tasks gezogen, der Rest wurde gestrichen
+    assert sum(name.startswith("queued") for name in calls) <= 2
+
+
+def test_fan_out_survives_failing_tasks():
+    """Test that a failing provider does not abort the fan-out"""
+    def boom():
+        raise RuntimeError("blocked")
+
+    assert fan_out([boom, lambda: ["https://a.de/x"]], want=5) == ["https://a.de/x"]
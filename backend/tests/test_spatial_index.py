@@ -0,0 +1,47 @@
+import time
+
+from app.services.spatial_index import SpatialIndex, haversine_km
+
+NEHEIM = (51.4497, 7.9631)
+
+
+def _rows():
+    return [
+        {"company": "Heizung Meier", "category": "shk", "lat": 51.4510, "lon": 7.9650},
+        {"company": "Sanitär Becker", "category": "shk", "lat": 51.3960, "lon": 8.0640},     # Arnsberg, ~9 km
+        {"company": "Bad & Wärme", "category": "shk", "lat": 51.3480, "lon": 8.2840},        # Meschede, ~25 km
+        {"company": "Elektro Schulz", "category": "elektro", "lat": 51.4490, "lon": 7.9600},
+        {"company": "Ohne Koordinaten", "category": "shk", "lat": None, "lon": None},
+    ]
+
+
+def test_radius_bbox_nearest(tmp_path):
+    """Test radius, bbox and nearest-k queries with category filter"""
+    index = SpatialIndex(tmp_path / "spatial.db")
+    assert index.upsert(_rows()) == 4
+    assert index.upsert(_rows()) == 4
+    assert index.stats()["pois"] == 4
+
+    near = index.radius(*NEHEIM, 15, category="shk")
+    assert [r["company"] for r in near] == ["Heizung Meier", "Sanitär Becker"]
+    assert near[0]["distance_km"] < near[1]["distance_km"] < 15
+
+    assert len(index.radius(*NEHEIM, 15)) == 3
+    assert [r["company"] for r in index.nearest(*NEHEIM, k=3, category="shk")][-1] == "Bad & Wärme"
+    assert {r["company"] for r in index.bbox(51.44, 7.95, 51.46, 7.97)} == {"Heizung Meier", "Elektro Schulz"}
+
+
+def test_lookup_speed(tmp_path):
+    """Test radius lookups stay fast with tens of thousands of POIs"""
+    index = SpatialIndex(tmp_path / "spatial.db")
+    rows = [
+        {"company": f"Betrieb {i}", "category": "shk", "lat": 50.0 + (i % 200) * 0.01, "lon": 7.0 + (i // 200) * 0.01}
+        for i in range(20000)
+    ]
+    index.upsert(rows)
+    start = time.perf_counter()
+    for _ in range(100):
+        hits = index.radius(51.0, 7.5, 1.0)
+    elapsed = (time.perf_counter() - start) / 100
+    assert hits and all(haversine_km(51.0, 7.5, h["lat"], h["lon"]) <= 1.0 for h in hits)
+    assert elapsed < 0.01
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from app.services.stage_pipeline import Pipeline, Stage, recent_metrics
+
+
+def test_stages_expand_drop_and_metrics():
+    """Test expand/drop semantics, error isolation and per-stage counters"""
+    def explode(n):
+        return [n * 10 + i for i in range(3)]
+
+    def keep_even(n):
+        if n == 41:
+            raise ValueError("kaputt")
+        return n if n % 2 == 0 else None
+
+    pipeline = Pipeline("test", [
+        Stage("expand", explode, expand=True),
+        Stage("filter", keep_even, workers=3),
+    ])
+    out = pipeline.run(range(5))
+    assert sorted(out) == [0, 2, 10, 12, 20, 22, 30, 32, 40, 42]
+
+    stages = {s["name"]: s for s in pipeline.metrics()["stages"]}
+    assert stages["expand"]["received"] == 5 and stages["expand"]["emitted"] == 15
+    assert stages["filter"]["dropped"] == 4 and stages["filter"]["errors"] == 1
+    assert any(run["name"] == "test" for run in recent_metrics())
+
+
+def test_bounded_queue_and_early_stop():
+    """Test backpressure from a slow stage and stopping after `limit` accepted results"""
+    produced = []
+
+    def source():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    def slow(n):
+        time.sleep(0.01)
+        return n
+
+    pipeline = Pipeline("slow", [Stage("slow", slow, workers=2, queue_size=4)])
+    out = pipeline.run(source(), limit=5)
+    assert len(out) == 5
+    # Queue (4) + Ausgabe-Queue (4) + Worker (2) + Feeder: mehr wurde nie erzeugt
+    assert len(produced) < 20
+    assert pipeline.metrics()["stages"][0]["max_queue_depth"] <= 4
+
+
+def test_should_stop_cancels_pipeline():
+    """Test cooperative cancellation through should_stop"""
+    cancel = threading.Event()
+
+    def work(n):
+        if n == 3:
+            cancel.set()
+        time.sleep(0.005)
+        return n
+
+    out = Pipeline("cancel", [Stage("work", work)], should_stop=cancel.is_set).run(range(10000))
+    assert len(out) < 100
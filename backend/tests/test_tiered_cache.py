@@ -0,0 +1,43 @@
+import time
+
+from app.services.tiered_cache import TieredCache
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    """Test LRU tier in front of the SQLite tier and the hit/miss counters"""
+    cache = TieredCache(tmp_path / "cache.db", memory_items=1)
+    cache.set("osm", "a", [{"company": "Heizung Meier"}])
+    cache.set("osm", "b", [{"company": "Elektro Schulz"}])
+
+    assert cache.get("osm", "b") == [{"company": "Elektro Schulz"}]
+    assert cache.get("osm", "a") == [{"company": "Heizung Meier"}]
+    assert cache.get("osm", "missing") is None
+    assert cache.counters["memory_hits"] == 1
+    assert cache.counters["disk_hits"] == 1
+    assert cache.counters["misses"] == 1
+
+    reopened = TieredCache(tmp_path / "cache.db")
+    assert reopened.get("osm", "b") == [{"company": "Elektro Schulz"}]
+
+
+def test_namespace_ttl(tmp_path):
+    """Test per-namespace TTLs"""
+    cache = TieredCache(tmp_path / "cache.db", ttls={"short": 0, "long": 3600})
+    cache.set("short", "k", 1)
+    cache.set("long", "k", 2)
+    time.sleep(0.01)
+    assert cache.get("short", "k") is None
+    assert cache.get("long", "k") == 2
+    assert cache.counters["expired"] == 1
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    """Test size-based eviction by access time"""
+    cache = TieredCache(tmp_path / "cache.db", memory_items=0, max_bytes=400)
+    payload = "".join(chr(0x4E00 + i) for i in range(200))  # schlecht komprimierbar
+    cache.set("osm", "old", payload)
+    time.sleep(0.01)
+    cache.set("osm", "new", payload)
+    assert cache.counters["evictions"] >= 1
+    assert cache.get("osm", "new") == payload
+    assert cache.get("osm", "old") is None
@@ -0,0 +1,40 @@
+import asyncio
+
+import httpx
+
+from app.services.lead_providers.web_permitted import AimdRate, crawl
+
+
+def test_aimd_increase_and_backoff():
+    """Test additive increase on fast responses and multiplicative decrease on 429/latency spikes"""
+    rate = AimdRate(2.0)
+    assert rate.rate == 1.0
+    for _ in range(20):
+        rate.on_response(200, 0.1)
+    assert rate.rate == 2.0
+    rate.on_response(429, 0.1)
+    assert rate.rate == 1.0
+    rate.on_response(200, 0.1)
+    rate.on_response(200, 3.0)
+    assert rate.rate < 1.0
+
+
+def test_crawl_slows_down_throttling_host():
+    """Test that a host answering 429 is slowed down while the others keep their rate"""
+    calls = {"slow.example": 0, "fast.example": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        calls[host] += 1
+        if host == "slow.example" and calls[host] == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, text=f"<p>info@{host}</p>")
+
+    urls = ["https://slow.example/a", "https://fast.example/a", "https://fast.example/b"]
+    rates = {}
+    results = asyncio.run(crawl(urls, ["example"], rps=50, concurrency=4, retry=1, backoff_ms=0,
+                                transport=httpx.MockTransport(handler), rates=rates))
+
+    assert sorted(r["email"] for r in results) == ["info@fast.example", "info@fast.example", "info@slow.example"]
+    assert calls["slow.example"] == 2
+    assert rates["slow.example"].rate < rates["fast.example"].rate
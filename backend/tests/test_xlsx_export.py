@@ -0,0 +1,36 @@
+from openpyxl import load_workbook
+
+from app.services import export_osm_excel as export_module
+from app.services.xlsx_stream import TopN
+
+
+def test_topn_matches_stable_sort():
+    """Test heap-based top-N equals a stable descending sort"""
+    scores = [5, 9, 1, 9, 7, 3, 9, 0, 7]
+    top = TopN(4, key=lambda x: x[1])
+    for item in enumerate(scores):
+        top.push(item)
+    expected = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)[:4]
+    assert top.items() == expected
+
+
+def test_export_osm_excel_streaming(tmp_path):
+    """Test raw, pivot and top-10 sheets of the write-only export"""
+    leads = [
+        {"company": f"Betrieb {i}", "city": "Arnsberg" if i % 2 else "Meschede", "score": i, "phone": "02931 1"}
+        for i in range(25)
+    ]
+    export_module.write_osm_workbook(leads, str(tmp_path / "osm_leads.xlsx"))
+    wb = load_workbook(tmp_path / "osm_leads.xlsx", read_only=True)
+
+    assert wb.sheetnames == ["Raw", "Pivot_by_City", "Top10_by_Score"]
+    raw = list(wb["Raw"].values)
+    assert raw[0][0] == "Firma" and len(raw) == 26
+    assert raw[1][9] == "osm"
+
+    pivot = list(wb["Pivot_by_City"].values)
+    assert pivot[1] == ("Arnsberg", 12, 12.0, 23, 1)
+    assert pivot[2] == ("Meschede", 13, 12.0, 24, 0)
+
+    top10 = list(wb["Top10_by_Score"].values)
+    assert [row[6] for row in top10[1:]] == list(range(24, 14, -1))
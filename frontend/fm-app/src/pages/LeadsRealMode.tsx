@@ -6,14 +6,11 @@ type ProviderOption = "csv" | "web_permitted" | "handwerksregister" | "meistersu
 type BackendConfig = { real_mode?: boolean } & Record<string, unknown>;
 type ExportMap = Record<string, string>;
 
-function pathToFileHref(path: string): string {
+// CSV/XLSX/MD werden erst beim Abruf gerendert – Links laufen daher über /api/exports
+function exportHref(path: string): string {
   if (!path) return "#";
-  const normalized = path.replace(/\\/g, "/");
-  if (normalized.startsWith("file:///")) return normalized;
-  if (/^[a-zA-Z]:/.test(normalized)) {
-    return `file:///${normalized}`;
-  }
-  return `file:///${normalized}`;
+  const name = path.replace(/\\/g, "/").split("/").pop() || "";
+  return `${BACKEND}/api/exports/${encodeURIComponent(name)}`;
 }
 
 export default function LeadsRealMode() {
@@ -107,7 +104,7 @@ export default function LeadsRealMode() {
         key,
         label: key.toUpperCase(),
         path: value,
-        href: pathToFileHref(value),
+        href: exportHref(value),
       }));
   }, [lastExport]);
 